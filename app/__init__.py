@@ -3,6 +3,9 @@ from werkzeug.middleware.proxy_fix import ProxyFix
 
 from app.controllers.root_controller import root_bp
 from app.controllers.analysis_controller import analysis_bp
+from app.controllers.comparison_controller import comparison_bp
+from app.controllers.job_controller import job_bp
+from app.controllers.scoring_controller import scoring_bp
 
 def create_app():
     app = Flask(
@@ -17,5 +20,8 @@ def create_app():
 
     app.register_blueprint(root_bp, url_prefix="/")
     app.register_blueprint(analysis_bp, url_prefix="/analyses")
+    app.register_blueprint(comparison_bp, url_prefix="/analyses")
+    app.register_blueprint(job_bp, url_prefix="/analyses")
+    app.register_blueprint(scoring_bp, url_prefix="/analyses")
 
     return app
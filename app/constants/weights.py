@@ -1,3 +1,5 @@
+import hashlib
+
 TITLE_WEIGHT = 100
 SUBTITLE_WEIGHT = 80
 RELEVANT_OUTLET_WEIGHT = 95
@@ -16,3 +18,14 @@ REACH_GROUP_THRESHOLDS = {
     "C": 500_000,
     "D": 0
 }
+
+# Versão dos pesos: muda automaticamente quando qualquer peso ou limiar é alterado,
+# invalidando resultados em cache calculados com a versão anterior.
+WEIGHTS_VERSION = hashlib.sha1(repr((
+    TITLE_WEIGHT,
+    SUBTITLE_WEIGHT,
+    RELEVANT_OUTLET_WEIGHT,
+    NICHE_OUTLET_WEIGHT,
+    sorted(REACH_GROUP_WEIGHTS.items()),
+    sorted(REACH_GROUP_THRESHOLDS.items()),
+)).encode("utf-8")).hexdigest()[:12]
@@ -1,48 +1,108 @@
+import json
+import os
+import threading
+import time
+
+from app.enums.analysis_status import AnalysisStatus
+from app.infra.event_bus import AnalysisEventBus
 from app.services.analysis_service import AnalysisService
+from app.services.bank_analysis_service import BankAnalysisService
+from app.services.domain_metrics_service import DomainMetricsService
+from app.services.export_service import ExportService
+from app.services.highlight_service import HighlightService
+from app.services.mention_explorer_service import MentionExplorerService, MentionIndex
+from app.services.mention_service import MentionService
+from app.services.job_service import JobService
+from app.services.profiling_service import ProfilingService
+from app.services.recalculation_service import RecalculationService
 from app.repositories.analysis_repository import AnalysisRepository
 from app.repositories.bank_analysis_repository import BankAnalysisRepository
 from app.repositories.bank_repository import BankRepository
-from flask import Blueprint, jsonify, request
+from app.utils.http_cache import ResponseCache
+from flask import Blueprint, Response, jsonify, request, stream_with_context
 
 analysis_bp = Blueprint("analysis", __name__)
 analysis_service = AnalysisService()
+recalculation_service = RecalculationService()
+job_service = JobService()
+export_service = ExportService()
+mention_explorer_service = MentionExplorerService()
+highlight_service = HighlightService()
+bank_analysis_service = BankAnalysisService()
+domain_metrics_service = DomainMetricsService()
+profiling_service = ProfilingService()
+mention_service = MentionService()
+
+SSE_POLL_SECONDS = 5
+SSE_TAIL_SECONDS = 1
+# Cada stream ocupa uma thread do gunicorn: limite por processo e duração máxima
+# (ao fim o EventSource reconecta sozinho e recebe um snapshot novo)
+SSE_MAX_STREAMS = int(os.getenv("IEDI_SSE_MAX_STREAMS", "4"))
+SSE_MAX_SECONDS = float(os.getenv("IEDI_SSE_MAX_SECONDS", "300"))
+sse_streams = threading.BoundedSemaphore(SSE_MAX_STREAMS)
+MAX_BATCH_ANALYSES = 100
+
+def serialize_analysis(analysis):
+    return {
+        "id": analysis.id,
+        "name": analysis.name,
+        "query_name": analysis.query_name,
+        "status": analysis.status.name if hasattr(analysis.status, 'name') else str(analysis.status),
+        "is_custom_dates": analysis.is_custom_dates,
+        "created_at": analysis.created_at.isoformat() if analysis.created_at else None,
+    }
+
+def serialize_bank_analysis(ba):
+    return {
+        "id": ba.id,
+        "analysis_id": ba.analysis_id,
+        "bank_name": ba.bank_name.name if hasattr(ba.bank_name, 'name') else str(ba.bank_name),
+        "start_date": ba.start_date.isoformat() if ba.start_date else None,
+        "end_date": ba.end_date.isoformat() if ba.end_date else None,
+        "total_mentions": ba.total_mentions or 0,
+        "positive_volume": ba.positive_volume or 0.0,
+        "negative_volume": ba.negative_volume or 0.0,
+        "iedi_mean": ba.iedi_mean,
+        "iedi_score": ba.iedi_score,
+        "summary": ba.summary,
+    }
 
 @analysis_bp.route("/api/analyses", methods=['GET'])
 def list_analyses():
     try:
-        analyses = AnalysisRepository.find_all()
+        analyses, next_cursor = analysis_service.find_page(
+            limit=request.args.get("limit"),
+            cursor=request.args.get("cursor"),
+            status=request.args.get("status"),
+            name_prefix=request.args.get("name_prefix"),
+            created_from=request.args.get("created_from"),
+            created_to=request.args.get("created_to"),
+        )
         return jsonify({
-            "analyses": [
-                {
-                    "id": a.id,
-                    "name": a.name,
-                    "query_name": a.query_name,
-                    "status": a.status.name if hasattr(a.status, 'name') else str(a.status),
-                    "is_custom_dates": a.is_custom_dates,
-                    "created_at": a.created_at.isoformat() if a.created_at else None,
-                }
-                for a in analyses
-            ]
+            "analyses": [serialize_analysis(a) for a in analyses],
+            "next_cursor": next_cursor,
         }), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @analysis_bp.route("/api/analyses/<analysis_id>", methods=['GET'])
 def get_analysis(analysis_id):
     try:
+        # Análises DONE são servidas do cache (ou 304) sem consultar o BigQuery
+        revision = job_service.revision(analysis_id)
+        cached = ResponseCache.get(("analysis", analysis_id), revision)
+        if cached:
+            return ResponseCache.respond(cached)
+
         analysis = AnalysisRepository.find_by_id(analysis_id)
         if not analysis:
             return jsonify({"error": "Análise não encontrada"}), 404
-        return jsonify({
-            "analysis": {
-                "id": analysis.id,
-                "name": analysis.name,
-                "query_name": analysis.query_name,
-                "status": analysis.status.name if hasattr(analysis.status, 'name') else str(analysis.status),
-                "is_custom_dates": analysis.is_custom_dates,
-                "created_at": analysis.created_at.isoformat() if analysis.created_at else None,
-            }
-        }), 200
+        payload = {"analysis": {**serialize_analysis(analysis), "resource_usage": analysis.resource_usage}}
+        if analysis.status == AnalysisStatus.DONE and revision is not None:
+            return ResponseCache.respond(ResponseCache.store(("analysis", analysis_id), payload, revision))
+        return jsonify(payload), 200
     except ValueError as e:
         return jsonify({"error": f"ID inválido: {str(e)}"}), 400
     except Exception as e:
@@ -51,32 +111,271 @@ def get_analysis(analysis_id):
 @analysis_bp.route("/api/analyses/<analysis_id>/banks", methods=['GET'])
 def get_bank_analyses(analysis_id):
     try:
+        revision = job_service.revision(analysis_id)
+        cached = ResponseCache.get(("banks", analysis_id), revision)
+        if cached:
+            return ResponseCache.respond(cached)
+
         analysis = AnalysisRepository.find_by_id(analysis_id)
         if not analysis:
             return jsonify({"error": "Análise não encontrada"}), 404
         bank_analyses = BankAnalysisRepository.find_by_analysis_id(analysis_id)
-        return jsonify({
-            "bank_analyses": [
-                {
-                    "id": ba.id,
-                    "analysis_id": ba.analysis_id,
-                    "bank_name": ba.bank_name.name if hasattr(ba.bank_name, 'name') else str(ba.bank_name),
-                    "start_date": ba.start_date.isoformat() if ba.start_date else None,
-                    "end_date": ba.end_date.isoformat() if ba.end_date else None,
-                    "total_mentions": ba.total_mentions or 0,
-                    "positive_volume": ba.positive_volume or 0.0,
-                    "negative_volume": ba.negative_volume or 0.0,
-                    "iedi_mean": ba.iedi_mean,
-                    "iedi_score": ba.iedi_score,
-                }
-                for ba in bank_analyses
-            ]
-        }), 200
+        payload = {"bank_analyses": [serialize_bank_analysis(ba) for ba in bank_analyses]}
+        if analysis.status == AnalysisStatus.DONE and revision is not None:
+            return ResponseCache.respond(ResponseCache.store(("banks", analysis_id), payload, revision))
+        return jsonify(payload), 200
+    except ValueError as e:
+        return jsonify({"error": f"ID inválido: {str(e)}"}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@analysis_bp.route("/api/analyses/<analysis_id>/dashboard", methods=['GET'])
+def get_analysis_dashboard(analysis_id):
+    """Distribuições por banco para os gráficos, lidas dos resumos de bank_analysis."""
+    try:
+        revision = job_service.revision(analysis_id)
+        cached = ResponseCache.get(("dashboard", analysis_id), revision)
+        if cached:
+            return ResponseCache.respond(cached)
+
+        analysis = AnalysisRepository.find_by_id(analysis_id)
+        if not analysis:
+            return jsonify({"error": "Análise não encontrada"}), 404
+        bank_analyses = BankAnalysisRepository.find_by_analysis_id(analysis_id)
+        payload = {"analysis_id": analysis_id, **bank_analysis_service.build_dashboard(bank_analyses)}
+        if analysis.status == AnalysisStatus.DONE and revision is not None:
+            return ResponseCache.respond(ResponseCache.store(("dashboard", analysis_id), payload, revision))
+        return jsonify(payload), 200
     except ValueError as e:
         return jsonify({"error": f"ID inválido: {str(e)}"}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def format_sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+@analysis_bp.route("/api/analyses/<analysis_id>/events", methods=['GET'])
+def stream_analysis_events(analysis_id):
+    """
+    Server-Sent Events com etapa, contadores e métricas parciais por banco.
+    Os eventos são lidos do registro local (publicados pelo processo que executa o job,
+    seja o gunicorn ou app.worker); se o job terminar sem publicar o fim (ex.: worker
+    morto), o estado final é detectado pelo resumo dos jobs.
+    """
+    if not sse_streams.acquire(blocking=False):
+        # O front segue atualizando pelo resumo dos jobs
+        return jsonify({"error": "Limite de acompanhamentos simultâneos atingido."}), 503, {"Retry-After": str(int(SSE_POLL_SECONDS))}
+
+    def generate():
+        snapshot = AnalysisEventBus.snapshot(analysis_id) or {"stage": None, "status": "PENDING", "progress": {}, "banks": {}, "last_event_id": None}
+        last_event_id = snapshot.pop("last_event_id")
+        summary = job_service.summarize(analysis_id)
+        yield format_sse("snapshot", {**snapshot, "jobs": summary})
+        if snapshot["stage"] == "done":
+            yield format_sse("done", {"status": snapshot["status"]})
+            return
+
+        deadline = time.monotonic() + SSE_MAX_SECONDS
+        next_summary = time.monotonic() + SSE_POLL_SECONDS
+        while time.monotonic() < deadline:
+            messages = AnalysisEventBus.read(analysis_id, last_event_id)
+            for message in messages:
+                last_event_id = message["id"]
+                yield format_sse(message["event"], message["data"])
+                if message["event"] == "done":
+                    return
+            if messages:
+                continue
+
+            if time.monotonic() >= next_summary:
+                next_summary = time.monotonic() + SSE_POLL_SECONDS
+                previous, summary = summary, job_service.summarize(analysis_id)
+                if summary != previous:
+                    yield format_sse("jobs", summary)
+                if summary["jobs"] and not summary["active"]:
+                    if summary["latest_status"] == "FAILED":
+                        yield format_sse("error", {"error": summary["latest_error"], "will_retry": False})
+                    else:
+                        yield format_sse("done", {"status": "DONE"})
+                    return
+                yield ": keepalive\n\n"
+            time.sleep(SSE_TAIL_SECONDS)
+
+    response = Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    # Liberado mesmo se o cliente desconectar antes do primeiro evento
+    response.call_on_close(sse_streams.release)
+    return response
+
+@analysis_bp.route("/api/bank-analyses", methods=['GET'])
+def get_bank_analyses_batch():
+    """
+    BankAnalysis de várias análises (?analysis_ids=a,b,c). As análises fora do cache
+    são lidas com uma única consulta IN; as finalizadas entram no cache por análise.
+    """
+    try:
+        analysis_ids = sorted({a.strip() for a in request.args.get("analysis_ids", "").split(",") if a.strip()})
+        if not analysis_ids:
+            return jsonify({"error": "É necessário informar ao menos uma análise."}), 400
+        if len(analysis_ids) > MAX_BATCH_ANALYSES:
+            return jsonify({"error": f"É possível consultar no máximo {MAX_BATCH_ANALYSES} análises por vez."}), 400
+
+        revisions = job_service.revisions(analysis_ids, settled_only=True)
+        result = {}
+        missing = []
+        for analysis_id in analysis_ids:
+            cached = ResponseCache.get(("banks", analysis_id), revisions[analysis_id])
+            if cached:
+                result[analysis_id] = cached.payload["bank_analyses"]
+            else:
+                missing.append(analysis_id)
+
+        if missing:
+            fetched = {analysis_id: [] for analysis_id in missing}
+            for ba in BankAnalysisRepository.find_by_analysis_ids(missing):
+                fetched[ba.analysis_id].append(serialize_bank_analysis(ba))
+            for analysis_id, bank_analyses in fetched.items():
+                result[analysis_id] = bank_analyses
+                if revisions[analysis_id] is not None:
+                    ResponseCache.store(("banks", analysis_id), {"bank_analyses": bank_analyses}, revisions[analysis_id])
+
+        return ResponseCache.respond(ResponseCache.build({"bank_analyses": result}))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def split_param(name):
+    return [value.strip() for value in request.args.get(name, "").split(",") if value.strip()]
+
+@analysis_bp.route("/api/analyses/<analysis_id>/export", methods=['GET'])
+def export_analysis(analysis_id):
+    """
+    Exporta mentions ⨝ mention_analysis em streaming (chunked).
+    ?format=csv|ndjson|parquet&columns=a,b&bank_names=ITAU&sentiments=negative
+    """
+    try:
+        options = export_service.validate(
+            analysis_id,
+            fmt=request.args.get("format"),
+            columns=split_param("columns"),
+            bank_names=split_param("bank_names"),
+            sentiments=split_param("sentiments"),
+        )
+        body = export_service.stream(
+            analysis_id,
+            options["fmt"],
+            options["columns"],
+            options["bank_values"],
+            options["sentiment_values"],
+        )
+        return Response(
+            stream_with_context(body),
+            content_type=export_service.FORMATS[options["fmt"]],
+            headers={"Content-Disposition": f'attachment; filename="iedi_{analysis_id}.{options["fmt"]}"'},
+        )
+    except FileNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@analysis_bp.route("/api/analyses/<analysis_id>/profile", methods=['GET'])
+def download_analysis_profile(analysis_id):
+    """
+    Perfil cProfile da última execução com profile=true.
+    ?format=prof (pstats binário) | text (&sort=cumulative&limit=50)
+    """
+    try:
+        options = profiling_service.validate(
+            fmt=request.args.get("format"),
+            sort=request.args.get("sort"),
+            limit=request.args.get("limit"),
+        )
+        body = profiling_service.export(analysis_id, options["fmt"], options["sort"], options["limit"])
+        headers = {}
+        if options["fmt"] == "prof":
+            headers["Content-Disposition"] = f'attachment; filename="profile_{analysis_id}.prof"'
+        return Response(body, content_type=profiling_service.FORMATS[options["fmt"]], headers=headers)
+    except FileNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@analysis_bp.route("/api/analyses/<analysis_id>/mentions", methods=['GET'])
+def list_analysis_mentions(analysis_id):
+    """
+    Menções pontuadas com filtros (listas separadas por vírgula), ordenação e cursor.
+    ?bank_name=ITAU&sentiment=negative&reach_group=A&headline_mentioned=true&sort=-iedi_score&limit=50
+    """
+    try:
+        filters = {column: split_param(column) for column in MentionIndex.FILTERS if request.args.get(column)}
+        page = mention_explorer_service.find_page(
+            analysis_id,
+            filters=filters,
+            sort=request.args.get("sort"),
+            limit=request.args.get("limit"),
+            cursor=request.args.get("cursor"),
+        )
+        return jsonify(page), 200
+    except FileNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@analysis_bp.route("/api/analyses/<analysis_id>/highlights", methods=['GET'])
+def get_analysis_highlights(analysis_id):
+    """Top-K/bottom-K menções por contribuição ao IEDI de cada banco (?k=10&bank_name=ITAU)."""
+    try:
+        return jsonify(highlight_service.find(
+            analysis_id,
+            k=request.args.get("k"),
+            bank_name=request.args.get("bank_name"),
+        )), 200
+    except FileNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@analysis_bp.route("/api/analyses/<analysis_id>/domains", methods=['GET'])
+def get_analysis_domains(analysis_id):
+    """Top-N domínios por banco (?bank_name=ITAU&sort=-contribution_share&limit=20)."""
+    try:
+        return jsonify(domain_metrics_service.find_top(
+            analysis_id,
+            bank_name=request.args.get("bank_name"),
+            sort=request.args.get("sort"),
+            limit=request.args.get("limit"),
+        )), 200
+    except FileNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@analysis_bp.route("/api/analyses/<analysis_id>/rejected-domains", methods=['GET'])
+def get_analysis_rejected_domains(analysis_id):
+    """Domínios não monitorados descartados (ou sinalizados) na coleta da análise (?limit=50)."""
+    try:
+        return jsonify(mention_service.find_rejected_domains(analysis_id, limit=request.args.get("limit"))), 200
+    except FileNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @analysis_bp.route("/api/analyses", methods=['POST'])
 def create_analysis():
     try:
@@ -88,6 +387,9 @@ def create_analysis():
         start_date = data.get("start_date")
         end_date = data.get("end_date")
         custom_bank_dates = data.get("custom_bank_dates", [])
+        sharded = data.get("sharded")
+        force = bool(data.get("force", False))
+        profile = bool(data.get("profile", False))
         analysis = analysis_service.save(
             name=name,
             query_name=query_name,
@@ -95,7 +397,10 @@ def create_analysis():
             bank_names=bank_names,
             start_date=start_date,
             end_date=end_date,
-            custom_bank_dates=custom_bank_dates
+            custom_bank_dates=custom_bank_dates,
+            sharded=sharded,
+            force=force,
+            profile=profile
         )
         return jsonify({
             "message": "Análise criada com sucesso.",
@@ -144,9 +449,11 @@ def restart_analysis(analysis_id):
             return jsonify({"error": "Nenhuma análise de banco encontrada para esta análise"}), 404
 
         parent_name = "Análise de Resultado - Bancos"
+        data = request.get_json(silent=True) or {}
+        profile = bool(data.get("profile", False))
 
-        analysis_service.process_and_update_status(analysis, bank_analyses, parent_name)
-        return jsonify({"message": "Processamento reiniciado com sucesso."}), 200
+        job = analysis_service.restart(analysis, bank_analyses, parent_name, profile=profile)
+        return jsonify({"message": "Processamento reiniciado com sucesso.", "job": job.to_dict()}), 202
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -154,175 +461,14 @@ def restart_analysis(analysis_id):
 @analysis_bp.route("/api/analyses/<analysis_id>/recalculate", methods=['POST'])
 def recalculate_analysis(analysis_id):
     try:
-        import pandas as pd
-        from pathlib import Path
-        from app.repositories.media_outlet_repository import MediaOutletRepository
-        from app.services.mention_analysis_service import MentionAnalysisService
-        from app.infra.csv_storage import CSVStorage
-        from app.enums.analysis_status import AnalysisStatus
-        
-        # 1. Validar análise
-        analysis = AnalysisRepository.find_by_id(analysis_id)
-        if not analysis:
-            return jsonify({"error": "Análise não encontrada"}), 404
-        
-        if analysis.status != AnalysisStatus.COMPLETED:
-            return jsonify({"error": f"Análise deve estar COMPLETED para recalcular. Status atual: {analysis.status.name}"}), 400
-        
-        # 2. Carregar mentions do CSV
-        mentions_csv_path = Path(f"data/mentions_{analysis_id}.csv")
-        if not mentions_csv_path.exists():
-            return jsonify({"error": f"CSV de mentions não encontrado: {mentions_csv_path}"}), 404
-        
-        mentions_df = pd.read_csv(mentions_csv_path)
-        total_mentions = len(mentions_df)
-        
-        # 3. Carregar media_outlets atualizados
-        media_outlets = MediaOutletRepository.find_all()
-        relevant_domains = {mo.domain for mo in media_outlets if not mo.is_niche}
-        niche_domains = {mo.domain for mo in media_outlets if mo.is_niche}
-        
-        # 4. Recalcular mention_analysis
-        mention_analyses = []
-        
-        for _, mention_row in mentions_df.iterrows():
-            # Extrair dados da mention
-            mention_id = mention_row['id']
-            domain = mention_row['domain']
-            sentiment = mention_row.get('sentiment', 'neutral')
-            reach = mention_row.get('reach', 0)
-            
-            # Classificar veículo
-            relevant_vehicle = domain in relevant_domains
-            niche_vehicle = domain in niche_domains
-            
-            # Calcular pontos (mesma lógica de MentionAnalysisService)
-            RELEVANT_OUTLET_WEIGHT = 95
-            NICHE_OUTLET_WEIGHT = 54
-            REACH_HIGH_WEIGHT = 100
-            REACH_MEDIUM_WEIGHT = 80
-            REACH_LOW_WEIGHT = 24
-            TITLE_MENTIONED_WEIGHT = 40
-            SUBTITLE_USED_WEIGHT = 20
-            
-            relevant_pts = RELEVANT_OUTLET_WEIGHT if relevant_vehicle else 0
-            niche_pts = NICHE_OUTLET_WEIGHT if niche_vehicle else 0
-            
-            # Classificar reach
-            if reach >= 1000000:
-                reach_group = "HIGH"
-                reach_pts = REACH_HIGH_WEIGHT
-            elif reach >= 100000:
-                reach_group = "MEDIUM"
-                reach_pts = REACH_MEDIUM_WEIGHT
-            else:
-                reach_group = "LOW"
-                reach_pts = REACH_LOW_WEIGHT
-            
-            # Título e subtítulo (assumir false se não existir)
-            title_mentioned = mention_row.get('title_mentioned', False)
-            subtitle_used = mention_row.get('subtitle_used', False)
-            title_pts = TITLE_MENTIONED_WEIGHT if title_mentioned else 0
-            subtitle_pts = SUBTITLE_USED_WEIGHT if subtitle_used else 0
-            
-            # Calcular IEDI
-            numerator = reach_pts + relevant_pts + niche_pts + title_pts + subtitle_pts
-            denominator = REACH_HIGH_WEIGHT + RELEVANT_OUTLET_WEIGHT + NICHE_OUTLET_WEIGHT + TITLE_MENTIONED_WEIGHT + SUBTITLE_USED_WEIGHT
-            
-            # Sentimento
-            sentiment_multiplier = 1 if sentiment == 'positive' else -1 if sentiment == 'negative' else 0
-            
-            iedi_mean = (numerator / denominator) * 10 if denominator > 0 else 0
-            iedi_score = iedi_mean * sentiment_multiplier
-            
-            # Criar mention_analysis
-            mention_analyses.append({
-                'mention_id': mention_id,
-                'bank_name': mention_row.get('bank_name', ''),
-                'sentiment': sentiment,
-                'reach_group': reach_group,
-                'niche_vehicle': niche_vehicle,
-                'title_mentioned': title_mentioned,
-                'subtitle_used': subtitle_used,
-                'relevant_vehicle': relevant_vehicle,
-                'iedi_mean': round(iedi_mean, 2),
-                'iedi_score': round(iedi_score, 2)
-            })
-        
-        # 5. Salvar mention_analysis atualizado
-        mention_analysis_df = pd.DataFrame(mention_analyses)
-        mention_analysis_csv_path = f"data/mention_analysis_{analysis_id}.csv"
-        mention_analysis_df.to_csv(mention_analysis_csv_path, index=False)
-        
-        # 6. Recalcular bank_analysis (agregados)
-        bank_analyses_updated = []
-        bank_analyses = BankAnalysisRepository.find_by_analysis_id(analysis_id)
-        
-        for ba in bank_analyses:
-            # Filtrar mentions deste banco
-            bank_mentions = mention_analysis_df[mention_analysis_df['bank_name'] == ba.bank_name.name]
-            
-            if len(bank_mentions) == 0:
-                continue
-            
-            # Calcular agregados
-            total_mentions = len(bank_mentions)
-            positive_mentions = bank_mentions[bank_mentions['iedi_score'] > 0]
-            negative_mentions = bank_mentions[bank_mentions['iedi_score'] < 0]
-            
-            positive_volume = len(positive_mentions)
-            negative_volume = len(negative_mentions)
-            
-            iedi_mean = bank_mentions['iedi_mean'].mean()
-            iedi_score = bank_mentions['iedi_score'].mean()
-            
-            # Atualizar bank_analysis
-            ba.total_mentions = total_mentions
-            ba.positive_volume = float(positive_volume)
-            ba.negative_volume = float(negative_volume)
-            ba.iedi_mean = round(iedi_mean, 2) if not pd.isna(iedi_mean) else None
-            ba.iedi_score = round(iedi_score, 2) if not pd.isna(iedi_score) else None
-            
-            bank_analyses_updated.append(ba)
-        
-        # 7. Salvar bank_analysis atualizado em CSV
-        bank_analysis_data = []
-        for ba in bank_analyses_updated:
-            bank_analysis_data.append({
-                'id': ba.id,
-                'analysis_id': ba.analysis_id,
-                'bank_name': ba.bank_name.name,
-                'start_date': ba.start_date,
-                'end_date': ba.end_date,
-                'total_mentions': ba.total_mentions,
-                'positive_volume': ba.positive_volume,
-                'negative_volume': ba.negative_volume,
-                'iedi_mean': ba.iedi_mean,
-                'iedi_score': ba.iedi_score
-            })
-        
-        bank_analysis_df = pd.DataFrame(bank_analysis_data)
-        bank_analysis_csv_path = f"data/bank_analysis_{analysis_id}.csv"
-        bank_analysis_df.to_csv(bank_analysis_csv_path, index=False)
-        
-        return jsonify({
-            "message": "Recálculo concluído com sucesso",
-            "details": {
-                "total_mentions": total_mentions,
-                "mentions_recalculated": len(mention_analyses),
-                "banks_updated": len(bank_analyses_updated),
-                "relevant_domains": len(relevant_domains),
-                "niche_domains": len(niche_domains)
-            }
-        }), 200
-        
+        recalculation_service.validate(analysis_id)
+        job = analysis_service.recalculate(analysis_id)
+        return jsonify({"message": "Recálculo enfileirado com sucesso.", "job": job.to_dict()}), 202
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
     except FileNotFoundError as e:
         return jsonify({"error": f"Arquivo não encontrado: {str(e)}"}), 404
     except ValueError as e:
         return jsonify({"error": f"Erro de validação: {str(e)}"}), 400
     except Exception as e:
-        import traceback
-        return jsonify({
-            "error": f"Erro ao recalcular: {str(e)}",
-            "traceback": traceback.format_exc()
-        }), 500
+        return jsonify({"error": f"Erro ao recalcular: {str(e)}"}), 500
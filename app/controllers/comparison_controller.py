@@ -0,0 +1,15 @@
+from app.services.comparison_service import ComparisonService
+from flask import Blueprint, jsonify, request
+
+comparison_bp = Blueprint("comparison", __name__)
+comparison_service = ComparisonService()
+
+@comparison_bp.route("/api/comparisons", methods=['GET'])
+def compare_analyses():
+    try:
+        analysis_ids = request.args.get("analysis_ids", "").split(",")
+        return jsonify({"comparison": comparison_service.compare(analysis_ids)}), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -0,0 +1,28 @@
+from app.services.job_service import JobService
+from flask import Blueprint, jsonify
+
+job_bp = Blueprint("job", __name__)
+job_service = JobService()
+
+@job_bp.route("/api/jobs/<job_id>", methods=['GET'])
+def get_job(job_id):
+    try:
+        return jsonify({"job": job_service.find_by_id(job_id).to_dict()}), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@job_bp.route("/api/analyses/<analysis_id>/jobs", methods=['GET'])
+def list_analysis_jobs(analysis_id):
+    try:
+        return jsonify({"jobs": [job.to_dict() for job in job_service.find_by_analysis_id(analysis_id)]}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@job_bp.route("/api/jobs", methods=['GET'])
+def queue_status():
+    try:
+        return jsonify({"queue": job_service.queue_depth()}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
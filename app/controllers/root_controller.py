@@ -1,4 +1,5 @@
-from flask import Blueprint, render_template
+from app.infra.metrics import Metrics
+from flask import Blueprint, Response, render_template
 
 root_bp = Blueprint("root", __name__)
 
@@ -18,3 +19,10 @@ def detail():
 def create():
     """Criação de nova análise"""
     return render_template("create.html")
+
+
+@root_bp.route("/metrics")
+def metrics():
+    """Métricas no formato Prometheus (etapas, páginas do Brandwatch e fila de jobs)"""
+    body, content_type = Metrics.render()
+    return Response(body, content_type=content_type)
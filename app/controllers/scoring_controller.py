@@ -0,0 +1,17 @@
+from app.services.scoring_service import ScoringService
+from flask import Blueprint, jsonify, request
+
+scoring_bp = Blueprint("scoring", __name__)
+scoring_service = ScoringService()
+
+@scoring_bp.route("/api/score", methods=['POST'])
+def score_mentions():
+    """Pontua um lote de menções (formato Brandwatch) para os bancos informados, sem criar análise."""
+    try:
+        return jsonify(scoring_service.score(request.get_json(silent=True))), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except TimeoutError:
+        return jsonify({"error": "Tempo esgotado ao pontuar as menções."}), 503
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -0,0 +1,6 @@
+from enum import Enum
+
+class CoalescingStatus(Enum):
+    IN_FLIGHT = "Em andamento"
+    DONE = "Finalizada"
+    FAILED = "Falhou"
@@ -0,0 +1,7 @@
+from enum import Enum
+
+class JobStatus(Enum):
+    QUEUED = "Na fila"
+    RUNNING = "Em execução"
+    DONE = "Finalizado"
+    FAILED = "Falhou"
@@ -0,0 +1,9 @@
+from enum import Enum
+
+class JobType(Enum):
+    PROCESS_ANALYSIS = "Processar análise"
+    RESTART_ANALYSIS = "Reiniciar análise"
+    RECALCULATE_ANALYSIS = "Recalcular análise"
+    ANALYSIS_SHARD = "Processar shard de análise"
+    MERGE_SHARDS = "Consolidar shards de análise"
+    COPY_RESULTS = "Copiar resultados de análise idêntica"
@@ -1,13 +1,26 @@
 import os
 import json
 from contextlib import contextmanager
-from google.cloud import bigquery
-from google.oauth2 import service_account
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
+from app.infra.metrics import Metrics
+from app.infra.resource_tracker import ResourceTracker
+
 _engine = None
 _session_maker = None
+_credentials_info = None
+
+def get_credentials_info():
+    """Lê o JSON da service account uma vez; sobrevive a dispose_engine (workers pós-fork)."""
+    global _credentials_info
+    if _credentials_info is None:
+        credentials_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
+        if not credentials_path:
+            raise ValueError("Missing GOOGLE_APPLICATION_CREDENTIALS")
+        with open(credentials_path, 'r') as f:
+            _credentials_info = json.load(f)
+    return _credentials_info
 
 def get_engine():
     global _engine
@@ -18,16 +31,21 @@ def get_engine():
         if not credentials_path or not project_id:
             raise ValueError("Missing GOOGLE_APPLICATION_CREDENTIALS or GOOGLE_CLOUD_PROJECT_ID")
         
-        with open(credentials_path, 'r') as f:
-            credentials_info = json.load(f)
-        
         connection_string = f"bigquery://{project_id}"
         
         _engine = create_engine(
             connection_string,
-            credentials_info=credentials_info,
+            credentials_info=get_credentials_info(),
             echo=False
         )
+
+        @event.listens_for(_engine, "after_cursor_execute")
+        def track_query(conn, cursor, statement, parameters, context, executemany):
+            # O cursor DB-API do BigQuery guarda o job da última consulta
+            query_job = getattr(cursor, "_query_job", None)
+            bytes_processed = getattr(query_job, "total_bytes_processed", 0) or 0
+            ResourceTracker.add(bigquery_queries=1, bigquery_bytes=bytes_processed)
+            Metrics.bigquery_query(bytes_processed)
     
     return _engine
 
@@ -48,7 +66,19 @@ def get_session():
     finally:
         session.close()
 
+def dispose_engine():
+    """Descarta o engine herdado do processo pai (chamar após fork)."""
+    global _engine, _session_maker
+    if _engine is not None:
+        _engine.dispose()
+    _engine = None
+    _session_maker = None
+
 def get_bigquery_client():
+    # Import tardio: google-cloud-bigquery só é carregado por quem consulta o BigQuery
+    from google.cloud import bigquery
+    from google.oauth2 import service_account
+
     credentials_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
     project_id = os.getenv("GOOGLE_CLOUD_PROJECT_ID")
     
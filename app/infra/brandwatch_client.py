@@ -1,14 +1,33 @@
-from bcr_api.bwproject import BWProject
-from bcr_api.bwresources import BWQueries
 import os
 
+from app.infra.resource_tracker import ResourceTracker
+
 class BrandwatchClient:
 
     def __init__(self):
+        # Import tardio: o bcr_api só é carregado quando uma coleta é iniciada
+        from bcr_api.bwproject import BWProject
+        from bcr_api.bwresources import BWQueries
+
         project = BWProject(
             project=os.getenv("BRANDWATCH_PROJECT_ID"),
             username=os.getenv("BRANDWATCH_USERNAME"),
             password=os.getenv("BRANDWATCH_PASSWORD")
         )
 
+        self.count_response_bytes(project)
         self.queries = BWQueries(project)
+
+    @staticmethod
+    def count_response_bytes(project):
+        """Soma em brandwatch_bytes o corpo de cada resposta HTTP do projeto (já lido pelo requests)."""
+        bare_request = project.bare_request
+
+        def counted_bare_request(verb, *args, **kwargs):
+            def counted_verb(*verb_args, **verb_kwargs):
+                response = verb(*verb_args, **verb_kwargs)
+                ResourceTracker.add(brandwatch_bytes=len(response.content))
+                return response
+            return bare_request(counted_verb, *args, **kwargs)
+
+        project.bare_request = counted_bare_request
@@ -1,9 +1,18 @@
-import pandas as pd
+from __future__ import annotations
+
+import json
 import os
+import shutil
 from pathlib import Path
 from typing import List, Dict, Any
 from datetime import datetime
 
+from app.infra.metrics import Metrics
+from app.infra.resource_tracker import ResourceTracker
+from app.utils.lazy_import import lazy_import
+
+pd = lazy_import("pandas")
+
 class CSVStorage:
     """
     Classe para persistência de dados em CSV usando Pandas.
@@ -11,6 +20,23 @@ class CSVStorage:
     """
     
     DATA_DIR = Path(__file__).parent.parent.parent / "data"
+
+    MENTION_COLUMNS = [
+        'url', 'title', 'snippet', 'full_text', 'domain',
+        'published_date', 'sentiment', 'categories', 'monthly_visitors',
+        'created_at', 'updated_at'
+    ]
+
+    MENTION_ANALYSIS_COLUMNS = [
+        'mention_url', 'bank_name', 'sentiment', 'reach_group',
+        'niche_vehicle', 'title_mentioned', 'subtitle_used', 'subtitle_mentioned',
+        'iedi_score', 'iedi_normalized', 'numerator', 'denominator'
+    ]
+
+    # Colunas de partição/cluster de iedi.mention_analysis, copiadas da menção. Vão no arquivo
+    # (para a carga no BigQuery cair na partição certa); as leituras usam MENTION_ANALYSIS_COLUMNS
+    # e pegam essas colunas da própria menção.
+    MENTION_ANALYSIS_FILE_COLUMNS = MENTION_ANALYSIS_COLUMNS + ['published_date', 'domain']
     
     @classmethod
     def ensure_data_dir(cls):
@@ -36,11 +62,7 @@ class CSVStorage:
         df = pd.DataFrame(mentions)
         
         # Garantir que colunas existam (mesmo que vazias)
-        expected_columns = [
-            'url', 'title', 'snippet', 'full_text', 'domain',
-            'published_date', 'sentiment', 'categories', 'monthly_visitors',
-            'created_at', 'updated_at'
-        ]
+        expected_columns = cls.MENTION_COLUMNS
         
         for col in expected_columns:
             if col not in df.columns:
@@ -64,7 +86,9 @@ class CSVStorage:
             df = df.drop_duplicates(subset=['url'], keep='last')
 
         # Salvar CSV
-        df.to_csv(file_path, index=False, encoding='utf-8')
+        with Metrics.stage("write_mentions_csv", len(mentions)):
+            df.to_csv(file_path, index=False, encoding='utf-8')
+        ResourceTracker.add(rows_written=len(mentions))
         
         print(f"[CSVStorage] Salvos {len(mentions)} mentions em {file_path}")
     
@@ -87,11 +111,7 @@ class CSVStorage:
         df = pd.DataFrame(mention_analyses)
 
         # Garantir que colunas esperadas existam
-        expected_columns = [
-            'mention_url', 'bank_name', 'sentiment', 'reach_group',
-            'niche_vehicle', 'title_mentioned', 'subtitle_used', 'subtitle_mentioned',
-            'iedi_score', 'iedi_normalized', 'numerator', 'denominator'
-        ]
+        expected_columns = cls.MENTION_ANALYSIS_FILE_COLUMNS
         for col in expected_columns:
             if col not in df.columns:
                 df[col] = None
@@ -119,10 +139,176 @@ class CSVStorage:
             df = df.drop_duplicates(subset=['mention_url', 'bank_name'], keep='last')
 
         # Salvar CSV
-        df.to_csv(file_path, index=False, encoding='utf-8')
+        with Metrics.stage("write_mention_analysis_csv", len(mention_analyses)):
+            df.to_csv(file_path, index=False, encoding='utf-8')
+        ResourceTracker.add(rows_written=len(mention_analyses))
         
         print(f"[CSVStorage] Salvos {len(mention_analyses)} mention_analysis em {file_path}")
     
+    # ========================================
+    # SHARDS (execução distribuída de uma análise)
+    # ========================================
+
+    @classmethod
+    def shard_dir(cls, analysis_id: str, plan_id: str) -> Path:
+        return cls.DATA_DIR / "shards" / analysis_id / plan_id
+
+    @classmethod
+    def write_atomic(cls, file_path: Path, write):
+        """Escreve em arquivo temporário e renomeia: um shard re-executado sobrescreve sem deixar arquivo parcial."""
+        tmp_path = file_path.with_name(f".{file_path.name}.{os.getpid()}.tmp")
+        write(tmp_path)
+        os.replace(tmp_path, file_path)
+
+    @classmethod
+    def save_shard(cls, analysis_id: str, plan_id: str, unit_key: str,
+                   mentions: List[Dict[str, Any]], mention_analyses: List[Dict[str, Any]], aggregates: Dict[str, Any]):
+        """
+        Salva o resultado parcial de um shard. O JSON de agregados é escrito por último
+        e marca o shard como concluído.
+        """
+        shard_dir = cls.shard_dir(analysis_id, plan_id)
+        shard_dir.mkdir(parents=True, exist_ok=True)
+
+        mentions_df = pd.DataFrame(mentions)
+        analyses_df = pd.DataFrame(mention_analyses)
+        cls.write_atomic(shard_dir / f"{unit_key}.mentions.csv",
+                         lambda path: mentions_df.to_csv(path, index=False, encoding='utf-8'))
+        cls.write_atomic(shard_dir / f"{unit_key}.mention_analysis.csv",
+                         lambda path: analyses_df.to_csv(path, index=False, encoding='utf-8'))
+
+        def write_aggregates(path):
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(aggregates, f, ensure_ascii=False, sort_keys=True)
+        cls.write_atomic(shard_dir / f"{unit_key}.json", write_aggregates)
+        ResourceTracker.add(rows_written=len(mentions_df) + len(analyses_df))
+
+    @classmethod
+    def load_shard_aggregates(cls, analysis_id: str, plan_id: str) -> Dict[str, Dict[str, Any]]:
+        """Agregados dos shards concluídos, ordenados pela chave da unidade."""
+        shard_dir = cls.shard_dir(analysis_id, plan_id)
+        if not shard_dir.exists():
+            return {}
+        aggregates = {}
+        for file_path in sorted(shard_dir.glob("*.json")):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                aggregates[file_path.stem] = json.load(f)
+        return aggregates
+
+    @classmethod
+    def load_shard_frame(cls, analysis_id: str, plan_id: str, unit_key: str, kind: str) -> pd.DataFrame:
+        file_path = cls.shard_dir(analysis_id, plan_id) / f"{unit_key}.{kind}.csv"
+        try:
+            return pd.read_csv(file_path)
+        except pd.errors.EmptyDataError:
+            return pd.DataFrame()
+
+    @classmethod
+    def merge_shards(cls, analysis_id: str, plan_id: str, unit_keys: List[str]) -> Dict[str, int]:
+        """
+        Consolida os CSVs parciais nos arquivos finais da análise, concatenando os shards
+        na ordem recebida (determinística) sem carregar todos em memória ao mesmo tempo.
+        Uma menção coletada por mais de um shard (ex.: citada por dois bancos) fica uma
+        única vez em mentions, como em save_mentions; em mention_analysis a chave é url + banco.
+        """
+        cls.ensure_data_dir()
+        counts = {}
+        for kind, columns, unique in (("mentions", cls.MENTION_COLUMNS, ["url"]),
+                                      ("mention_analysis", cls.MENTION_ANALYSIS_FILE_COLUMNS, ["mention_url", "bank_name"])):
+            def write(path, kind=kind, columns=columns, unique=unique):
+                rows = 0
+                header = True
+                seen = set()
+                with open(path, 'w', encoding='utf-8', newline='') as f:
+                    for unit_key in unit_keys:
+                        df = cls.load_shard_frame(analysis_id, plan_id, unit_key, kind)
+                        if df.empty:
+                            continue
+                        df = df.reindex(columns=columns).drop_duplicates(subset=unique)
+                        keys = list(df[unique].itertuples(index=False, name=None))
+                        df = df[[key not in seen for key in keys]]
+                        seen.update(keys)
+                        if df.empty:
+                            continue
+                        df.to_csv(f, index=False, header=header)
+                        header = False
+                        rows += len(df)
+                    if header:
+                        pd.DataFrame(columns=columns).to_csv(f, index=False)
+                counts[kind] = rows
+
+            cls.write_atomic(cls.DATA_DIR / f"{kind}_{analysis_id}.csv", write)
+
+        ResourceTracker.add(rows_written=sum(counts.values()))
+        print(f"[CSVStorage] Shards consolidados (analysis_id={analysis_id}): {counts}")
+        return counts
+
+    @classmethod
+    def copy_analysis_files(cls, source_analysis_id: str, target_analysis_id: str) -> List[str]:
+        """Copia os CSVs (e os relatórios por coleta) de uma análise para outra (coalescência de análises idênticas)."""
+        cls.ensure_data_dir()
+        copied = []
+        sources = [cls.DATA_DIR / f"{prefix}_{source_analysis_id}.csv" for prefix in ("mentions", "mention_analysis")]
+        sources += sorted(cls.DATA_DIR.glob(f"rejected_domains_{source_analysis_id}_*.json"))
+        for source in sources:
+            if not source.exists():
+                continue
+            target = cls.DATA_DIR / source.name.replace(source_analysis_id, target_analysis_id, 1)
+            cls.write_atomic(target, lambda path, source=source: shutil.copyfile(source, path))
+            copied.append(target.name)
+        print(f"[CSVStorage] Copiados {copied} de {source_analysis_id}")
+        return copied
+
+    @classmethod
+    def save_json(cls, prefix: str, analysis_id: str, payload: Dict[str, Any]):
+        """Grava um resultado derivado da análise (ex.: destaques) em data/<prefix>_<id>.json."""
+        cls.ensure_data_dir()
+
+        def write(path):
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, ensure_ascii=False, default=str)
+        cls.write_atomic(cls.DATA_DIR / f"{prefix}_{analysis_id}.json", write)
+
+    @classmethod
+    def load_json(cls, prefix: str, analysis_id: str):
+        file_path = cls.DATA_DIR / f"{prefix}_{analysis_id}.json"
+        if not file_path.exists():
+            return None
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    @classmethod
+    def load_json_parts(cls, prefix: str, analysis_id: str) -> List[Dict[str, Any]]:
+        """Todos os data/<prefix>_<id>_<parte>.json da análise (ex.: um por coleta), em ordem de nome."""
+        parts = []
+        for file_path in sorted(cls.DATA_DIR.glob(f"{prefix}_{analysis_id}_*.json")):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                parts.append(json.load(f))
+        return parts
+
+    @classmethod
+    def delete_json_parts(cls, prefix: str, analysis_id: str) -> int:
+        removed = 0
+        for file_path in cls.DATA_DIR.glob(f"{prefix}_{analysis_id}_*.json"):
+            file_path.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+    @classmethod
+    def iter_csv(cls, prefix: str, analysis_id: str, columns: List[str] = None, chunksize: int = 50_000):
+        """
+        Lê o CSV da análise em blocos de `chunksize` linhas, apenas com as colunas pedidas
+        (as que não existirem no arquivo são ignoradas). Não gera nada se o arquivo não existir.
+        """
+        file_path = cls.DATA_DIR / f"{prefix}_{analysis_id}.csv"
+        if not file_path.exists():
+            return
+        usecols = (lambda column: column in columns) if columns else None
+        try:
+            yield from pd.read_csv(file_path, usecols=usecols, chunksize=chunksize)
+        except pd.errors.EmptyDataError:
+            return
+
     @classmethod
     def load_mentions(cls, analysis_id: str) -> pd.DataFrame:
         """
@@ -0,0 +1,105 @@
+import os
+import threading
+
+from app.models.analysis_event import AnalysisEvent
+from app.repositories.analysis_event_repository import AnalysisEventRepository
+
+class AnalysisEventBus:
+    """
+    Andamento das análises (etapa, contadores e métricas parciais por banco) publicado
+    como eventos no registro local (SQLite), compartilhado entre os workers do gunicorn
+    e os processos de app.worker. O endpoint SSE acompanha os eventos da análise por id,
+    sem consultar o BigQuery; o snapshot é o estado acumulado dos eventos da execução atual.
+    """
+
+    RETENTION_SECONDS = float(os.getenv("IEDI_EVENT_RETENTION_SECONDS", str(24 * 3600)))
+    READ_LIMIT = 500
+
+    _local = threading.local()
+
+    @classmethod
+    def set_context(cls, analysis_id):
+        cls._local.analysis_id = analysis_id
+
+    @classmethod
+    def clear_context(cls):
+        cls._local.analysis_id = None
+
+    @classmethod
+    def current(cls):
+        return getattr(cls._local, "analysis_id", None)
+
+    @classmethod
+    def read(cls, analysis_id, after_id=None):
+        """Eventos publicados depois de after_id, em ordem: [{"id", "event", "data", "timestamp"}]."""
+        return [
+            {"id": row.id, "event": row.event, "data": row.data, "timestamp": row.created_at}
+            for row in AnalysisEventRepository.find_after(analysis_id, after_id, cls.READ_LIMIT)
+        ]
+
+    @classmethod
+    def snapshot(cls, analysis_id):
+        """Estado acumulado e id do último evento (para continuar a leitura a partir dele); None sem eventos."""
+        state = {"stage": None, "status": "PENDING", "progress": {}, "banks": {}}
+        last_id = None
+        for row in AnalysisEventRepository.find_after(analysis_id):
+            cls.apply(state, row.event, row.data)
+            last_id = row.id
+        if last_id is None:
+            return None
+        return {**state, "last_event_id": last_id}
+
+    @classmethod
+    def reset(cls, analysis_id):
+        """Descarta os eventos de execuções anteriores da análise (início de processamento ou reinício)."""
+        try:
+            AnalysisEventRepository.delete_by_analysis_id(analysis_id)
+        except Exception as e:
+            print(f"[AnalysisEventBus] Falha ao limpar eventos de {analysis_id}: {e}")
+
+    @classmethod
+    def publish(cls, analysis_id, event, data=None):
+        if not analysis_id:
+            return
+        try:
+            AnalysisEventRepository.save(AnalysisEvent(analysis_id=analysis_id, event=event, data=data or {}))
+            if event == "done":
+                AnalysisEventRepository.delete_older_than(cls.RETENTION_SECONDS)
+        except Exception as e:
+            # Andamento é informativo: falha no registro não interrompe o job
+            print(f"[AnalysisEventBus] Falha ao publicar {event} de {analysis_id}: {e}")
+
+    @classmethod
+    def apply(cls, state, event, data):
+        if event == "stage":
+            state["stage"] = data.get("stage")
+        elif event == "progress":
+            for key, value in data.items():
+                state["progress"][key] = state["progress"].get(key, 0) + value
+        elif event == "bank":
+            state["banks"][data["bank_name"]] = data
+        elif event == "done":
+            state["status"] = data.get("status", "DONE")
+            state["stage"] = "done"
+        elif event == "error":
+            state["stage"] = "error"
+
+    @classmethod
+    def stage(cls, stage, **data):
+        cls.publish(cls.current(), "stage", {"stage": stage, **data})
+
+    @classmethod
+    def progress(cls, **counters):
+        """Contadores aditivos (ex.: pages=1, mentions=5000) da análise do contexto."""
+        cls.publish(cls.current(), "progress", counters)
+
+    @classmethod
+    def bank(cls, bank_analysis):
+        cls.publish(bank_analysis.analysis_id or cls.current(), "bank", {
+            "bank_name": bank_analysis.bank_name.name,
+            "total_mentions": bank_analysis.total_mentions or 0,
+            "positive_volume": bank_analysis.positive_volume or 0.0,
+            "negative_volume": bank_analysis.negative_volume or 0.0,
+            "iedi_mean": bank_analysis.iedi_mean,
+            "iedi_score": bank_analysis.iedi_score,
+        })
@@ -0,0 +1,53 @@
+import threading
+
+from app.repositories.job_repository import JobRepository
+
+class JobLease:
+    """
+    Lease do job em execução na thread corrente (por thread do pool, como o ResourceTracker).
+    O JobHeartbeat marca o lease como perdido quando outro worker reserva o job; as etapas
+    chamam check() antes de gravar resultados, para que só o dono atual do job grave.
+    Fora de um job (ex.: requisições web) as chamadas não fazem nada.
+    """
+
+    _local = threading.local()
+
+    def __init__(self, job_id, worker_id):
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self._lost = threading.Event()
+
+    def mark_lost(self):
+        self._lost.set()
+
+    def is_lost(self) -> bool:
+        return self._lost.is_set()
+
+    @classmethod
+    def start(cls, job_id, worker_id) -> "JobLease":
+        cls._local.lease = cls(job_id, worker_id)
+        return cls._local.lease
+
+    @classmethod
+    def clear(cls):
+        cls._local.lease = None
+
+    @classmethod
+    def current(cls):
+        return getattr(cls._local, "lease", None)
+
+    @classmethod
+    def held(cls) -> bool:
+        """Confirma (renovando) que o job ainda é desta thread; o heartbeat pode não ter notado a perda."""
+        lease = cls.current()
+        if lease is None:
+            return True
+        if not lease.is_lost() and not JobRepository.heartbeat(lease.job_id, lease.worker_id):
+            lease.mark_lost()
+        return not lease.is_lost()
+
+    @classmethod
+    def check(cls):
+        if not cls.held():
+            lease = cls.current()
+            raise RuntimeError(f"Lease do job {lease.job_id} perdido por {lease.worker_id}; resultados não gravados.")
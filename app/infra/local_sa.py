@@ -0,0 +1,72 @@
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+
+# Banco SQLite local (fila de jobs e demais controles de execução).
+# Compartilhado entre os workers web e os processos de worker via volume data/.
+LocalBase = declarative_base()
+
+DEFAULT_LOCAL_DB_PATH = Path(__file__).parent.parent.parent / "data" / "iedi_local.sqlite3"
+
+_local_engine = None
+_local_session_maker = None
+
+def get_local_db_path() -> Path:
+    return Path(os.getenv("IEDI_LOCAL_DB_PATH", DEFAULT_LOCAL_DB_PATH))
+
+def get_local_engine():
+    global _local_engine
+    if _local_engine is None:
+        db_path = get_local_db_path()
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        _local_engine = create_engine(
+            f"sqlite:///{db_path}",
+            connect_args={"timeout": 30, "check_same_thread": False},
+            echo=False
+        )
+
+        @event.listens_for(_local_engine, "connect")
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute("PRAGMA busy_timeout=30000")
+            cursor.close()
+
+        LocalBase.metadata.create_all(_local_engine)
+
+    return _local_engine
+
+@contextmanager
+def get_local_session(immediate: bool = False):
+    """
+    immediate=True abre a transação já com o lock de escrita (BEGIN IMMEDIATE): leituras
+    e escritas do bloco ficam serializadas com as de outros processos (ler-e-decidir atômico).
+    """
+    global _local_session_maker
+    if _local_session_maker is None:
+        _local_session_maker = sessionmaker(bind=get_local_engine(), expire_on_commit=False)
+
+    session = _local_session_maker()
+    try:
+        if immediate:
+            session.connection().exec_driver_sql("BEGIN IMMEDIATE")
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+def dispose_local_engine():
+    """Descarta conexões herdadas (chamar após fork de processos)."""
+    global _local_engine, _local_session_maker
+    if _local_engine is not None:
+        _local_engine.dispose()
+    _local_engine = None
+    _local_session_maker = None
@@ -0,0 +1,193 @@
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# Com PROMETHEUS_MULTIPROC_DIR definido (gunicorn com vários workers + app.worker), cada
+# processo grava suas séries em arquivos mmap nesse diretório e o /metrics soma todos.
+# Cada serviço tem o seu diretório (limpo só por ele ao subir); IEDI_METRICS_DIRS lista
+# os diretórios somados pelo /metrics (padrão: o próprio PROMETHEUS_MULTIPROC_DIR).
+# O diretório precisa existir antes de o prometheus_client criar as métricas.
+if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+    Path(os.environ["PROMETHEUS_MULTIPROC_DIR"]).mkdir(parents=True, exist_ok=True)
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+
+from app.infra.resource_tracker import ResourceTracker
+
+BYTES_BUCKETS = (0, 1e6, 1e7, 1e8, 1e9, 1e10, 1e11, 1e12)
+ROWS_PER_SECOND_BUCKETS = (100, 500, 1_000, 2_500, 5_000, 10_000, 25_000, 50_000, 100_000, 250_000, 1_000_000)
+
+class Stage:
+    """Timer de uma etapa; `rows` pode ser definido dentro do bloco, quando o volume só é conhecido no fim."""
+
+    def __init__(self, name, rows=None):
+        self.name = name
+        self.rows = rows
+        self.seconds = None
+
+class Metrics:
+    """
+    Timers e contadores por etapa do pipeline (coleta, filtro, pontuação, agregação,
+    gravação), latência por página do Brandwatch e profundidade da fila de jobs,
+    expostos no formato Prometheus em /metrics.
+    """
+
+    STAGE_SECONDS = Histogram(
+        "iedi_stage_seconds", "Duração de cada execução de uma etapa do pipeline.", ["stage"],
+        buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+    )
+    STAGE_ROWS = Counter("iedi_stage_rows", "Linhas processadas por etapa.", ["stage"])
+    STAGE_ROWS_PER_SECOND = Histogram(
+        "iedi_stage_rows_per_second", "Vazão (linhas/s) de cada execução de uma etapa.", ["stage"],
+        buckets=ROWS_PER_SECOND_BUCKETS,
+    )
+    PAGE_SECONDS = Histogram(
+        "iedi_brandwatch_page_seconds", "Latência de cada página de menções do Brandwatch.",
+        buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 40, 80, 160),
+    )
+    PAGE_MENTIONS = Counter("iedi_brandwatch_mentions", "Menções recebidas do Brandwatch.")
+    QUEUE_DEPTH = Histogram(
+        "iedi_job_queue_depth", "Jobs na fila (QUEUED), observados a cada job reservado.",
+        buckets=(0, 1, 2, 5, 10, 20, 50, 100, 250, 500, 1000),
+    )
+    JOB_SECONDS = Histogram(
+        "iedi_job_seconds", "Duração de cada execução de job.", ["job_type"],
+        buckets=(0.1, 0.5, 1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600),
+    )
+    JOBS = Counter("iedi_jobs", "Execuções de jobs por resultado.", ["job_type", "outcome"])
+    BIGQUERY_QUERY_BYTES = Histogram(
+        "iedi_bigquery_query_bytes", "Bytes processados por consulta ao BigQuery, por origem (endpoint HTTP ou job).", ["origin"],
+        buckets=BYTES_BUCKETS,
+    )
+    QUERY_CACHE = Counter("iedi_query_cache", "Consultas dos repositórios servidas pelo cache (hit) ou pelo BigQuery (miss).", ["table", "result"])
+    DOMAIN_REJECTED = Counter("iedi_domain_rejected_mentions", "Menções de domínios não monitorados, por modo (drop remove, flag só reporta).", ["mode"])
+
+    _origin = threading.local()
+
+    @classmethod
+    @contextmanager
+    def stage(cls, name, rows=None):
+        stage = Stage(name, rows)
+        started = time.perf_counter()
+        try:
+            yield stage
+        finally:
+            stage.seconds = time.perf_counter() - started
+            cls.record_stage(stage)
+
+    @classmethod
+    def record_stage(cls, stage: Stage):
+        cls.STAGE_SECONDS.labels(stage.name).observe(stage.seconds)
+        ResourceTracker.stage(stage.name, stage.seconds)
+        if stage.rows:
+            cls.STAGE_ROWS.labels(stage.name).inc(stage.rows)
+            if stage.seconds > 0:
+                cls.STAGE_ROWS_PER_SECOND.labels(stage.name).observe(stage.rows / stage.seconds)
+
+    @classmethod
+    def page(cls, seconds, mentions):
+        cls.PAGE_SECONDS.observe(seconds)
+        cls.PAGE_MENTIONS.inc(mentions)
+
+    @classmethod
+    def job(cls, job_type, seconds, outcome):
+        cls.JOB_SECONDS.labels(job_type).observe(seconds)
+        cls.JOBS.labels(job_type, outcome).inc()
+
+    @classmethod
+    @contextmanager
+    def origin(cls, name):
+        """Origem atribuída às consultas feitas fora de uma requisição HTTP (ex.: job:PROCESS_ANALYSIS)."""
+        previous = getattr(cls._origin, "name", None)
+        cls._origin.name = name
+        try:
+            yield
+        finally:
+            cls._origin.name = previous
+
+    @classmethod
+    def current_origin(cls):
+        from flask import has_request_context, request
+
+        if has_request_context():
+            return request.endpoint or "unknown"
+        return getattr(cls._origin, "name", None) or "other"
+
+    @classmethod
+    def bigquery_query(cls, bytes_processed):
+        cls.BIGQUERY_QUERY_BYTES.labels(cls.current_origin()).observe(bytes_processed)
+
+    @classmethod
+    def query_cache(cls, table, result):
+        cls.QUERY_CACHE.labels(table, result).inc()
+
+    @classmethod
+    def domain_rejected(cls, mode, mentions):
+        if mentions:
+            cls.DOMAIN_REJECTED.labels(mode).inc(mentions)
+
+    @classmethod
+    def multiprocess_dirs(cls):
+        dirs = [path.strip() for path in os.getenv("IEDI_METRICS_DIRS", "").split(",") if path.strip()]
+        return dirs or [os.environ["PROMETHEUS_MULTIPROC_DIR"]]
+
+    @classmethod
+    def reset_multiprocess_dir(cls):
+        """
+        Esvazia o PROMETHEUS_MULTIPROC_DIR do serviço ao subir: arquivos de pids de uma
+        execução anterior seriam somados para sempre. Só o dono do diretório deve chamar.
+        """
+        multiproc_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+        if not multiproc_dir:
+            return None
+        path = Path(multiproc_dir)
+        if path.exists():
+            shutil.rmtree(path)
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    @classmethod
+    def render(cls):
+        """Corpo e content type do /metrics (somando os processos em modo multiprocess)."""
+        queue_registry = CollectorRegistry()
+        queue_registry.register(JobQueueCollector())
+        if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+            from prometheus_client import multiprocess
+
+            registry = CollectorRegistry()
+            registry.register(MultiProcessDirsCollector(cls.multiprocess_dirs()))
+        else:
+            registry = REGISTRY
+        return generate_latest(registry) + generate_latest(queue_registry), CONTENT_TYPE_LATEST
+
+
+class MultiProcessDirsCollector:
+    """Como o MultiProcessCollector do prometheus_client, mas somando os arquivos de vários diretórios."""
+
+    def __init__(self, paths):
+        self.paths = paths
+
+    def collect(self):
+        from prometheus_client.multiprocess import MultiProcessCollector
+
+        files = [str(file_path) for path in self.paths for file_path in sorted(Path(path).glob("*.db"))]
+        return MultiProcessCollector.merge(files, accumulate=True)
+
+
+class JobQueueCollector:
+    """Fila atual lida do registro local de jobs no momento da coleta (vale para todos os processos)."""
+
+    def collect(self):
+        from app.repositories.job_repository import JobRepository
+
+        gauge = GaugeMetricFamily("iedi_job_queue", "Jobs no registro local por status.", labels=["status"])
+        try:
+            for status, count in JobRepository.count_by_status().items():
+                gauge.add_metric([status], count)
+        except Exception as e:
+            print(f"[Metrics] Falha ao ler a fila de jobs: {e}")
+        yield gauge
@@ -0,0 +1,117 @@
+import copy
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.exc import MultipleResultsFound
+
+from app.infra.metrics import Metrics
+from app.utils.lru_cache import LRUCache
+
+@dataclass(frozen=True)
+class CachedQuery:
+    generation: int
+    expires_at: float
+    mapper: Any
+    rows: Tuple[Dict[str, Any], ...]
+
+class QueryCache:
+    """
+    Cache read-through das consultas dos repositórios ao BigQuery, chaveado pelo SQL
+    e pelos parâmetros. Guarda só os valores das colunas; cada leitura devolve
+    instâncias novas, então quem altera um objeto retornado não altera o cache.
+
+    Cada tabela tem uma geração no SQLite local, incrementada por save/update/merge
+    (em qualquer processo). Uma entrada de geração anterior é descartada, e TTL_SECONDS
+    limita a idade das demais (escritas feitas fora dos repositórios, ex.: migrations).
+    """
+
+    TTL_SECONDS = float(os.getenv("IEDI_QUERY_CACHE_SECONDS", "60"))
+
+    cache = LRUCache(maxsize=int(os.getenv("IEDI_QUERY_CACHE_SIZE", "1024")))
+
+    @classmethod
+    def all(cls, query, transient: bool = False) -> List[Any]:
+        """
+        Resultado de query.all() (consulta de uma única entidade), do cache se possível.
+        transient=True devolve instâncias sem identidade (como make_transient).
+        """
+        table_name = cls.table_name(query)
+        generation = cls.generation(table_name) if cls.TTL_SECONDS > 0 else None
+
+        key = cls.key(table_name, query)
+        entry = cls.cache.get(key) if generation is not None else None
+        if entry is not None and (entry.generation != generation or entry.expires_at <= time.monotonic()):
+            entry = None
+
+        if entry is None:
+            Metrics.query_cache(table_name, "miss")
+            # A geração é lida antes da consulta: uma escrita concorrente invalida o que for gravado aqui
+            entry = CachedQuery(
+                generation=generation,
+                expires_at=time.monotonic() + cls.TTL_SECONDS,
+                mapper=query.column_descriptions[0]["entity"].__mapper__,
+                rows=tuple(cls.snapshot(row) for row in query.all()),
+            )
+            if generation is not None:
+                cls.cache.set(key, entry)
+        else:
+            Metrics.query_cache(table_name, "hit")
+
+        return [cls.restore(entry.mapper, row, transient) for row in entry.rows]
+
+    @classmethod
+    def one_or_none(cls, query, transient: bool = False) -> Optional[Any]:
+        rows = cls.all(query, transient)
+        if len(rows) > 1:
+            raise MultipleResultsFound("Multiple rows were found when one or none was required")
+        return rows[0] if rows else None
+
+    @classmethod
+    def invalidate(cls, *table_names: str):
+        """Chamar depois do commit da escrita."""
+        cls.cache.invalidate(lambda key: key[0] in table_names)
+        try:
+            from app.repositories.query_cache_generation_repository import QueryCacheGenerationRepository
+
+            QueryCacheGenerationRepository.bump(table_names)
+        except Exception as e:
+            print(f"[QueryCache] Falha ao invalidar {', '.join(table_names)} entre processos: {e}")
+
+    @classmethod
+    def generation(cls, table_name: str) -> Optional[int]:
+        """Geração atual da tabela; None (sem cache) se o registro local estiver indisponível."""
+        try:
+            from app.repositories.query_cache_generation_repository import QueryCacheGenerationRepository
+
+            return QueryCacheGenerationRepository.find_generation(table_name)
+        except Exception as e:
+            print(f"[QueryCache] Falha ao ler a geração de {table_name}: {e}")
+            return None
+
+    @classmethod
+    def table_name(cls, query) -> str:
+        return query.column_descriptions[0]["entity"].__tablename__
+
+    @classmethod
+    def key(cls, table_name: str, query):
+        compiled = query.statement.compile()
+        return table_name, str(compiled), repr(sorted(compiled.params.items()))
+
+    @classmethod
+    def snapshot(cls, instance) -> Dict[str, Any]:
+        mapper = inspect(instance).mapper
+        return {attr.key: copy.deepcopy(getattr(instance, attr.key)) for attr in mapper.column_attrs}
+
+    @classmethod
+    def restore(cls, mapper, values: Dict[str, Any], transient: bool):
+        instance = mapper.class_manager.new_instance()
+        for key, value in values.items():
+            set_committed_value(instance, key, copy.deepcopy(value))
+        if not transient:
+            make_transient_to_detached(instance)
+        return instance
@@ -0,0 +1,123 @@
+import os
+import resource
+import sys
+import threading
+import time
+
+class ResourceTracker:
+    """
+    Contabilidade de recursos da execução de job corrente (por thread do pool):
+    CPU da thread, tempo de parede por etapa, pico de RSS durante o job, páginas e bytes
+    do Brandwatch, retentativas, consultas e bytes processados no BigQuery e linhas
+    gravadas. Fora de um job (ex.: requisições web) as chamadas não fazem nada.
+
+    O pico de RSS é o maior RSS atual do processo amostrado durante o job (ver sampler),
+    não o ru_maxrss, que num worker de longa duração repetiria o pico de um job anterior.
+    Com vários jobs simultâneos no mesmo processo, inclui a memória dos demais.
+    """
+
+    COUNTERS = [
+        "brandwatch_pages", "brandwatch_bytes", "brandwatch_retries",
+        "bigquery_queries", "bigquery_bytes", "rows_written",
+    ]
+
+    _local = threading.local()
+
+    @classmethod
+    def start(cls, attempt=1):
+        cls._local.usage = {
+            "attempt": attempt,
+            "cpu_started": time.thread_time(),
+            "wall_started": time.perf_counter(),
+            "stages": {},
+            "peak_rss_mb": current_rss_mb(),
+            **{counter: 0 for counter in cls.COUNTERS},
+        }
+
+    @classmethod
+    def sampler(cls):
+        """
+        Função que amostra o RSS atual no job da thread corrente; pode ser chamada de
+        outra thread (ex.: JobHeartbeat). Não faz nada fora de um job.
+        """
+        usage = getattr(cls._local, "usage", None)
+
+        def sample():
+            if usage is not None:
+                usage["peak_rss_mb"] = max(usage["peak_rss_mb"], current_rss_mb())
+        return sample
+
+    @classmethod
+    def active(cls) -> bool:
+        return getattr(cls._local, "usage", None) is not None
+
+    @classmethod
+    def add(cls, **counters):
+        usage = getattr(cls._local, "usage", None)
+        if usage is None:
+            return
+        for key, value in counters.items():
+            usage[key] = usage.get(key, 0) + (value or 0)
+
+    @classmethod
+    def stage(cls, name, seconds):
+        usage = getattr(cls._local, "usage", None)
+        if usage is None:
+            return
+        usage["stages"][name] = usage["stages"].get(name, 0.0) + seconds
+        usage["peak_rss_mb"] = max(usage["peak_rss_mb"], current_rss_mb())
+
+    @classmethod
+    def snapshot(cls):
+        """Uso acumulado até agora, no formato gravado (sem encerrar a contabilidade)."""
+        usage = getattr(cls._local, "usage", None)
+        if usage is None:
+            return None
+        return {
+            "cpu_seconds": round(time.thread_time() - usage["cpu_started"], 3),
+            "wall_seconds": round(time.perf_counter() - usage["wall_started"], 3),
+            "stages": {name: round(seconds, 3) for name, seconds in usage["stages"].items()},
+            "peak_rss_mb": max(usage["peak_rss_mb"], current_rss_mb()),
+            "attempt": usage["attempt"],
+            **{counter: usage[counter] for counter in cls.COUNTERS},
+        }
+
+    @classmethod
+    def stop(cls):
+        usage = cls.snapshot()
+        cls._local.usage = None
+        return usage
+
+    @classmethod
+    def merge(cls, usages):
+        """Soma execuções (jobs, shards, tentativas); o pico de RSS é o maior entre elas."""
+        merged = {"cpu_seconds": 0.0, "wall_seconds": 0.0, "stages": {}, "peak_rss_mb": 0.0, "executions": 0, "job_retries": 0}
+        merged.update({counter: 0 for counter in cls.COUNTERS})
+        for usage in usages:
+            if not usage:
+                continue
+            merged["executions"] += 1
+            if usage.get("attempt", 1) > 1:
+                merged["job_retries"] += 1
+            merged["cpu_seconds"] = round(merged["cpu_seconds"] + usage.get("cpu_seconds", 0), 3)
+            merged["wall_seconds"] = round(merged["wall_seconds"] + usage.get("wall_seconds", 0), 3)
+            merged["peak_rss_mb"] = max(merged["peak_rss_mb"], usage.get("peak_rss_mb", 0))
+            for name, seconds in usage.get("stages", {}).items():
+                merged["stages"][name] = round(merged["stages"].get(name, 0.0) + seconds, 3)
+            for counter in cls.COUNTERS:
+                merged[counter] += usage.get(counter, 0)
+        return merged
+
+def current_rss_mb() -> float:
+    """RSS atual do processo (Linux, /proc/self/statm); sem /proc, o pico do processo."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+        return round(resident_pages * os.sysconf("SC_PAGE_SIZE") / 2**20, 1)
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KiB; macOS em bytes
+    return round((peak if sys.platform == "darwin" else peak * 1024) / 2**20, 1)
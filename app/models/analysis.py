@@ -1,4 +1,6 @@
-from sqlalchemy import Boolean, Column, String
+import json
+from datetime import datetime
+from sqlalchemy import Boolean, Column, String, TIMESTAMP
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.ext.hybrid import hybrid_property
 
@@ -16,6 +18,9 @@ class Analysis(Base):
     query_name = Column(String(255), nullable=False)
     _status = Column("status", String(50), default=AnalysisStatus.PENDING.value, nullable=False)
     is_custom_dates = Column(Boolean, default=False, nullable=False)
+    created_at = Column(TIMESTAMP, nullable=False, default=datetime.utcnow)
+    # Recursos consumidos pelo processamento (CPU, etapas, RSS, Brandwatch, BigQuery) em JSON
+    _resource_usage = Column("resource_usage", String, nullable=True)
 
     @hybrid_property
     def status(self) -> AnalysisStatus:
@@ -31,3 +36,14 @@ class Analysis(Base):
     def status(cls):
         return cls._status
 
+    @hybrid_property
+    def resource_usage(self) -> dict:
+        return json.loads(self._resource_usage) if self._resource_usage else None
+
+    @resource_usage.setter
+    def resource_usage(self, value: dict):
+        self._resource_usage = json.dumps(value, ensure_ascii=False, separators=(",", ":")) if value else None
+
+    @resource_usage.expression
+    def resource_usage(cls):
+        return cls._resource_usage
@@ -0,0 +1,30 @@
+import json
+import time
+from sqlalchemy import Column, Float, Integer, String, Text
+from sqlalchemy.ext.hybrid import hybrid_property
+
+from app.infra.local_sa import LocalBase
+
+class AnalysisEvent(LocalBase):
+    """Evento de andamento de uma análise, publicado pelo processo que executa o job e lido pelo SSE de qualquer processo."""
+    __tablename__ = "analysis_event"
+    # Ids nunca reaproveitados: quem acompanha o stream lê sempre "depois do último id visto"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    analysis_id = Column(String(36), nullable=False, index=True)
+    event = Column(String(50), nullable=False)
+    _data = Column("data", Text, nullable=False)
+    created_at = Column(Float, nullable=False, default=time.time)
+
+    @hybrid_property
+    def data(self) -> dict:
+        return json.loads(self._data) if self._data else {}
+
+    @data.setter
+    def data(self, value: dict):
+        self._data = json.dumps(value or {}, ensure_ascii=False, default=str)
+
+    @data.expression
+    def data(cls):
+        return cls._data
@@ -0,0 +1,43 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Index, String, text
+from sqlalchemy.ext.hybrid import hybrid_property
+
+from app.enums.coalescing_status import CoalescingStatus
+from app.infra.local_sa import LocalBase
+
+class AnalysisFingerprint(LocalBase):
+    """
+    Impressão digital de uma análise (query, categoria pai, bancos, janelas, versão dos pesos).
+    A análise líder (leader_analysis_id nulo) processa; as seguidoras copiam o resultado dela.
+    """
+    __tablename__ = "analysis_fingerprint"
+    __table_args__ = (
+        # No máximo uma líder ativa por fingerprint, garantido pelo próprio SQLite
+        Index(
+            "ux_analysis_fingerprint_leader",
+            "fingerprint",
+            unique=True,
+            sqlite_where=text("leader_analysis_id IS NULL AND status IN ('IN_FLIGHT', 'DONE')"),
+        ),
+    )
+
+    analysis_id = Column(String(36), primary_key=True)
+    fingerprint = Column(String(64), nullable=False, index=True)
+    leader_analysis_id = Column(String(36), nullable=True, index=True)
+    _status = Column("status", String(50), default=CoalescingStatus.IN_FLIGHT.name, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @hybrid_property
+    def status(self) -> CoalescingStatus:
+        return CoalescingStatus[self._status]
+
+    @status.setter
+    def status(self, value: CoalescingStatus):
+        if not isinstance(value, CoalescingStatus):
+            raise ValueError("O status deve ser uma instância válida de CoalescingStatus.")
+        self._status = value.name
+
+    @status.expression
+    def status(cls):
+        return cls._status
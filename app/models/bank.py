@@ -1,5 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, TIMESTAMP
-from sqlalchemy_bigquery import ARRAY
+from sqlalchemy import ARRAY, Column, Integer, String, Boolean, TIMESTAMP
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.ext.hybrid import hybrid_property
 from datetime import datetime
@@ -1,7 +1,7 @@
+import json
 from datetime import datetime
-from sqlalchemy import Column, String, Float, Integer
+from sqlalchemy import Column, String, Float, Integer, TIMESTAMP
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy_bigquery import TIMESTAMP
 from zoneinfo import ZoneInfo
 from sqlalchemy.ext.hybrid import hybrid_property
 from app.enums.bank_name import BankName
@@ -26,6 +26,9 @@ class BankAnalysis(Base):
     iedi_mean = Column(Float, nullable=True)
     iedi_score = Column(Float, nullable=True)
 
+    # Distribuições do banco (sentimento, grupo de alcance, título/subtítulo, nicho/relevante) em JSON
+    _summary = Column("summary", String, nullable=True)
+
     BR_TZ = ZoneInfo("America/Sao_Paulo")
 
     @hybrid_property
@@ -40,6 +43,18 @@ class BankAnalysis(Base):
     def bank_name(cls):
         return cls._bank_name
 
+    @hybrid_property
+    def summary(self) -> dict:
+        return json.loads(self._summary) if self._summary else None
+
+    @summary.setter
+    def summary(self, value: dict):
+        self._summary = json.dumps(value, ensure_ascii=False, separators=(",", ":")) if value else None
+
+    @summary.expression
+    def summary(cls):
+        return cls._summary
+
     @hybrid_property
     def start_date(self) -> datetime:
         if self._start_date is None:
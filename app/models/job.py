@@ -0,0 +1,101 @@
+import json
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, String, Text
+from sqlalchemy.ext.hybrid import hybrid_property
+
+from app.enums.job_status import JobStatus
+from app.enums.job_type import JobType
+from app.infra.local_sa import LocalBase
+from app.utils.uuid_generator import generate_uuid
+
+class Job(LocalBase):
+    __tablename__ = "job"
+
+    id = Column(String(36), primary_key=True, default=generate_uuid)
+    _job_type = Column("job_type", String(50), nullable=False, index=True)
+    _status = Column("status", String(50), default=JobStatus.QUEUED.name, nullable=False, index=True)
+    priority = Column(Integer, default=0, nullable=False)
+    analysis_id = Column(String(36), nullable=True, index=True)
+    dedupe_key = Column(String(255), nullable=True, unique=True)
+    _payload = Column("payload", Text, nullable=True)
+    _result = Column("result", Text, nullable=True)
+
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=3, nullable=False)
+    worker_id = Column(String(255), nullable=True)
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    @hybrid_property
+    def job_type(self) -> JobType:
+        return JobType[self._job_type]
+
+    @job_type.setter
+    def job_type(self, value: JobType):
+        if not isinstance(value, JobType):
+            raise ValueError("O tipo do job deve ser uma instância válida de JobType.")
+        self._job_type = value.name
+
+    @job_type.expression
+    def job_type(cls):
+        return cls._job_type
+
+    @hybrid_property
+    def status(self) -> JobStatus:
+        return JobStatus[self._status]
+
+    @status.setter
+    def status(self, value: JobStatus):
+        if not isinstance(value, JobStatus):
+            raise ValueError("O status deve ser uma instância válida de JobStatus.")
+        self._status = value.name
+
+    @status.expression
+    def status(cls):
+        return cls._status
+
+    @hybrid_property
+    def payload(self) -> dict:
+        return json.loads(self._payload) if self._payload else {}
+
+    @payload.setter
+    def payload(self, value: dict):
+        self._payload = json.dumps(value or {}, ensure_ascii=False)
+
+    @payload.expression
+    def payload(cls):
+        return cls._payload
+
+    @hybrid_property
+    def result(self) -> dict:
+        return json.loads(self._result) if self._result else None
+
+    @result.setter
+    def result(self, value: dict):
+        self._result = json.dumps(value, ensure_ascii=False, default=str) if value is not None else None
+
+    @result.expression
+    def result(cls):
+        return cls._result
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'job_type': self.job_type.name,
+            'status': self.status.name,
+            'priority': self.priority,
+            'analysis_id': self.analysis_id,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'worker_id': self.worker_id,
+            'error': self.error,
+            'result': self.result,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'heartbeat_at': self.heartbeat_at.isoformat() if self.heartbeat_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
@@ -0,0 +1,31 @@
+import json
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, String, Text
+from sqlalchemy.ext.hybrid import hybrid_property
+
+from app.infra.local_sa import LocalBase
+from app.utils.uuid_generator import generate_uuid
+
+class JobUsage(LocalBase):
+    """Recursos consumidos por uma execução (tentativa) de job."""
+    __tablename__ = "job_usage"
+
+    id = Column(String(36), primary_key=True, default=generate_uuid)
+    job_id = Column(String(36), nullable=False, index=True)
+    analysis_id = Column(String(36), nullable=True, index=True)
+    job_type = Column(String(50), nullable=False)
+    attempt = Column(Integer, nullable=False, default=1)
+    _usage = Column("usage", Text, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    @hybrid_property
+    def usage(self) -> dict:
+        return json.loads(self._usage) if self._usage else {}
+
+    @usage.setter
+    def usage(self, value: dict):
+        self._usage = json.dumps(value or {}, ensure_ascii=False)
+
+    @usage.expression
+    def usage(cls):
+        return cls._usage
@@ -1,8 +1,7 @@
 from datetime import datetime
-from sqlalchemy import Boolean, Column, Integer, String
+from sqlalchemy import Boolean, Column, Integer, String, TIMESTAMP
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.ext.hybrid import hybrid_property
-from sqlalchemy_bigquery import TIMESTAMP
 from zoneinfo import ZoneInfo
 
 Base = declarative_base()
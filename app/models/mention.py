@@ -1,8 +1,7 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text
+from sqlalchemy import ARRAY, Column, Integer, String, Text, TIMESTAMP
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.ext.hybrid import hybrid_property
-from sqlalchemy_bigquery import ARRAY, TIMESTAMP
 from zoneinfo import ZoneInfo
 from typing import List
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Float, Integer, String, Boolean
+from sqlalchemy import Column, Float, Integer, String, Boolean, TIMESTAMP
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.ext.hybrid import hybrid_property
 from app.enums.bank_name import BankName
@@ -29,6 +29,10 @@ class MentionAnalysis(Base):
     numerator = Column(Integer, nullable=True)
     denominator = Column(Integer, nullable=True)
 
+    # Copiados da mention: coluna de partição e de cluster no warehouse
+    published_date = Column(TIMESTAMP, nullable=True)
+    domain = Column(String(255), nullable=True)
+
     @hybrid_property
     def bank_name(self):
         return BankName[self._bank_name]
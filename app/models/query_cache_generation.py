@@ -0,0 +1,12 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, String
+
+from app.infra.local_sa import LocalBase
+
+class QueryCacheGeneration(LocalBase):
+    """Geração de cada tabela do BigQuery; incrementada a cada escrita para invalidar o QueryCache de todos os processos."""
+    __tablename__ = "query_cache_generation"
+
+    table_name = Column(String(100), primary_key=True)
+    generation = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,39 @@
+import time
+from typing import List, Optional
+
+from app.infra.local_sa import get_local_session
+from app.models.analysis_event import AnalysisEvent
+
+class AnalysisEventRepository:
+
+    @staticmethod
+    def save(analysis_event: AnalysisEvent) -> AnalysisEvent:
+        with get_local_session() as session:
+            session.add(analysis_event)
+            session.flush()
+            session.expunge(analysis_event)
+            return analysis_event
+
+    @staticmethod
+    def find_after(analysis_id: str, after_id: Optional[int] = None, limit: Optional[int] = None) -> List[AnalysisEvent]:
+        with get_local_session() as session:
+            query = session.query(AnalysisEvent).filter(AnalysisEvent.analysis_id == analysis_id)
+            if after_id is not None:
+                query = query.filter(AnalysisEvent.id > after_id)
+            query = query.order_by(AnalysisEvent.id.asc())
+            if limit is not None:
+                query = query.limit(limit)
+            rows = query.all()
+            for row in rows:
+                session.expunge(row)
+            return rows
+
+    @staticmethod
+    def delete_by_analysis_id(analysis_id: str) -> int:
+        with get_local_session() as session:
+            return session.query(AnalysisEvent).filter(AnalysisEvent.analysis_id == analysis_id).delete(synchronize_session=False)
+
+    @staticmethod
+    def delete_older_than(seconds: float) -> int:
+        with get_local_session() as session:
+            return session.query(AnalysisEvent).filter(AnalysisEvent.created_at < time.time() - seconds).delete(synchronize_session=False)
@@ -0,0 +1,78 @@
+from typing import List, Optional
+
+from app.enums.coalescing_status import CoalescingStatus
+from app.infra.local_sa import get_local_session
+from app.models.analysis_fingerprint import AnalysisFingerprint
+
+class AnalysisFingerprintRepository:
+
+    @staticmethod
+    def save(analysis_fingerprint: AnalysisFingerprint) -> AnalysisFingerprint:
+        with get_local_session() as session:
+            session.add(analysis_fingerprint)
+            session.flush()
+            session.expunge(analysis_fingerprint)
+            return analysis_fingerprint
+
+    @staticmethod
+    def attach_or_lead(analysis_fingerprint: AnalysisFingerprint) -> Optional[AnalysisFingerprint]:
+        """
+        Na mesma transação (com lock de escrita), anexa a análise à líder ativa do fingerprint
+        ou a registra como líder. Retorna a líder (estado atual) ou None se a análise passou a ser a líder.
+        Serializado com release/abandon: uma seguidora nunca se anexa a uma líder já liberada sem vê-la DONE.
+        """
+        with get_local_session(immediate=True) as session:
+            leader = session.query(AnalysisFingerprint).filter(
+                AnalysisFingerprint.fingerprint == analysis_fingerprint.fingerprint,
+                AnalysisFingerprint.leader_analysis_id.is_(None),
+                AnalysisFingerprint._status.in_([CoalescingStatus.IN_FLIGHT.name, CoalescingStatus.DONE.name]),
+            ).one_or_none()
+            analysis_fingerprint.leader_analysis_id = leader.analysis_id if leader else None
+            session.add(analysis_fingerprint)
+            session.flush()
+            session.expunge(analysis_fingerprint)
+            if leader:
+                session.expunge(leader)
+            return leader
+
+    @staticmethod
+    def settle_leader(analysis_id: str, status: CoalescingStatus) -> Optional[List[AnalysisFingerprint]]:
+        """
+        Marca a análise com o status final e, se ela for líder, retorna as seguidoras em
+        andamento (que passam a FAILED, ou seja, desanexadas, quando a líder falhou).
+        None se a análise não estiver registrada. Uma única transação com lock de escrita.
+        """
+        with get_local_session(immediate=True) as session:
+            row = session.query(AnalysisFingerprint).filter(AnalysisFingerprint.analysis_id == analysis_id).one_or_none()
+            if not row:
+                return None
+            row.status = status
+            if row.leader_analysis_id:
+                return []
+            followers = session.query(AnalysisFingerprint).filter(
+                AnalysisFingerprint.leader_analysis_id == analysis_id,
+                AnalysisFingerprint._status == CoalescingStatus.IN_FLIGHT.name,
+            ).order_by(AnalysisFingerprint.created_at.asc()).all()
+            for follower in followers:
+                session.expunge(follower)
+            if status == CoalescingStatus.FAILED:
+                session.query(AnalysisFingerprint).filter(
+                    AnalysisFingerprint.leader_analysis_id == analysis_id,
+                    AnalysisFingerprint._status == CoalescingStatus.IN_FLIGHT.name,
+                ).update({AnalysisFingerprint._status: CoalescingStatus.FAILED.name}, synchronize_session=False)
+            return followers
+
+    @staticmethod
+    def find_by_analysis_id(analysis_id: str) -> Optional[AnalysisFingerprint]:
+        with get_local_session() as session:
+            row = session.query(AnalysisFingerprint).filter(AnalysisFingerprint.analysis_id == analysis_id).one_or_none()
+            if row:
+                session.expunge(row)
+            return row
+
+    @staticmethod
+    def update_status(analysis_id: str, status: CoalescingStatus):
+        with get_local_session() as session:
+            session.query(AnalysisFingerprint).filter(AnalysisFingerprint.analysis_id == analysis_id).update(
+                {AnalysisFingerprint._status: status.name}, synchronize_session=False
+            )
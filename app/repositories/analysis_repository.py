@@ -1,7 +1,10 @@
+from app.enums.analysis_status import AnalysisStatus
 from app.infra.bq_sa import get_session
+from app.infra.query_cache import QueryCache
 from app.models.analysis import Analysis
-from sqlalchemy.orm import make_transient, joinedload
-from typing import Optional
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import make_transient
+from typing import List, Optional
 
 class AnalysisRepository:
 
@@ -13,23 +16,58 @@ class AnalysisRepository:
             session.refresh(analysis)
             session.expunge(analysis)
             make_transient(analysis)
-            return analysis
+        QueryCache.invalidate(Analysis.__tablename__)
+        return analysis
 
     @staticmethod
     def find_by_id(analysis_id: str) -> Optional[Analysis]:
         with get_session() as session:
-            analysis = session.query(Analysis).options(joinedload('*')).filter(Analysis.id == analysis_id).one_or_none()
-            if analysis:
-                session.expunge(analysis)  # Detach the object from the session
-            return analysis
+            return QueryCache.one_or_none(session.query(Analysis).filter(Analysis.id == analysis_id))
+
+    @staticmethod
+    def find_done_ids(analysis_ids: List[str]) -> set:
+        """Ids, entre os informados, das análises com status DONE (uma única consulta IN)."""
+        if not analysis_ids:
+            return set()
+        with get_session() as session:
+            analyses = QueryCache.all(session.query(Analysis).filter(
+                Analysis.id.in_(list(analysis_ids)),
+                Analysis.status == AnalysisStatus.DONE.name,
+            ))
+        return {analysis.id for analysis in analyses}
 
     @staticmethod
     def find_all():
         with get_session() as session:
             return session.query(Analysis).order_by(Analysis.created_at.desc()).all()
 
+    @staticmethod
+    def find_page(limit: int, cursor=None, status=None, name_prefix=None, created_from=None, created_to=None) -> List[Analysis]:
+        """
+        Página ordenada por (created_at DESC, id DESC). O cursor é o par (created_at, id)
+        da última análise da página anterior: a consulta continua a partir dele sem OFFSET.
+        """
+        with get_session() as session:
+            query = session.query(Analysis)
+            if status is not None:
+                query = query.filter(Analysis.status == status.name)
+            if name_prefix:
+                query = query.filter(Analysis.name.startswith(name_prefix, autoescape=True))
+            if created_from is not None:
+                query = query.filter(Analysis.created_at >= created_from)
+            if created_to is not None:
+                query = query.filter(Analysis.created_at < created_to)
+            if cursor is not None:
+                cursor_created_at, cursor_id = cursor
+                query = query.filter(or_(
+                    Analysis.created_at < cursor_created_at,
+                    and_(Analysis.created_at == cursor_created_at, Analysis.id < cursor_id),
+                ))
+            return QueryCache.all(query.order_by(Analysis.created_at.desc(), Analysis.id.desc()).limit(limit))
+
     @staticmethod
     def update(analysis: Analysis):
         with get_session() as session:
             session.merge(analysis)
             session.commit()
+        QueryCache.invalidate(Analysis.__tablename__)
@@ -1,6 +1,7 @@
 from app.models.bank_analysis import BankAnalysis
 from app.infra.bq_sa import get_session
-from sqlalchemy.orm import joinedload, make_transient
+from app.infra.query_cache import QueryCache
+from typing import List
 
 class BankAnalysisRepository:
 
@@ -10,7 +11,8 @@ class BankAnalysisRepository:
             session.add(bank_analysis)
             session.commit()
             session.refresh(bank_analysis)
-            return bank_analysis
+        QueryCache.invalidate(BankAnalysis.__tablename__)
+        return bank_analysis
 
     @staticmethod
     def update(bank_analysis: BankAnalysis) -> BankAnalysis | None:
@@ -18,22 +20,28 @@ class BankAnalysisRepository:
             merged = session.merge(bank_analysis)
             session.commit()
             session.refresh(merged)
-            return merged
+        QueryCache.invalidate(BankAnalysis.__tablename__)
+        return merged
 
     @staticmethod
     def find_by_analysis_id(analysis_id: str):
         """Busca todos os BankAnalysis de uma análise"""
         with get_session() as session:
-            bank_analyses = session.query(BankAnalysis).options(joinedload('*')).filter(
+            return QueryCache.all(session.query(BankAnalysis).filter(
                 BankAnalysis.analysis_id == analysis_id
-            ).all()
-            # Ensure all objects are bound to the session
-            for ba in bank_analyses:
-                session.expunge(ba)
-                make_transient(ba)
-            return bank_analyses
+            ), transient=True)
+
+    @staticmethod
+    def find_by_analysis_ids(analysis_ids: List[str]) -> List[BankAnalysis]:
+        """Busca os BankAnalysis de várias análises em uma única consulta (IN)"""
+        if not analysis_ids:
+            return []
+        with get_session() as session:
+            return QueryCache.all(session.query(BankAnalysis).filter(
+                BankAnalysis.analysis_id.in_(list(analysis_ids))
+            ), transient=True)
 
     @staticmethod
     def find_by_id(bank_analysis_id: str) -> BankAnalysis:
         with get_session() as session:
-            return session.query(BankAnalysis).options(joinedload('*')).filter(BankAnalysis.id == bank_analysis_id).one_or_none()
+            return QueryCache.one_or_none(session.query(BankAnalysis).filter(BankAnalysis.id == bank_analysis_id))
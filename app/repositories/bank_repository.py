@@ -1,8 +1,8 @@
 from typing import Optional
 from app.infra.bq_sa import get_session
+from app.infra.query_cache import QueryCache
 from app.models.bank import Bank
 from app.enums.bank_name import BankName
-from sqlalchemy.orm import make_transient, joinedload
 
 class BankRepository:
 
@@ -10,22 +10,9 @@ class BankRepository:
     def find_all():
         """Busca todos os bancos ativos"""
         with get_session() as session:
-            banks = session.query(Bank).filter(Bank.active == True).all()
-            for bank in banks:
-                session.expunge(bank)
-                make_transient(bank)
-            return banks
+            return QueryCache.all(session.query(Bank).filter(Bank.active == True), transient=True)
 
     @staticmethod
     def find_by_name(name: BankName) -> Optional[Bank]:
         with get_session() as session:
-            bank = session.query(Bank).options(joinedload('*')).filter(Bank._name == name.name).one_or_none()
-            if bank:
-                session.expunge(bank)
-                make_transient(bank)
-            return bank
-
-    @staticmethod
-    def find_all():
-        with get_session() as session:
-            return session.query(Bank).filter(Bank.active == True).all()
+            return QueryCache.one_or_none(session.query(Bank).filter(Bank._name == name.name), transient=True)
@@ -0,0 +1,151 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import and_, func, or_
+from sqlalchemy.exc import IntegrityError
+
+from app.enums.job_status import JobStatus
+from app.infra.local_sa import get_local_session
+from app.models.job import Job
+
+class JobRepository:
+
+    @staticmethod
+    def save(job: Job) -> Job:
+        with get_local_session() as session:
+            session.add(job)
+            session.flush()
+            session.expunge(job)
+            return job
+
+    @staticmethod
+    def save_unique(job: Job) -> Job:
+        """Salva o job; se já existir outro com o mesmo dedupe_key, retorna o existente."""
+        try:
+            return JobRepository.save(job)
+        except IntegrityError:
+            with get_local_session() as session:
+                existing = session.query(Job).filter(Job.dedupe_key == job.dedupe_key).one()
+                session.expunge(existing)
+                return existing
+
+    @staticmethod
+    def find_by_id(job_id: str) -> Optional[Job]:
+        with get_local_session() as session:
+            job = session.query(Job).filter(Job.id == job_id).one_or_none()
+            if job:
+                session.expunge(job)
+            return job
+
+    @staticmethod
+    def find_by_analysis_id(analysis_id: str) -> List[Job]:
+        with get_local_session() as session:
+            jobs = session.query(Job).filter(Job.analysis_id == analysis_id).order_by(Job.created_at.desc()).all()
+            for job in jobs:
+                session.expunge(job)
+            return jobs
+
+    @staticmethod
+    def find_by_analysis_ids(analysis_ids: List[str]) -> List[Job]:
+        if not analysis_ids:
+            return []
+        with get_local_session() as session:
+            jobs = session.query(Job).filter(Job.analysis_id.in_(analysis_ids)).order_by(Job.created_at.desc()).all()
+            for job in jobs:
+                session.expunge(job)
+            return jobs
+
+    @staticmethod
+    def count_by_status() -> dict:
+        with get_local_session() as session:
+            rows = session.query(Job._status, func.count(Job.id)).group_by(Job._status).all()
+            counts = {status.name: 0 for status in JobStatus}
+            counts.update({status: count for status, count in rows})
+            return counts
+
+    @staticmethod
+    def claim(worker_id: str, lease_seconds: int, job_types: List[str] = None, exhausted: List[Job] = None) -> Optional[Job]:
+        """
+        Reserva o próximo job disponível (menor prioridade primeiro).
+        Jobs RUNNING cujo heartbeat expirou (worker morto ou reciclado) voltam a ser elegíveis.
+        A reserva é um UPDATE condicional, seguro entre threads e processos.
+        Jobs de lease expirado sem tentativas restantes viram FAILED e são adicionados a `exhausted`.
+        """
+        now = datetime.utcnow()
+        stale_before = now - timedelta(seconds=lease_seconds)
+        claimable = or_(
+            Job._status == JobStatus.QUEUED.name,
+            and_(Job._status == JobStatus.RUNNING.name, Job.heartbeat_at < stale_before),
+        )
+
+        with get_local_session() as session:
+            query = session.query(Job.id, Job.attempts, Job.max_attempts).filter(claimable)
+            if job_types:
+                query = query.filter(Job._job_type.in_(job_types))
+            candidates = query.order_by(Job.priority.asc(), Job.created_at.asc()).limit(10).all()
+
+            for job_id, attempts, max_attempts in candidates:
+                if attempts >= max_attempts:
+                    failed = session.query(Job).filter(Job.id == job_id, claimable).update({
+                        Job._status: JobStatus.FAILED.name,
+                        Job.error: "Número máximo de tentativas atingido (lease expirado).",
+                        Job.finished_at: now,
+                    }, synchronize_session=False)
+                    session.commit()
+                    if failed == 1 and exhausted is not None:
+                        job = session.query(Job).filter(Job.id == job_id).one()
+                        session.expunge(job)
+                        exhausted.append(job)
+                    continue
+
+                updated = session.query(Job).filter(Job.id == job_id, claimable).update({
+                    Job._status: JobStatus.RUNNING.name,
+                    Job.worker_id: worker_id,
+                    Job.attempts: Job.attempts + 1,
+                    Job.started_at: now,
+                    Job.heartbeat_at: now,
+                }, synchronize_session=False)
+                session.commit()
+
+                if updated == 1:
+                    job = session.query(Job).filter(Job.id == job_id).one()
+                    session.expunge(job)
+                    return job
+            return None
+
+    @staticmethod
+    def heartbeat(job_id: str, worker_id: str) -> bool:
+        """Renova o lease. Retorna False se o job foi reservado por outro worker."""
+        with get_local_session() as session:
+            updated = session.query(Job).filter(
+                Job.id == job_id,
+                Job.worker_id == worker_id,
+                Job._status == JobStatus.RUNNING.name,
+            ).update({Job.heartbeat_at: datetime.utcnow()}, synchronize_session=False)
+            return updated == 1
+
+    @staticmethod
+    def complete(job_id: str, worker_id: str, result: dict = None):
+        with get_local_session() as session:
+            job = session.query(Job).filter(Job.id == job_id, Job.worker_id == worker_id).one_or_none()
+            if not job:
+                return
+            job.status = JobStatus.DONE
+            job.error = None
+            job.result = result
+            job.finished_at = datetime.utcnow()
+
+    @staticmethod
+    def fail(job_id: str, worker_id: str, error: str) -> Optional[JobStatus]:
+        """Devolve o job para a fila enquanto houver tentativas; senão marca FAILED. Retorna o novo status."""
+        with get_local_session() as session:
+            job = session.query(Job).filter(Job.id == job_id, Job.worker_id == worker_id).one_or_none()
+            if not job:
+                return None
+            job.error = error
+            if job.attempts < job.max_attempts:
+                job.status = JobStatus.QUEUED
+                job.worker_id = None
+            else:
+                job.status = JobStatus.FAILED
+                job.finished_at = datetime.utcnow()
+            return job.status
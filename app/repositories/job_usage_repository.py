@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import List, Optional
+
+from app.infra.local_sa import get_local_session
+from app.models.job_usage import JobUsage
+
+class JobUsageRepository:
+
+    @staticmethod
+    def save(job_usage: JobUsage) -> JobUsage:
+        with get_local_session() as session:
+            session.add(job_usage)
+            session.flush()
+            session.expunge(job_usage)
+            return job_usage
+
+    @staticmethod
+    def find_by_analysis_id(analysis_id: str, since: Optional[datetime] = None) -> List[JobUsage]:
+        with get_local_session() as session:
+            query = session.query(JobUsage).filter(JobUsage.analysis_id == analysis_id)
+            if since is not None:
+                query = query.filter(JobUsage.created_at >= since)
+            rows = query.order_by(JobUsage.created_at.asc()).all()
+            for row in rows:
+                session.expunge(row)
+            return rows
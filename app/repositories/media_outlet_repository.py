@@ -1,24 +1,21 @@
 from typing import List, Dict
 from app.infra.bq_sa import get_session
+from app.infra.query_cache import QueryCache
 from app.models.media_outlet import MediaOutlet
-from sqlalchemy.orm import joinedload
-from sqlalchemy import inspect
 
 class MediaOutletRepository:
 
     @staticmethod
     def find_by_niche(is_niche: bool) -> List[MediaOutlet]:
         with get_session() as session:
-            rows = session.query(MediaOutlet).filter(MediaOutlet.is_niche == is_niche).all()
-            # ensure column attributes are loaded and detach instances so they can be used outside the session
-            for r in rows:
-                for col in r.__table__.columns:
-                    getattr(r, col.key)
-                session.expunge(r)
-            return rows
+            return QueryCache.all(session.query(MediaOutlet).filter(MediaOutlet.is_niche == is_niche))
+
+    @staticmethod
+    def find_active_domains() -> List[str]:
+        with get_session() as session:
+            return [outlet.domain for outlet in QueryCache.all(session.query(MediaOutlet).filter(MediaOutlet.active == True))]
 
     @staticmethod
     def find_all_domains() -> List[str]:
         with get_session() as session:
-            rows = session.query(MediaOutlet).all()
-            return [getattr(outlet, 'domain') for outlet in rows]
+            return [outlet.domain for outlet in QueryCache.all(session.query(MediaOutlet))]
@@ -1,3 +1,4 @@
+import threading
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from app.infra.bq_sa import get_session
@@ -99,15 +100,22 @@ class MentionAnalysisRepository:
     # NOVOS MÉTODOS (CSV COM PANDAS)
     # ========================================
     
-    # Armazenamento temporário em memória para batch save
-    _batch_mention_analyses = []
-    _current_analysis_id = None
+    # Armazenamento temporário em memória para batch save.
+    # Thread-local: cada worker do pool de jobs processa sua própria análise.
+    _local = threading.local()
+
+    @classmethod
+    def _context(cls):
+        if not hasattr(cls._local, 'batch'):
+            cls._local.batch = []
+            cls._local.analysis_id = None
+        return cls._local
     
     @classmethod
     def set_analysis_context(cls, analysis_id: str):
         """Define o contexto da análise atual para salvar no CSV correto"""
-        cls._current_analysis_id = analysis_id
-        cls._batch_mention_analyses = []
+        cls._context().analysis_id = analysis_id
+        cls._context().batch = []
     
     @classmethod
     def create(cls, analysis_id: str, mention_url: str, bank_id: str, **kwargs) -> MentionAnalysis:
@@ -128,7 +136,7 @@ class MentionAnalysisRepository:
         Salva mention_analysis em batch (memória).
         Chame flush_batch() para persistir em CSV.
         """
-        if not cls._current_analysis_id:
+        if not cls._context().analysis_id:
             raise ValueError("Analysis context não definido. Chame set_analysis_context() primeiro.")
         
         # Converter mention_analysis para dict
@@ -141,10 +149,12 @@ class MentionAnalysisRepository:
             'title_mentioned': analysis.title_mentioned,
             'subtitle_used': analysis.subtitle_used,
             'subtitle_mentioned': analysis.subtitle_mentioned,
-            'iedi_score': analysis.iedi_score
+            'iedi_score': analysis.iedi_score,
+            'published_date': analysis.published_date,
+            'domain': analysis.domain,
         }
         
-        cls._batch_mention_analyses.append(analysis_dict)
+        cls._context().batch.append(analysis_dict)
         
         return analysis
     
@@ -153,10 +163,10 @@ class MentionAnalysisRepository:
         """
         Save a list of mention analyses in memory for batch processing.
         """
-        if not cls._current_analysis_id:
+        if not cls._context().analysis_id:
             raise ValueError("Analysis context not defined. Call set_analysis_context() first.")
 
-        cls._batch_mention_analyses.extend(mention_analyses)
+        cls._context().batch.extend(mention_analyses)
 
     @classmethod
     def update(cls, existing_analysis: MentionAnalysis, new_analysis: MentionAnalysis):
@@ -166,7 +176,7 @@ class MentionAnalysisRepository:
     @classmethod
     def find_by_mention(cls, mention_url: str) -> List[MentionAnalysis]:
         results = []
-        for analysis_dict in cls._batch_mention_analyses:
+        for analysis_dict in cls._context().batch:
             if analysis_dict.get('mention_url') == mention_url:
                 analysis = MentionAnalysis(
                     mention_url=analysis_dict.get('mention_url'),
@@ -191,7 +201,7 @@ class MentionAnalysisRepository:
         bank_name_str = bank_name.name if hasattr(bank_name, 'name') else str(bank_name)
         
         results = []
-        for analysis_dict in cls._batch_mention_analyses:
+        for analysis_dict in cls._context().batch:
             if analysis_dict.get('bank_name') == bank_name_str:
                 # Reconstruir objeto MentionAnalysis (simplificado)
                 analysis = MentionAnalysis(
@@ -217,7 +227,7 @@ class MentionAnalysisRepository:
         Busca mention_analysis por mention_id e bank_name no batch em memória.
         """
         bank_name_str = bank_name.name if hasattr(bank_name, 'name') else str(bank_name)
-        for analysis_dict in cls._batch_mention_analyses:
+        for analysis_dict in cls._context().batch:
             if analysis_dict.get('mention_url') == mention_url and analysis_dict.get('bank_name') == bank_name_str:
                 # Reconstruir objeto MentionAnalysis (simplificado)
                 analysis = MentionAnalysis(
@@ -251,17 +261,17 @@ class MentionAnalysisRepository:
         """
         Persiste batch de mention_analyses em CSV.
         """
-        if not cls._current_analysis_id:
+        if not cls._context().analysis_id:
             print("[MentionAnalysisRepository] Analysis context não definido. Nada para salvar.")
             return
         
-        if not cls._batch_mention_analyses:
-            print(f"[MentionAnalysisRepository] Nenhuma mention_analysis no batch (analysis_id={cls._current_analysis_id})")
+        if not cls._context().batch:
+            print(f"[MentionAnalysisRepository] Nenhuma mention_analysis no batch (analysis_id={cls._context().analysis_id})")
             return
         
         # Salvar em CSV
-        CSVStorage.save_mention_analyses(cls._batch_mention_analyses, cls._current_analysis_id)
+        CSVStorage.save_mention_analyses(cls._context().batch, cls._context().analysis_id)
         
         # Limpar batch
-        print(f"[MentionAnalysisRepository] Batch flushed: {len(cls._batch_mention_analyses)} mention_analyses")
-        cls._batch_mention_analyses = []
+        print(f"[MentionAnalysisRepository] Batch flushed: {len(cls._context().batch)} mention_analyses")
+        cls._context().batch = []
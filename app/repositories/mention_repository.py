@@ -1,3 +1,4 @@
+import threading
 from app.infra.bq_sa import get_session
 from app.models.mention import Mention
 from sqlalchemy.orm import joinedload
@@ -38,22 +39,29 @@ class MentionRepository:
     # NOVOS MÉTODOS (CSV COM PANDAS)
     # ========================================
     
-    # Armazenamento temporário em memória para batch save
-    _batch_mentions = []
-    _current_analysis_id = None
+    # Armazenamento temporário em memória para batch save.
+    # Thread-local: cada worker do pool de jobs processa sua própria análise.
+    _local = threading.local()
+
+    @classmethod
+    def _context(cls):
+        if not hasattr(cls._local, 'batch'):
+            cls._local.batch = []
+            cls._local.analysis_id = None
+        return cls._local
     
     @classmethod
     def set_analysis_context(cls, analysis_id: str):
         """Define o contexto da análise atual para salvar no CSV correto"""
-        cls._current_analysis_id = analysis_id
-        cls._batch_mentions = []
+        cls._context().analysis_id = analysis_id
+        cls._context().batch = []
     
     @classmethod
     def save(cls, mention: Mention) -> Mention:
         """
         Salva mention em memória para processamento em lote.
         """
-        if not cls._current_analysis_id:
+        if not cls._context().analysis_id:
             raise ValueError("Analysis context não definido. Chame set_analysis_context() primeiro.")
 
         # Converter mention para dict
@@ -70,7 +78,7 @@ class MentionRepository:
         }
         
         # Adicionar ao batch
-        cls._batch_mentions.append(mention_dict)
+        cls._context().batch.append(mention_dict)
         
         return mention
     
@@ -88,7 +96,7 @@ class MentionRepository:
         Busca mention por URL no batch em memória.
         Retorna None se não encontrar (para evitar leitura de CSV).
         """
-        for mention_dict in cls._batch_mentions:
+        for mention_dict in cls._context().batch:
             if mention_dict['url'] == url:
                 # Reconstruir objeto Mention
                 mention = Mention(
@@ -115,27 +123,34 @@ class MentionRepository:
         """
         Salva todas as mentions em memória para um arquivo CSV.
         """
-        if not cls._current_analysis_id:
+        if not cls._context().analysis_id:
             print("[MentionRepository] Analysis context não definido. Nada para salvar.")
             return
         
-        if not cls._batch_mentions:
-            print(f"[MentionRepository] Nenhuma mention para salvar (analysis_id={cls._current_analysis_id})")
+        if not cls._context().batch:
+            print(f"[MentionRepository] Nenhuma mention para salvar (analysis_id={cls._context().analysis_id})")
             return
         
         # Salvar em CSV
-        CSVStorage.save_mentions(cls._batch_mentions, cls._current_analysis_id)
+        CSVStorage.save_mentions(cls._context().batch, cls._context().analysis_id)
         
         # Limpar batch
-        print(f"[MentionRepository] Batch flushed: {len(cls._batch_mentions)} mentions")
-        cls._batch_mentions = []
+        print(f"[MentionRepository] Batch flushed: {len(cls._context().batch)} mentions")
+        cls._context().batch = []
+
+    @classmethod
+    def drain_batch(cls) -> List[dict]:
+        """Retorna e limpa o batch em memória sem gravar no CSV da análise."""
+        batch = cls._context().batch
+        cls._context().batch = []
+        return batch
 
     @classmethod
     def bulk_save(cls, mentions: List[Mention]):
         """
         Save a list of mentions in memory for batch processing.
         """
-        if not cls._current_analysis_id:
+        if not cls._context().analysis_id:
             raise ValueError("Analysis context not defined. Call set_analysis_context() first.")
 
         for mention in mentions:
@@ -150,4 +165,4 @@ class MentionRepository:
                 'categories': ','.join(mention.categories) if mention.categories else '',
                 'monthly_visitors': mention.monthly_visitors
             }
-            cls._batch_mentions.append(mention_dict)
+            cls._context().batch.append(mention_dict)
@@ -0,0 +1,28 @@
+from datetime import datetime
+from typing import Iterable
+from sqlalchemy.dialects.sqlite import insert
+
+from app.infra.local_sa import get_local_session
+from app.models.query_cache_generation import QueryCacheGeneration
+
+class QueryCacheGenerationRepository:
+
+    @staticmethod
+    def find_generation(table_name: str) -> int:
+        with get_local_session() as session:
+            generation = session.query(QueryCacheGeneration.generation).filter(
+                QueryCacheGeneration.table_name == table_name
+            ).scalar()
+            return generation or 0
+
+    @staticmethod
+    def bump(table_names: Iterable[str]):
+        """Incrementa a geração das tabelas (upsert atômico no SQLite)."""
+        now = datetime.utcnow()
+        with get_local_session() as session:
+            for table_name in table_names:
+                statement = insert(QueryCacheGeneration).values(table_name=table_name, generation=1, updated_at=now)
+                session.execute(statement.on_conflict_do_update(
+                    index_elements=[QueryCacheGeneration.table_name],
+                    set_={"generation": QueryCacheGeneration.generation + 1, "updated_at": now},
+                ))
@@ -1,28 +1,91 @@
+import base64
+import json
+from datetime import datetime
+
 from app.enums.analysis_status import AnalysisStatus
+from app.enums.coalescing_status import CoalescingStatus
+from app.enums.job_type import JobType
+from app.infra.csv_storage import CSVStorage
+from app.infra.event_bus import AnalysisEventBus
+from app.infra.job_lease import JobLease
 from app.models.analysis import Analysis
 from app.repositories.analysis_repository import AnalysisRepository
+from app.repositories.bank_analysis_repository import BankAnalysisRepository
 from app.services.bank_analysis_service import BankAnalysisService
+from app.services.coalescing_service import CoalescingService
+from app.services.comparison_service import ComparisonService
+from app.services.highlight_service import HighlightService
+from app.services.job_service import JobService
 from app.services.mention_analysis_service import MentionAnalysisService
-import threading
+from app.services.mention_service import MentionService
+from app.services.shard_service import ShardService
+from app.utils.http_cache import ResponseCache
 
 class AnalysisService:
 
     bank_analysis_service = BankAnalysisService()
     mention_analysis_service = MentionAnalysisService()
+    mention_service = MentionService()
+    comparison_service = ComparisonService()
+    job_service = JobService()
+    shard_service = ShardService()
+    coalescing_service = CoalescingService()
+    highlight_service = HighlightService()
+
+    DEFAULT_PAGE_SIZE = 20
+    MAX_PAGE_SIZE = 100
 
-    def save(self, name, query_name, parent_name, bank_names=None, start_date=None, end_date=None, custom_bank_dates=None):
+    def save(self, name, query_name, parent_name, bank_names=None, start_date=None, end_date=None, custom_bank_dates=None, sharded=None, force=False, profile=False):
         self.validate(name, query_name)
         validated_bank_analyses = self.bank_analysis_service.validate(bank_names, start_date, end_date, custom_bank_dates)
 
         is_custom_dates = bool(custom_bank_dates)
+        priority = self.job_service.estimate_priority(validated_bank_analyses)
+        fingerprint = self.coalescing_service.fingerprint(query_name, parent_name, validated_bank_analyses, is_custom_dates)
         analysis = AnalysisRepository.save(self.build(name=name, query_name=query_name, is_custom_dates=is_custom_dates))
 
         self.bank_analysis_service.save_all(analysis_id=analysis.id, bank_analyses=validated_bank_analyses)
 
-        threading.Thread(target=self.process_and_update_status, args=(analysis, validated_bank_analyses, parent_name)).start()
+        # force=True ignora análises idênticas e reprocessa do zero; profile=True também,
+        # já que uma cópia de resultados não teria o que medir
+        leader = None if force or profile else self.coalescing_service.register(analysis.id, fingerprint)
+        if leader is None:
+            self.job_service.enqueue(
+                JobType.PROCESS_ANALYSIS,
+                analysis_id=analysis.id,
+                payload={"parent_name": parent_name, "sharded": sharded, "profile": bool(profile)},
+                priority=priority
+            )
+        elif leader.status == CoalescingStatus.DONE:
+            self.enqueue_copy(analysis.id, leader.analysis_id)
+        # Líder em andamento: a cópia é enfileirada quando ela finalizar (ver finish)
 
         return analysis
 
+    def enqueue_copy(self, analysis_id, source_analysis_id):
+        return self.job_service.enqueue(
+            JobType.COPY_RESULTS,
+            analysis_id=analysis_id,
+            payload={"source_analysis_id": source_analysis_id},
+            priority=0,
+            dedupe_key=f"copy:{analysis_id}"
+        )
+
+    def restart(self, analysis, bank_analyses, parent_name, profile=False):
+        ResponseCache.invalidate(analysis.id)
+        if profile:
+            self.job_service.profiling_service.reset(analysis.id)
+        return self.job_service.enqueue(
+            JobType.RESTART_ANALYSIS,
+            analysis_id=analysis.id,
+            payload={"parent_name": parent_name, "bank_analysis_ids": [ba.id for ba in bank_analyses], "profile": bool(profile)},
+            priority=self.job_service.estimate_priority(bank_analyses)
+        )
+
+    def recalculate(self, analysis_id):
+        ResponseCache.invalidate(analysis_id)
+        return self.job_service.enqueue(JobType.RECALCULATE_ANALYSIS, analysis_id=analysis_id, priority=0)
+
     def validate(self, name, query_name):
         if not name:
             raise ValueError("O nome da análise é obrigatório.")
@@ -36,6 +99,60 @@ class AnalysisService:
     def find_all(self):
         return AnalysisRepository.find_all()
 
+    def find_page(self, limit=None, cursor=None, status=None, name_prefix=None, created_from=None, created_to=None):
+        """Retorna (análises, próximo cursor). O cursor é None na última página."""
+        limit = self.validate_page_limit(limit)
+        if status:
+            if status not in AnalysisStatus._member_names_:
+                raise ValueError(f"Status '{status}' inválido.")
+            status = AnalysisStatus[status]
+        created_from = self.parse_filter_date(created_from, "created_from")
+        created_to = self.parse_filter_date(created_to, "created_to")
+
+        # Busca um item a mais para saber se existe próxima página
+        analyses = AnalysisRepository.find_page(
+            limit + 1,
+            cursor=self.decode_cursor(cursor) if cursor else None,
+            status=status or None,
+            name_prefix=name_prefix or None,
+            created_from=created_from,
+            created_to=created_to,
+        )
+        if len(analyses) <= limit:
+            return analyses, None
+        analyses = analyses[:limit]
+        return analyses, self.encode_cursor(analyses[-1])
+
+    def validate_page_limit(self, limit):
+        if limit is None or limit == "":
+            return self.DEFAULT_PAGE_SIZE
+        try:
+            limit = int(limit)
+        except (TypeError, ValueError):
+            raise ValueError("O parâmetro limit deve ser um número inteiro.")
+        if not 1 <= limit <= self.MAX_PAGE_SIZE:
+            raise ValueError(f"O parâmetro limit deve estar entre 1 e {self.MAX_PAGE_SIZE}.")
+        return limit
+
+    def parse_filter_date(self, value, field_name):
+        if not value:
+            return None
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            raise ValueError(f"Erro no campo '{field_name}': data em formato inválido.")
+
+    def encode_cursor(self, analysis):
+        content = json.dumps({"created_at": analysis.created_at.isoformat(), "id": analysis.id})
+        return base64.urlsafe_b64encode(content.encode("utf-8")).decode("ascii")
+
+    def decode_cursor(self, cursor):
+        try:
+            content = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            return datetime.fromisoformat(content["created_at"]), content["id"]
+        except (ValueError, KeyError, TypeError):
+            raise ValueError("Cursor de paginação inválido.")
+
     def find_by_id(self, analysis_id):
         analysis = AnalysisRepository.find_by_id(analysis_id)
         if not analysis:
@@ -50,6 +167,86 @@ class AnalysisService:
         AnalysisRepository.update(analysis)
         return analysis
 
+    def run_process_job(self, job):
+        analysis = self.find_by_id(job.analysis_id)
+        bank_analyses = BankAnalysisRepository.find_by_analysis_id(job.analysis_id)
+        bank_analysis_ids = job.payload.get("bank_analysis_ids")
+        if bank_analysis_ids:
+            bank_analyses = [ba for ba in bank_analyses if ba.id in bank_analysis_ids]
+
+        # As coletas desta execução regravam os relatórios; os de uma execução anterior não podem ser somados
+        self.mention_service.reset_rejected_domains(analysis.id)
+        if self.shard_service.should_shard(bank_analyses, job.payload.get("sharded")):
+            return self.shard_service.enqueue_shards(analysis, bank_analyses, job.payload.get("parent_name"), profile=job.payload.get("profile", False))
+
+        self.process_and_update_status(analysis, bank_analyses, job.payload.get("parent_name"))
+
+    def abandon_leader(self, job):
+        """
+        Falha definitiva de um job da líder (processamento, shard ou merge, inclusive por
+        lease expirado): as seguidoras passam a processar sozinhas, com as opções da líder.
+        """
+        followers = self.coalescing_service.abandon(job.analysis_id)
+        if not followers:
+            return
+        process_job = next((
+            leader_job for leader_job in self.job_service.find_by_analysis_id(job.analysis_id)
+            if leader_job.job_type == JobType.PROCESS_ANALYSIS
+        ), job)
+        for follower in followers:
+            self.job_service.enqueue(
+                JobType.PROCESS_ANALYSIS,
+                analysis_id=follower.analysis_id,
+                payload={"parent_name": process_job.payload.get("parent_name"), "sharded": process_job.payload.get("sharded")},
+                priority=job.priority
+            )
+
+    def run_copy_job(self, job):
+        source_analysis_id = job.payload["source_analysis_id"]
+        JobLease.check()
+        CSVStorage.copy_analysis_files(source_analysis_id, job.analysis_id)
+        self.bank_analysis_service.copy_metrics(
+            BankAnalysisRepository.find_by_analysis_id(source_analysis_id),
+            BankAnalysisRepository.find_by_analysis_id(job.analysis_id)
+        )
+        self.finish(job.analysis_id)
+        return {"source_analysis_id": source_analysis_id}
+
+    def run_merge_job(self, job):
+        result = self.shard_service.merge(job)
+        self.finish(job.analysis_id)
+        return result
+
     def process_and_update_status(self, analysis, bank_analyses, parent_name):
         self.mention_analysis_service.process_mention_analysis(analysis, bank_analyses, parent_name)
-        self.update_status(analysis.id, AnalysisStatus.DONE)
+        self.finish(analysis.id)
+
+    def finish(self, analysis_id):
+        # Job reservado por outro worker (lease perdido): DONE e cópias ficam com o novo dono
+        JobLease.check()
+        self.precompute_results(analysis_id)
+        analysis = self.find_by_id(analysis_id)
+        analysis.status = AnalysisStatus.DONE
+        analysis.resource_usage = self.collect_resource_usage(analysis_id)
+        AnalysisRepository.update(analysis)
+        self.comparison_service.invalidate(analysis_id)
+        ResponseCache.invalidate(analysis_id)
+        AnalysisEventBus.publish(analysis_id, "done", {"status": AnalysisStatus.DONE.name})
+        for follower in self.coalescing_service.release(analysis_id):
+            self.enqueue_copy(follower.analysis_id, analysis_id)
+
+    def collect_resource_usage(self, analysis_id):
+        try:
+            return self.job_service.resource_usage(analysis_id)
+        except Exception as e:
+            print(f"[AnalysisService] Falha ao consolidar recursos da análise {analysis_id}: {e}")
+            return None
+
+    def precompute_results(self, analysis_id):
+        """Resultados derivados usados pelo relatório; falhas aqui não impedem a finalização."""
+        try:
+            self.highlight_service.compute_and_store(analysis_id)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"[AnalysisService] Falha ao pré-calcular destaques da análise {analysis_id}: {e}")
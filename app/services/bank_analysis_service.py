@@ -1,12 +1,24 @@
+from __future__ import annotations
+
 from datetime import datetime
 from app.models.bank_analysis import BankAnalysis
 from app.enums.bank_name import BankName
+from app.infra.event_bus import AnalysisEventBus
+from app.infra.job_lease import JobLease
+from app.infra.metrics import Metrics
+from app.infra.resource_tracker import ResourceTracker
 from app.repositories.bank_analysis_repository import BankAnalysisRepository
+from app.enums.reach_group import ReachGroup
 from app.enums.sentiment import Sentiment
-import pandas as pd
+from app.services.domain_metrics_service import DomainMetricsService
+from app.utils.lazy_import import lazy_import
+
+pd = lazy_import("pandas")
 
 class BankAnalysisService:
 
+    domain_metrics_service = DomainMetricsService()
+
     def validate(self, bank_names=None, start_date=None, end_date=None, custom_bank_dates=None):
         if (not bank_names and not custom_bank_dates) or (bank_names and custom_bank_dates):
             raise ValueError("É necessário fornecer uma lista de bancos com uma data de início e uma data de fim OU uma lista personalizada de datas para cada banco.")
@@ -93,14 +105,86 @@ class BankAnalysisService:
             print(f"[BankAnalysisService] No data to process for {bank_analysis.bank_name.value}")
             return
 
-        # Compute metrics
-        total_mentions = len(df_mention_analyses)
-        negative_mentions = len(df_mention_analyses[
-            df_mention_analyses['sentiment'].str.lower() == Sentiment.NEGATIVE.name.lower()
-        ])  # Negative sentiment is considered negative
+        with Metrics.stage("aggregate", len(df_mention_analyses)):
+            aggregates = self.compute_aggregates(df_mention_analyses)
+            self.apply_aggregates(bank_analysis, aggregates)
+
+        # Persist metrics (e.g., save to BigQuery)
+        self.persist_bank_analysis(bank_analysis)
+        self.persist_domain_metrics(bank_analysis, aggregates)
+
+    def compute_aggregates(self, df_mention_analyses: pd.DataFrame) -> dict:
+        """
+        Additive aggregates of a set of mention analyses. Partial aggregates (e.g. from
+        date shards) can be summed key by key and applied with apply_aggregates.
+        """
+        sentiments = df_mention_analyses['sentiment'].str.lower()
+        negative_mentions = int((
+            sentiments == Sentiment.NEGATIVE.name.lower()
+        ).sum())  # Negative sentiment is considered negative
+        iedi_normalized = df_mention_analyses['iedi_normalized']
+        return {
+            'total_mentions': len(df_mention_analyses),
+            'negative_mentions': negative_mentions,
+            'iedi_normalized_sum': float(iedi_normalized.sum()),
+            'iedi_normalized_count': int(iedi_normalized.count()),
+            'summary': self.compute_distributions(df_mention_analyses, sentiments),
+            'domains': self.domain_metrics_service.compute(df_mention_analyses, sentiments),
+        }
+
+    def compute_distributions(self, df_mention_analyses: pd.DataFrame, sentiments: pd.Series = None) -> dict:
+        """
+        Contagens por sentimento, grupo de alcance, menção no título/subtítulo e tipo de
+        veículo, calculadas na mesma passada das métricas. Também são aditivas (shards).
+        """
+        if sentiments is None:
+            sentiments = df_mention_analyses['sentiment'].str.lower()
+        reach_groups = df_mention_analyses['reach_group']
+
+        def count(column):
+            if column not in df_mention_analyses.columns:
+                return 0
+            return int(df_mention_analyses[column].eq(True).sum())
+
+        reach_group_counts = {group.value: int((reach_groups == group.value).sum()) for group in ReachGroup}
+        reach_group_counts['unknown'] = len(df_mention_analyses) - sum(reach_group_counts.values())
+        return {
+            'sentiment': {sentiment.value: int((sentiments == sentiment.value).sum()) for sentiment in Sentiment},
+            'reach_group': reach_group_counts,
+            'headline': {'title': count('title_mentioned'), 'subtitle': count('subtitle_mentioned')},
+            'vehicle': {'niche': count('niche_vehicle'), 'relevant': count('relevant_vehicle')},
+        }
+
+    def merge_aggregates(self, aggregates_list) -> dict:
+        merged = {'total_mentions': 0, 'negative_mentions': 0, 'iedi_normalized_sum': 0.0, 'iedi_normalized_count': 0}
+        summaries = []
+        for aggregates in aggregates_list:
+            for key in merged:
+                merged[key] += aggregates[key]
+            if aggregates.get('summary'):
+                summaries.append(aggregates['summary'])
+        merged['summary'] = self.merge_distributions(summaries) if summaries else None
+        merged['domains'] = self.domain_metrics_service.merge(aggregates.get('domains') for aggregates in aggregates_list)
+        return merged
+
+    def merge_distributions(self, summaries) -> dict:
+        merged = {}
+        for summary in summaries:
+            for group, counts in summary.items():
+                target = merged.setdefault(group, {})
+                for key, value in counts.items():
+                    target[key] = target.get(key, 0) + value
+        return merged
+
+    def apply_aggregates(self, bank_analysis, aggregates: dict):
+        total_mentions = aggregates['total_mentions']
+        negative_mentions = aggregates['negative_mentions']
         positive_mentions = total_mentions - negative_mentions  # All other mentions are considered positive
 
-        average_iedi_normalized = df_mention_analyses['iedi_normalized'].mean()
+        if aggregates['iedi_normalized_count'] > 0:
+            average_iedi_normalized = aggregates['iedi_normalized_sum'] / aggregates['iedi_normalized_count']
+        else:
+            average_iedi_normalized = float('nan')
         positivity_proportion = positive_mentions / total_mentions if total_mentions > 0 else 0
         adjusted_iedi_normalized = average_iedi_normalized * positivity_proportion
 
@@ -110,16 +194,70 @@ class BankAnalysisService:
         bank_analysis.negative_volume = negative_mentions
         bank_analysis.iedi_mean = round(average_iedi_normalized, 2) if not pd.isna(average_iedi_normalized) else None
         bank_analysis.iedi_score = round(adjusted_iedi_normalized, 2) if not pd.isna(adjusted_iedi_normalized) else None
+        bank_analysis.summary = aggregates.get('summary')
+        return bank_analysis
 
-        # Persist metrics (e.g., save to BigQuery)
-        self.persist_bank_analysis(bank_analysis)
+    def build_dashboard(self, bank_analyses) -> dict:
+        """
+        Dados dos gráficos do dashboard a partir dos resumos gravados em cada BankAnalysis:
+        contagens e participações (0 a 1) sobre o total de menções do banco.
+        Bancos processados antes do resumo existir vêm em missing_summary.
+        """
+        banks = []
+        missing_summary = []
+        for bank_analysis in sorted(bank_analyses, key=lambda ba: ba.bank_name.name):
+            summary = bank_analysis.summary
+            if not summary:
+                missing_summary.append(bank_analysis.bank_name.name)
+                continue
+            total_mentions = bank_analysis.total_mentions or 0
+            bank = {
+                "bank_name": bank_analysis.bank_name.name,
+                "total_mentions": total_mentions,
+                "iedi_mean": bank_analysis.iedi_mean,
+                "iedi_score": bank_analysis.iedi_score,
+            }
+            for group, counts in summary.items():
+                bank[group] = {
+                    "counts": counts,
+                    "shares": {key: round(value / total_mentions, 4) if total_mentions else 0.0 for key, value in counts.items()},
+                }
+            banks.append(bank)
+        return {"banks": banks, "missing_summary": missing_summary}
+
+    def copy_metrics(self, source_bank_analyses, target_bank_analyses):
+        """Copia as métricas calculadas de uma análise idêntica, banco a banco."""
+        source_by_bank = {ba.bank_name.name: ba for ba in source_bank_analyses}
+        for bank_analysis in target_bank_analyses:
+            source = source_by_bank.get(bank_analysis.bank_name.name)
+            if source is None or source.iedi_mean is None:
+                continue
+            bank_analysis.total_mentions = source.total_mentions
+            bank_analysis.positive_volume = source.positive_volume
+            bank_analysis.negative_volume = source.negative_volume
+            bank_analysis.iedi_mean = source.iedi_mean
+            bank_analysis.iedi_score = source.iedi_score
+            bank_analysis.summary = source.summary
+            self.persist_bank_analysis(bank_analysis)
+            self.domain_metrics_service.copy(source.analysis_id, bank_analysis.analysis_id, bank_analysis.bank_name)
+
+    def persist_domain_metrics(self, bank_analysis, aggregates: dict):
+        """Grava as métricas por domínio do banco ao lado das métricas persistidas."""
+        try:
+            self.domain_metrics_service.save(bank_analysis.analysis_id, bank_analysis.bank_name, aggregates)
+        except Exception as e:
+            print(f"[BankAnalysisService] Failed to persist domain metrics for {bank_analysis.bank_name.value}: {e}")
 
     def persist_bank_analysis(self, bank_analysis):
         """
         Persist the bank analysis object to BigQuery using the repository's update method.
         """
-        updated_bank_analysis = BankAnalysisRepository.update(bank_analysis)
+        JobLease.check()
+        with Metrics.stage("persist_bank_analysis", 1):
+            updated_bank_analysis = BankAnalysisRepository.update(bank_analysis)
         if updated_bank_analysis:
+            ResourceTracker.add(rows_written=1)
             print(f"[BankAnalysisService] Successfully persisted metrics for {bank_analysis.bank_name.value}")
+            AnalysisEventBus.bank(bank_analysis)
         else:
             print(f"[BankAnalysisService] Failed to persist metrics for {bank_analysis.bank_name.value}")
@@ -1,8 +1,11 @@
 from app.infra.brandwatch_client import BrandwatchClient
+from app.infra.event_bus import AnalysisEventBus
+from app.infra.metrics import Metrics
+from app.infra.resource_tracker import ResourceTracker
 from app.utils.date_utils import DateUtils
 from datetime import datetime
 from typing import Dict, List
-from time import sleep
+from time import perf_counter, sleep
 
 class BrandwatchService:
 
@@ -38,6 +41,7 @@ class BrandwatchService:
 
         try:
             page_count = 0
+            page_started = perf_counter()
             for page in client.queries.iter_mentions(
                 name=query_name,
                 **kwargs  # Passa filtros como kwargs
@@ -49,11 +53,17 @@ class BrandwatchService:
                             all_mentions.extend(page)
                             page_count += 1
                             print(f"Fetched page {page_count} with {len(page)} mentions.")
+                            AnalysisEventBus.progress(pages=1, fetched_mentions=len(page))
+                            Metrics.page(perf_counter() - page_started, len(page))
+                            # Os bytes vêm das respostas HTTP (ver BrandwatchClient)
+                            ResourceTracker.add(brandwatch_pages=1)
                         break
                     except Exception as e:
                         retries += 1
+                        ResourceTracker.add(brandwatch_retries=1)
                         wait_time = retry_delay * (2 ** (retries - 1))
                         sleep(wait_time)
+                page_started = perf_counter()
 
             print(f"Total pages fetched: {page_count}")
             return all_mentions
@@ -0,0 +1,51 @@
+import hashlib
+import json
+
+from app.constants.weights import WEIGHTS_VERSION
+from app.enums.coalescing_status import CoalescingStatus
+from app.models.analysis_fingerprint import AnalysisFingerprint
+from app.repositories.analysis_fingerprint_repository import AnalysisFingerprintRepository
+
+class CoalescingService:
+    """
+    Evita processar duas vezes a mesma análise: pedidos idênticos (query, categoria pai,
+    bancos, janelas e versão dos pesos) se anexam à análise líder em andamento ou copiam
+    o resultado de uma líder já finalizada.
+    """
+
+    def fingerprint(self, query_name, parent_name, bank_analyses, is_custom_dates):
+        windows = sorted(
+            (ba.bank_name.name, ba.start_date.isoformat(), ba.end_date.isoformat())
+            for ba in bank_analyses
+        )
+        content = json.dumps({
+            "query_name": query_name,
+            "parent_name": parent_name,
+            "is_custom_dates": bool(is_custom_dates),
+            "windows": windows,
+            "weights_version": WEIGHTS_VERSION,
+        }, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def register(self, analysis_id, fingerprint):
+        """
+        Registra a análise. Retorna a líder à qual ela foi anexada, ou None se a
+        própria análise passou a ser a líder (e portanto deve ser processada).
+        Com a líder já DONE, quem chama enfileira a cópia; em andamento, a cópia sai em release.
+        """
+        leader = AnalysisFingerprintRepository.attach_or_lead(AnalysisFingerprint(
+            analysis_id=analysis_id,
+            fingerprint=fingerprint,
+            status=CoalescingStatus.IN_FLIGHT,
+        ))
+        if leader:
+            print(f"[CoalescingService] Análise {analysis_id} anexada à líder {leader.analysis_id} ({leader.status.name})")
+        return leader
+
+    def release(self, analysis_id):
+        """Marca a análise como finalizada e retorna as seguidoras que aguardam cópia."""
+        return AnalysisFingerprintRepository.settle_leader(analysis_id, CoalescingStatus.DONE) or []
+
+    def abandon(self, analysis_id):
+        """Líder falhou definitivamente: retorna as seguidoras, que passam a processar sozinhas."""
+        return AnalysisFingerprintRepository.settle_leader(analysis_id, CoalescingStatus.FAILED) or []
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+from app.constants.weights import WEIGHTS_VERSION
+from app.repositories.analysis_repository import AnalysisRepository
+from app.repositories.bank_analysis_repository import BankAnalysisRepository
+from app.services.job_service import JobService
+from app.utils.date_utils import DateUtils
+from app.utils.lru_cache import LRUCache
+from app.utils.lazy_import import lazy_import
+
+pd = lazy_import("pandas")
+
+class ComparisonService:
+    """
+    Ranking e comparativos entre análises (ex.: ranking trimestral, BB vs Itaú).
+    Trabalha apenas sobre os agregados de BankAnalysis, nunca sobre as menções.
+    O cache é chaveado pela revisão de cada análise no registro local de jobs (como o
+    ResponseCache): um reprocessamento/recálculo em outro processo muda a chave, e
+    comparações com análise ainda não finalizada não são guardadas. Análises anteriores
+    à fila (sem jobs) valem pelo status DONE gravado.
+    """
+
+    MAX_ANALYSES = 40
+
+    job_service = JobService()
+
+    cache = LRUCache(maxsize=64)
+
+    def compare(self, analysis_ids):
+        analysis_ids = self.validate(analysis_ids)
+        revisions = self.job_service.revisions(analysis_ids, settled_only=True, find_done_ids=AnalysisRepository.find_done_ids)
+        settled = all(revision is not None for revision in revisions.values())
+        key = (frozenset(revisions.items()), WEIGHTS_VERSION)
+
+        cached = self.cache.get(key) if settled else None
+        if cached is not None:
+            return cached
+
+        bank_analyses = BankAnalysisRepository.find_by_analysis_ids(analysis_ids)
+        result = self.build_comparison(self.build_frame(bank_analyses))
+        result["analysis_ids"] = sorted(analysis_ids)
+        result["weights_version"] = WEIGHTS_VERSION
+
+        if settled:
+            self.cache.set(key, result)
+        return result
+
+    def validate(self, analysis_ids):
+        analysis_ids = sorted({a.strip() for a in (analysis_ids or []) if a and a.strip()})
+        if not analysis_ids:
+            raise ValueError("É necessário informar ao menos uma análise para comparar.")
+        if len(analysis_ids) > self.MAX_ANALYSES:
+            raise ValueError(f"É possível comparar no máximo {self.MAX_ANALYSES} análises por vez.")
+        return analysis_ids
+
+    def invalidate(self, analysis_id):
+        """Descarta comparações que incluem a análise (ex.: após recálculo)."""
+        return self.cache.invalidate(lambda key: analysis_id in dict(key[0]))
+
+    def period_label(self, start_date, end_date):
+        start_label = DateUtils.to_quarter_label(start_date)
+        if start_label == DateUtils.to_quarter_label(end_date):
+            return start_label
+        return f"{start_date.date().isoformat()} a {end_date.date().isoformat()}"
+
+    def build_frame(self, bank_analyses) -> pd.DataFrame:
+        rows = []
+        for ba in bank_analyses:
+            # Análises ainda em processamento não entram no comparativo
+            if ba.iedi_mean is None:
+                continue
+            rows.append({
+                "analysis_id": ba.analysis_id,
+                "bank_name": ba.bank_name.name,
+                "period": self.period_label(ba.start_date, ba.end_date),
+                "period_start": ba.start_date,
+                "total_mentions": ba.total_mentions or 0,
+                "positive_volume": ba.positive_volume or 0.0,
+                "negative_volume": ba.negative_volume or 0.0,
+                "iedi_mean": ba.iedi_mean,
+                "iedi_score": ba.iedi_score,
+            })
+        return pd.DataFrame(rows, columns=[
+            "analysis_id", "bank_name", "period", "period_start", "total_mentions",
+            "positive_volume", "negative_volume", "iedi_mean", "iedi_score",
+        ])
+
+    def build_comparison(self, df: pd.DataFrame):
+        if df.empty:
+            return {"periods": [], "banks": [], "rankings": {}, "series": {}, "sector_average": []}
+
+        # Mesmo banco e período vindo de mais de uma análise: média ponderada pelo volume
+        df = df.assign(
+            weight=df["total_mentions"].where(df["total_mentions"] > 0, 1),
+            iedi_score=df["iedi_score"].fillna(df["iedi_mean"]),
+        )
+        df = df.assign(
+            weighted_mean=df["iedi_mean"] * df["weight"],
+            weighted_score=df["iedi_score"] * df["weight"],
+        )
+        grouped = df.groupby(["period", "bank_name"], sort=False).agg(
+            period_start=("period_start", "min"),
+            total_mentions=("total_mentions", "sum"),
+            positive_volume=("positive_volume", "sum"),
+            negative_volume=("negative_volume", "sum"),
+            weight=("weight", "sum"),
+            weighted_mean=("weighted_mean", "sum"),
+            weighted_score=("weighted_score", "sum"),
+        ).reset_index()
+
+        grouped["iedi_mean"] = grouped["weighted_mean"] / grouped["weight"]
+        grouped["iedi_score"] = grouped["weighted_score"] / grouped["weight"]
+        volume = grouped["positive_volume"] + grouped["negative_volume"]
+        grouped["positividade"] = (grouped["positive_volume"] / volume.where(volume > 0)) * 100
+        grouped["negatividade"] = (grouped["negative_volume"] / volume.where(volume > 0)) * 100
+
+        period_order = grouped.groupby("period")["period_start"].min().sort_values()
+        periods = list(period_order.index)
+        grouped["period_index"] = grouped["period"].map({p: i for i, p in enumerate(periods)})
+        grouped = grouped.sort_values(["period_index", "bank_name"]).reset_index(drop=True)
+
+        grouped["position"] = grouped.groupby("period")["iedi_mean"].rank(method="min", ascending=False).astype(int)
+
+        sector = grouped.groupby("period", sort=False)[["iedi_mean", "iedi_score", "positividade"]].mean()
+        grouped["sector_iedi_mean"] = grouped["period"].map(sector["iedi_mean"])
+        grouped["delta_vs_sector"] = grouped["iedi_mean"] - grouped["sector_iedi_mean"]
+        grouped["delta_vs_previous"] = grouped.groupby("bank_name")["iedi_mean"].diff()
+
+        banks = sorted(grouped["bank_name"].unique())
+
+        rankings = {}
+        for period, group in grouped.sort_values(["period_index", "position", "bank_name"]).groupby("period", sort=False):
+            rankings[period] = [
+                {
+                    "position": int(row.position),
+                    "bank_name": row.bank_name,
+                    "iedi_mean": self.to_float(row.iedi_mean),
+                    "positividade": self.to_float(row.positividade),
+                    "negatividade": self.to_float(row.negatividade),
+                }
+                for row in group.itertuples()
+            ]
+
+        series = {bank: [] for bank in banks}
+        for row in grouped.itertuples():
+            series[row.bank_name].append({
+                "period": row.period,
+                "total_mentions": int(row.total_mentions),
+                "iedi_mean": self.to_float(row.iedi_mean),
+                "iedi_score": self.to_float(row.iedi_score),
+                "positividade": self.to_float(row.positividade),
+                "negatividade": self.to_float(row.negatividade),
+                "position": int(row.position),
+                "delta_vs_previous": self.to_float(row.delta_vs_previous),
+                "delta_vs_sector": self.to_float(row.delta_vs_sector),
+            })
+
+        sector_average = [
+            {
+                "period": period,
+                "iedi_mean": self.to_float(sector.at[period, "iedi_mean"]),
+                "iedi_score": self.to_float(sector.at[period, "iedi_score"]),
+                "positividade": self.to_float(sector.at[period, "positividade"]),
+            }
+            for period in periods
+        ]
+
+        return {
+            "periods": periods,
+            "banks": banks,
+            "rankings": rankings,
+            "series": series,
+            "sector_average": sector_average,
+        }
+
+    def to_float(self, value):
+        return None if pd.isna(value) else float(value)
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from app.enums.bank_name import BankName
+from app.enums.sentiment import Sentiment
+from app.infra.csv_storage import CSVStorage
+from app.utils.lazy_import import lazy_import
+
+pd = lazy_import("pandas")
+
+class DomainMetricsService:
+    """
+    Métricas por (banco, domínio), calculadas na mesma passada das métricas do banco.
+    Os agregados por domínio são aditivos ([menções, negativas, soma e contagem do IEDI
+    normalizado]) para somar shards; as métricas finais ficam em
+    data/bank_domains_<analysis_id>_<BANCO>.json, ao lado das métricas do banco.
+    """
+
+    SORTS = ['total_mentions', 'iedi_normalized_mean', 'negative_share', 'contribution_share']
+    DEFAULT_LIMIT = 20
+    MAX_LIMIT = 500
+
+    def compute(self, df_mention_analyses: pd.DataFrame, sentiments: pd.Series = None) -> dict:
+        if 'domain' not in df_mention_analyses.columns:
+            return {}
+        if sentiments is None:
+            sentiments = df_mention_analyses['sentiment'].str.lower()
+        frame = pd.DataFrame({
+            'domain': df_mention_analyses['domain'].astype('string').str.lower(),
+            'negative': (sentiments == Sentiment.NEGATIVE.value).to_numpy(dtype=bool),
+            'iedi_normalized': pd.to_numeric(df_mention_analyses['iedi_normalized'], errors='coerce'),
+        })
+        grouped = frame.groupby('domain', sort=True).agg(
+            total=('negative', 'size'),
+            negative=('negative', 'sum'),
+            iedi_sum=('iedi_normalized', 'sum'),
+            iedi_count=('iedi_normalized', 'count'),
+        )
+        return {
+            domain: [int(total), int(negative), float(iedi_sum), int(iedi_count)]
+            for domain, total, negative, iedi_sum, iedi_count in grouped.itertuples()
+        }
+
+    def merge(self, domains_list) -> dict:
+        merged = {}
+        for domains in domains_list:
+            for domain, values in (domains or {}).items():
+                current = merged.get(domain)
+                merged[domain] = [a + b for a, b in zip(current, values)] if current else list(values)
+        return merged
+
+    def finalize(self, aggregates: dict) -> list:
+        """Linhas por domínio; a participação é a fração da soma do IEDI normalizado do banco."""
+        total_mentions = aggregates['total_mentions']
+        iedi_normalized_sum = aggregates['iedi_normalized_sum']
+        rows = []
+        for domain, (total, negative, iedi_sum, iedi_count) in sorted((aggregates.get('domains') or {}).items()):
+            rows.append({
+                "domain": domain,
+                "total_mentions": total,
+                "negative_mentions": negative,
+                "mention_share": round(total / total_mentions, 4) if total_mentions else 0.0,
+                "negative_share": round(negative / total, 4) if total else 0.0,
+                "iedi_normalized_mean": round(iedi_sum / iedi_count, 4) if iedi_count else None,
+                "contribution_share": round(iedi_sum / iedi_normalized_sum, 4) if iedi_normalized_sum else None,
+            })
+        return rows
+
+    def key(self, analysis_id, bank_name: BankName):
+        return f"{analysis_id}_{bank_name.name}"
+
+    def save(self, analysis_id, bank_name: BankName, aggregates: dict):
+        CSVStorage.save_json("bank_domains", self.key(analysis_id, bank_name), {
+            "bank_name": bank_name.name,
+            "total_mentions": aggregates['total_mentions'],
+            "domains": self.finalize(aggregates),
+        })
+
+    def copy(self, source_analysis_id, target_analysis_id, bank_name: BankName):
+        stored = CSVStorage.load_json("bank_domains", self.key(source_analysis_id, bank_name))
+        if stored is not None:
+            CSVStorage.save_json("bank_domains", self.key(target_analysis_id, bank_name), stored)
+
+    def find_top(self, analysis_id, bank_name=None, sort=None, limit=None):
+        if bank_name and bank_name not in BankName._member_names_:
+            raise ValueError(f"O banco '{bank_name}' não é válido.")
+        sort = sort or "-total_mentions"
+        if sort.lstrip("-") not in self.SORTS:
+            raise ValueError(f"Ordenação '{sort}' inválida. Use: {', '.join(self.SORTS)} (prefixo '-' para decrescente).")
+        limit = self.validate_limit(limit)
+
+        column = sort.lstrip("-")
+        descending = sort.startswith("-")
+        banks = {}
+        for bank in BankName:
+            if bank_name and bank.name != bank_name:
+                continue
+            stored = CSVStorage.load_json("bank_domains", self.key(analysis_id, bank))
+            if stored is None:
+                continue
+            # Nulos sempre no fim; empate pelo nome do domínio
+            valued = [row for row in stored["domains"] if row[column] is not None]
+            missing = [row for row in stored["domains"] if row[column] is None]
+            valued.sort(key=lambda row: row["domain"])
+            valued.sort(key=lambda row: row[column], reverse=descending)
+            banks[bank.name] = {
+                "total_mentions": stored["total_mentions"],
+                "total_domains": len(stored["domains"]),
+                "domains": (valued + missing)[:limit],
+            }
+        if not banks:
+            raise FileNotFoundError(f"Métricas por domínio da análise {analysis_id} não encontradas.")
+        return {"sort": sort, "limit": limit, "banks": banks}
+
+    def validate_limit(self, limit):
+        if limit is None or limit == "":
+            return self.DEFAULT_LIMIT
+        try:
+            limit = int(limit)
+        except (TypeError, ValueError):
+            raise ValueError("O parâmetro limit deve ser um número inteiro.")
+        if not 1 <= limit <= self.MAX_LIMIT:
+            raise ValueError(f"O parâmetro limit deve estar entre 1 e {self.MAX_LIMIT}.")
+        return limit
@@ -0,0 +1,191 @@
+from app.enums.bank_name import BankName
+from app.enums.sentiment import Sentiment
+from app.infra.csv_storage import CSVStorage
+from app.utils.lazy_import import lazy_import
+
+pd = lazy_import("pandas")
+
+class ExportService:
+    """
+    Exportação em streaming do join mentions ⨝ mention_analysis de uma análise
+    (CSV, NDJSON ou Parquet para o Power BI). O lado de mention_analysis, filtrado e só
+    com as colunas pedidas, fica em memória; o CSV de mentions (com os textos) é lido
+    em blocos e cada bloco é serializado e enviado antes do próximo.
+    """
+
+    CHUNK_SIZE = 20_000
+
+    ANALYSIS_COLUMNS = CSVStorage.MENTION_ANALYSIS_COLUMNS
+    MENTION_COLUMNS = ['title', 'snippet', 'full_text', 'domain', 'published_date', 'categories', 'monthly_visitors']
+    COLUMNS = ANALYSIS_COLUMNS + MENTION_COLUMNS
+    DEFAULT_COLUMNS = [column for column in COLUMNS if column != 'full_text']
+
+    FORMATS = {
+        "csv": "text/csv; charset=utf-8",
+        "ndjson": "application/x-ndjson; charset=utf-8",
+        "parquet": "application/vnd.apache.parquet",
+    }
+
+    BOOLEAN_COLUMNS = ['niche_vehicle', 'title_mentioned', 'subtitle_used', 'subtitle_mentioned']
+    FLOAT_COLUMNS = ['iedi_score', 'iedi_normalized']
+    INTEGER_COLUMNS = ['numerator', 'denominator', 'monthly_visitors']
+
+    def validate(self, analysis_id, fmt=None, columns=None, bank_names=None, sentiments=None):
+        fmt = (fmt or "csv").lower()
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Formato '{fmt}' inválido. Use: {', '.join(self.FORMATS)}.")
+
+        columns = [column for column in (columns or []) if column] or self.DEFAULT_COLUMNS
+        unknown = [column for column in columns if column not in self.COLUMNS]
+        if unknown:
+            raise ValueError(f"Colunas inválidas: {', '.join(unknown)}.")
+
+        bank_values = []
+        for bank_name in bank_names or []:
+            if bank_name not in BankName._member_names_:
+                raise ValueError(f"O banco '{bank_name}' não é válido.")
+            bank_values.append(BankName[bank_name].value)
+
+        sentiment_values = []
+        for sentiment in sentiments or []:
+            sentiment_values.append(Sentiment.from_string(sentiment.lower()).value)
+
+        if not (CSVStorage.DATA_DIR / f"mention_analysis_{analysis_id}.csv").exists():
+            raise FileNotFoundError(f"Resultados da análise {analysis_id} não encontrados.")
+
+        return {"fmt": fmt, "columns": columns, "bank_values": bank_values, "sentiment_values": sentiment_values}
+
+    def stream(self, analysis_id, fmt, columns, bank_values=None, sentiment_values=None):
+        frames = self.iter_frames(analysis_id, columns, bank_values, sentiment_values)
+        if fmt == "parquet":
+            return self.to_parquet(frames, columns)
+        if fmt == "ndjson":
+            return self.to_ndjson(frames)
+        return self.to_csv(frames, columns)
+
+    def filter_analyses(self, df, bank_values, sentiment_values):
+        if bank_values:
+            df = df[df['bank_name'].isin(bank_values)]
+        if sentiment_values:
+            df = df[df['sentiment'].str.lower().isin(sentiment_values)]
+        return df
+
+    def iter_frames(self, analysis_id, columns, bank_values=None, sentiment_values=None):
+        analysis_columns = list(dict.fromkeys(['mention_url', 'bank_name', 'sentiment'] + [
+            column for column in columns if column in self.ANALYSIS_COLUMNS
+        ]))
+        mention_columns = [column for column in columns if column in self.MENTION_COLUMNS]
+
+        analysis_chunks = (
+            self.filter_analyses(chunk, bank_values, sentiment_values)
+            for chunk in CSVStorage.iter_csv("mention_analysis", analysis_id, analysis_columns, self.CHUNK_SIZE)
+        )
+        if not mention_columns:
+            for chunk in analysis_chunks:
+                if not chunk.empty:
+                    yield chunk.reindex(columns=columns)
+            return
+
+        analyses = pd.concat(list(analysis_chunks), ignore_index=True)
+        if analyses.empty:
+            return
+
+        mention_chunks = CSVStorage.iter_csv("mentions", analysis_id, ['url'] + mention_columns, self.CHUNK_SIZE)
+        streamed = False
+        for chunk in mention_chunks:
+            streamed = True
+            merged = chunk.merge(analyses, left_on='url', right_on='mention_url', how='inner')
+            if not merged.empty:
+                yield merged.reindex(columns=columns)
+
+        if not streamed:
+            # Análises antigas podem não ter o CSV de mentions: exporta só as colunas de análise
+            for start in range(0, len(analyses), self.CHUNK_SIZE):
+                yield analyses.iloc[start:start + self.CHUNK_SIZE].reindex(columns=columns)
+
+    def to_csv(self, frames, columns):
+        header = True
+        for frame in frames:
+            yield frame.to_csv(index=False, header=header).encode('utf-8')
+            header = False
+        if header:
+            yield pd.DataFrame(columns=columns).to_csv(index=False).encode('utf-8')
+
+    def to_ndjson(self, frames):
+        for frame in frames:
+            body = frame.to_json(orient='records', lines=True, force_ascii=False, date_format='iso')
+            yield (body if body.endswith('\n') else body + '\n').encode('utf-8')
+
+    def parquet_schema(self, columns):
+        import pyarrow as pa
+
+        fields = []
+        for column in columns:
+            if column in self.BOOLEAN_COLUMNS:
+                fields.append(pa.field(column, pa.bool_()))
+            elif column in self.FLOAT_COLUMNS:
+                fields.append(pa.field(column, pa.float64()))
+            elif column in self.INTEGER_COLUMNS:
+                fields.append(pa.field(column, pa.int64()))
+            elif column == 'published_date':
+                fields.append(pa.field(column, pa.timestamp('us', tz='UTC')))
+            else:
+                fields.append(pa.field(column, pa.string()))
+        return pa.schema(fields)
+
+    def to_parquet(self, frames, columns):
+        """Um row group por bloco; os bytes de cada row group são enviados assim que escritos."""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Exportação Parquet requer o pacote pyarrow.")
+
+        schema = self.parquet_schema(columns)
+
+        def generate():
+            sink = StreamingSink()
+            writer = pq.ParquetWriter(pa.PythonFile(sink, mode='w'), schema, compression='snappy')
+            try:
+                for frame in frames:
+                    if 'published_date' in frame.columns:
+                        frame = frame.assign(published_date=pd.to_datetime(frame['published_date'], utc=True, errors='coerce'))
+                    writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+                    yield sink.drain()
+            finally:
+                writer.close()
+            yield sink.drain()
+
+        return generate()
+
+
+class StreamingSink:
+    """Arquivo somente-escrita que acumula bytes até o próximo drain()."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def writable(self):
+        return True
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
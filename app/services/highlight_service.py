@@ -0,0 +1,100 @@
+from app.constants.weights import REACH_GROUP_WEIGHTS, WEIGHTS_VERSION
+from app.enums.bank_name import BankName
+from app.infra.csv_storage import CSVStorage
+from app.services.mention_explorer_service import MentionExplorerService
+from app.utils.lazy_import import lazy_import
+
+np = lazy_import("numpy")
+
+class HighlightService:
+    """
+    Menções que mais moveram o IEDI de cada banco. A contribuição de uma menção é
+    (iedi_normalized − média do banco) × peso do grupo de alcance: cobertura negativa em
+    veículos grandes puxa para baixo, manchetes positivas em veículos grandes para cima.
+    Calculado ao finalizar a análise e guardado em data/highlights_<id>.json.
+    """
+
+    STORED_K = 50
+
+    mention_explorer_service = MentionExplorerService()
+
+    def find(self, analysis_id, k=None, bank_name=None):
+        k = self.validate_k(k)
+        if bank_name and bank_name not in BankName._member_names_:
+            raise ValueError(f"O banco '{bank_name}' não é válido.")
+
+        highlights = self.load_or_compute(analysis_id)
+        banks = {
+            name: {**bank, "top": bank["top"][:k], "bottom": bank["bottom"][:k]}
+            for name, bank in highlights["banks"].items()
+            if not bank_name or name == bank_name
+        }
+        return {"k": k, "weights_version": highlights["weights_version"], "banks": banks}
+
+    def validate_k(self, k):
+        if k is None or k == "":
+            return 10
+        try:
+            k = int(k)
+        except (TypeError, ValueError):
+            raise ValueError("O parâmetro k deve ser um número inteiro.")
+        if not 1 <= k <= self.STORED_K:
+            raise ValueError(f"O parâmetro k deve estar entre 1 e {self.STORED_K}.")
+        return k
+
+    def load_or_compute(self, analysis_id):
+        version = self.mention_explorer_service.version(analysis_id)
+        highlights = CSVStorage.load_json("highlights", analysis_id)
+        if highlights and highlights.get("version") == version and highlights.get("weights_version") == WEIGHTS_VERSION:
+            return highlights
+        return self.compute_and_store(analysis_id)
+
+    def compute_and_store(self, analysis_id):
+        index = self.mention_explorer_service.get_index(analysis_id)
+        highlights = {
+            "version": index.version,
+            "weights_version": WEIGHTS_VERSION,
+            "banks": self.compute(index.frame, self.STORED_K),
+        }
+        CSVStorage.save_json("highlights", analysis_id, highlights)
+        return highlights
+
+    def compute(self, frame, k):
+        banks = {}
+        bank_names = frame['bank_name'].to_numpy()
+        iedi_normalized = frame['iedi_normalized'].to_numpy(dtype='float64')
+        # Menções sem grupo de alcance são pontuadas como grupo D
+        reach_weights = frame['reach_group'].map(REACH_GROUP_WEIGHTS).fillna(REACH_GROUP_WEIGHTS["D"]).to_numpy(dtype='float64')
+
+        for bank_name in sorted(name for name in set(bank_names) if isinstance(name, str)):
+            positions = np.flatnonzero((bank_names == bank_name) & ~np.isnan(iedi_normalized))
+            if len(positions) == 0:
+                continue
+            mean = float(iedi_normalized[positions].mean())
+            contribution = (iedi_normalized[positions] - mean) * reach_weights[positions]
+
+            banks[bank_name] = {
+                "mean_iedi_normalized": round(mean, 4),
+                "total_mentions": int(len(positions)),
+                "top": self.rows(frame, positions, contribution, self.select(contribution, k, largest=True)),
+                "bottom": self.rows(frame, positions, contribution, self.select(contribution, k, largest=False)),
+            }
+        return banks
+
+    def select(self, values, k, largest=True):
+        """Índices dos k maiores (ou menores) valores via seleção parcial O(n), ordenados."""
+        keys = -values if largest else values
+        if len(keys) > k:
+            candidates = np.argpartition(keys, k - 1)[:k]
+        else:
+            candidates = np.arange(len(keys))
+        # Desempate pela posição original: resultado determinístico
+        return candidates[np.lexsort((candidates, keys[candidates]))]
+
+    def rows(self, frame, positions, contribution, selected):
+        rows = []
+        for index in selected:
+            row = self.mention_explorer_service.serialize(frame.iloc[positions[index]].to_dict())
+            row["contribution"] = round(float(contribution[index]), 4)
+            rows.append(row)
+        return rows
@@ -0,0 +1,337 @@
+import os
+import socket
+import threading
+import time
+import traceback
+
+from app.enums.job_status import JobStatus
+from app.enums.job_type import JobType
+from app.infra.event_bus import AnalysisEventBus
+from app.infra.job_lease import JobLease
+from app.infra.metrics import Metrics
+from app.infra.resource_tracker import ResourceTracker
+from app.models.job import Job
+from app.models.job_usage import JobUsage
+from app.repositories.job_repository import JobRepository
+from app.repositories.job_usage_repository import JobUsageRepository
+from app.services.profiling_service import ProfilingService
+
+class JobService:
+    """
+    Fila persistente de jobs (SQLite local) com pool de workers limitado.
+    Substitui as threads avulsas: o número de execuções simultâneas (e portanto de
+    streams concorrentes no Brandwatch) fica limitado pelo tamanho do pool.
+    """
+
+    LEASE_SECONDS = int(os.getenv("IEDI_JOB_LEASE_SECONDS", "120"))
+    HEARTBEAT_SECONDS = max(1, LEASE_SECONDS // 4)
+    POLL_SECONDS = float(os.getenv("IEDI_JOB_POLL_SECONDS", "2"))
+
+    profiling_service = ProfilingService()
+
+    _pool = None
+    _pool_lock = threading.Lock()
+
+    def enqueue(self, job_type: JobType, analysis_id=None, payload=None, priority=0, max_attempts=3, dedupe_key=None) -> Job:
+        job = Job(
+            job_type=job_type,
+            analysis_id=analysis_id,
+            payload=payload or {},
+            priority=priority,
+            max_attempts=max_attempts,
+            dedupe_key=dedupe_key,
+        )
+        job = JobRepository.save_unique(job) if dedupe_key else JobRepository.save(job)
+        print(f"[JobService] Job {job.id} ({job_type.name}) enfileirado com prioridade {priority}")
+        self.ensure_workers()
+        return job
+
+    def estimate_priority(self, bank_analyses) -> int:
+        """Prioridade = total de dias consultados; análises pequenas passam na frente."""
+        total_days = 0
+        for bank_analysis in bank_analyses:
+            total_days += max(1, (bank_analysis.end_date - bank_analysis.start_date).days)
+        return total_days
+
+    def find_by_id(self, job_id):
+        job = JobRepository.find_by_id(job_id)
+        if not job:
+            raise ValueError("Job não encontrado.")
+        return job
+
+    def find_by_analysis_id(self, analysis_id):
+        return JobRepository.find_by_analysis_id(analysis_id)
+
+    def summarize(self, analysis_id):
+        """Estado agregado dos jobs da análise, lido do registro local (sem BigQuery)."""
+        jobs = self.find_by_analysis_id(analysis_id)
+        latest = jobs[0] if jobs else None
+        return {
+            "jobs": len(jobs),
+            "active": sum(1 for job in jobs if job.status in (JobStatus.QUEUED, JobStatus.RUNNING)),
+            "latest_status": latest.status.name if latest else None,
+            "latest_error": latest.error if latest else None,
+        }
+
+    def revision(self, analysis_id):
+        """
+        Marca de versão da análise derivada dos seus jobs (quantidade e último término).
+        None enquanto houver job ativo: o resultado ainda pode mudar.
+        """
+        return self.revisions([analysis_id])[analysis_id]
+
+    def revisions(self, analysis_ids, settled_only=False, find_done_ids=None):
+        """
+        revision() de várias análises com uma única consulta ao registro local.
+        settled_only=True também devolve None quando o último job não terminou em DONE
+        (ou a análise não tem jobs), ou seja, quando não dá para garantir que está finalizada.
+        Análises sem jobs (anteriores à fila) que find_done_ids(ids) informar como DONE
+        contam como finalizadas, com a revisão estável "0:" (como em revision()).
+        """
+        jobs_by_analysis = {analysis_id: [] for analysis_id in analysis_ids}
+        for job in JobRepository.find_by_analysis_ids(list(jobs_by_analysis)):
+            jobs_by_analysis[job.analysis_id].append(job)
+
+        revisions = {}
+        for analysis_id, jobs in jobs_by_analysis.items():
+            if any(job.status in (JobStatus.QUEUED, JobStatus.RUNNING) for job in jobs):
+                revisions[analysis_id] = None
+            elif settled_only and (not jobs or jobs[0].status != JobStatus.DONE):
+                revisions[analysis_id] = None
+            else:
+                finished = [job.finished_at for job in jobs if job.finished_at]
+                revisions[analysis_id] = f"{len(jobs)}:{max(finished).isoformat() if finished else ''}"
+
+        jobless = [analysis_id for analysis_id, jobs in jobs_by_analysis.items() if not jobs]
+        if settled_only and jobless and find_done_ids is not None:
+            for analysis_id in find_done_ids(jobless):
+                revisions[analysis_id] = "0:"
+        return revisions
+
+    def queue_depth(self):
+        return JobRepository.count_by_status()
+
+    def handlers(self):
+        # Import tardio: AnalysisService depende de JobService para enfileirar
+        from app.services.analysis_service import AnalysisService
+        from app.services.recalculation_service import RecalculationService
+        from app.services.shard_service import ShardService
+
+        analysis_service = AnalysisService()
+        return {
+            JobType.PROCESS_ANALYSIS: analysis_service.run_process_job,
+            JobType.RESTART_ANALYSIS: analysis_service.run_process_job,
+            JobType.RECALCULATE_ANALYSIS: RecalculationService().run_recalculate_job,
+            JobType.ANALYSIS_SHARD: ShardService().run_shard_job,
+            JobType.MERGE_SHARDS: analysis_service.run_merge_job,
+            JobType.COPY_RESULTS: analysis_service.run_copy_job,
+        }
+
+    def failure_handlers(self):
+        from app.services.analysis_service import AnalysisService
+
+        analysis_service = AnalysisService()
+        # Jobs que produzem o resultado da análise: se falham de vez, a líder é abandonada
+        return {
+            JobType.PROCESS_ANALYSIS: analysis_service.abandon_leader,
+            JobType.RESTART_ANALYSIS: analysis_service.abandon_leader,
+            JobType.ANALYSIS_SHARD: analysis_service.abandon_leader,
+            JobType.MERGE_SHARDS: analysis_service.abandon_leader,
+        }
+
+    def execute(self, job):
+        handler = self.handlers().get(job.job_type)
+        if handler is None:
+            raise ValueError(f"Nenhum handler registrado para o job {job.job_type.name}.")
+        return handler(job)
+
+    def run_next(self, worker_id, job_types=None) -> bool:
+        """Reserva e executa um job. Retorna False se a fila estiver vazia."""
+        exhausted = []
+        job = JobRepository.claim(worker_id, self.LEASE_SECONDS, job_types, exhausted)
+        for failed_job in exhausted:
+            AnalysisEventBus.publish(failed_job.analysis_id, "error", {
+                "job_type": failed_job.job_type.name, "error": failed_job.error, "will_retry": False,
+            })
+            self.handle_failure(failed_job)
+        if not job:
+            return False
+
+        print(f"[JobService] {worker_id} executando job {job.id} ({job.job_type.name}, tentativa {job.attempts})")
+        self.observe_queue_depth()
+        started = time.perf_counter()
+        outcome = "done"
+        if job.job_type in (JobType.PROCESS_ANALYSIS, JobType.RESTART_ANALYSIS) and job.attempts == 1:
+            # Nova execução: o snapshot não deve somar o andamento da anterior
+            AnalysisEventBus.reset(job.analysis_id)
+        AnalysisEventBus.set_context(job.analysis_id)
+        ResourceTracker.start(attempt=job.attempts)
+        lease = JobLease.start(job.id, worker_id)
+        heartbeat = JobHeartbeat(job.id, worker_id, self.HEARTBEAT_SECONDS, ResourceTracker.sampler(), lease)
+        heartbeat.start()
+        AnalysisEventBus.stage("job_started", job_type=job.job_type.name, attempt=job.attempts)
+        try:
+            with Metrics.origin(f"job:{job.job_type.name}"):
+                result = self.profiling_service.run(job, self.execute)
+            JobLease.check()
+            JobRepository.complete(job.id, worker_id, result if isinstance(result, dict) else None)
+            print(f"[JobService] Job {job.id} finalizado")
+        except Exception as e:
+            traceback.print_exc()
+            if lease.is_lost():
+                # O job é de outro worker agora: status, eventos e falha definitiva ficam com ele
+                outcome = "lease_lost"
+                print(f"[JobService] Job {job.id} abandonado por {worker_id}: lease perdido")
+                return True
+            outcome = "retry" if job.attempts < job.max_attempts else "failed"
+            status = JobRepository.fail(job.id, worker_id, f"{type(e).__name__}: {e}")
+            AnalysisEventBus.publish(job.analysis_id, "error", {
+                "job_type": job.job_type.name,
+                "error": f"{type(e).__name__}: {e}",
+                "will_retry": job.attempts < job.max_attempts,
+            })
+            if status == JobStatus.FAILED:
+                self.handle_failure(job)
+        finally:
+            heartbeat.stop()
+            JobLease.clear()
+            AnalysisEventBus.clear_context()
+            Metrics.job(job.job_type.name, time.perf_counter() - started, outcome)
+            self.save_usage(job, ResourceTracker.stop())
+        return True
+
+    def handle_failure(self, job):
+        """Falha definitiva (tentativas esgotadas, inclusive por lease expirado) de um job."""
+        handler = self.failure_handlers().get(job.job_type)
+        if handler is None:
+            return
+        try:
+            handler(job)
+        except Exception as e:
+            print(f"[JobService] Falha ao tratar a falha definitiva do job {job.id}: {e}")
+
+    def save_usage(self, job, usage):
+        try:
+            JobUsageRepository.save(JobUsage(
+                job_id=job.id,
+                analysis_id=job.analysis_id,
+                job_type=job.job_type.name,
+                attempt=job.attempts,
+                usage=usage,
+            ))
+        except Exception as e:
+            print(f"[JobService] Falha ao registrar uso de recursos do job {job.id}: {e}")
+
+    def resource_usage(self, analysis_id):
+        """
+        Recursos da última execução da análise: execuções registradas desde o último
+        PROCESS/RESTART (shards, merge, cópia, tentativas) mais o job em andamento.
+        """
+        runs = [
+            job.created_at for job in JobRepository.find_by_analysis_id(analysis_id)
+            if job.job_type in (JobType.PROCESS_ANALYSIS, JobType.RESTART_ANALYSIS)
+        ]
+        usages = [row.usage for row in JobUsageRepository.find_by_analysis_id(analysis_id, max(runs) if runs else None)]
+        usages.append(ResourceTracker.snapshot())
+        return ResourceTracker.merge(usages)
+
+    def observe_queue_depth(self):
+        try:
+            Metrics.QUEUE_DEPTH.observe(JobRepository.count_by_status().get(JobStatus.QUEUED.name, 0))
+        except Exception as e:
+            print(f"[JobService] Falha ao medir a fila: {e}")
+
+    def ensure_workers(self):
+        """
+        Inicia o pool do processo (IEDI_INPROCESS_WORKERS=0 delega a um worker externo).
+        Chamado no boot de cada processo web, para retomar jobs enfileirados ou com lease
+        vencido após reinício/reciclagem, e em cada enqueue.
+        """
+        size = int(os.getenv("IEDI_INPROCESS_WORKERS", "2"))
+        if size <= 0:
+            return
+        with JobService._pool_lock:
+            if JobService._pool is None:
+                JobService._pool = JobWorkerPool(self, size)
+                JobService._pool.start()
+
+
+class JobHeartbeat:
+    """
+    Renova periodicamente o lease do job enquanto ele executa e amostra o RSS do job a cada
+    SAMPLE_SECONDS. Se outro worker reservou o job, marca o JobLease como perdido.
+    """
+
+    SAMPLE_SECONDS = float(os.getenv("IEDI_RSS_SAMPLE_SECONDS", "1"))
+
+    def __init__(self, job_id, worker_id, interval, sample=None, lease=None):
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.interval = interval
+        self.sample = sample
+        self.lease = lease
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self.run, name=f"heartbeat-{job_id}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def run(self):
+        tick = min(self.interval, self.SAMPLE_SECONDS) if self.sample else self.interval
+        next_heartbeat = time.monotonic() + self.interval
+        lease_lost = False
+        while not self._stop.wait(tick):
+            if self.sample:
+                self.sample()
+            if lease_lost or time.monotonic() < next_heartbeat:
+                continue
+            next_heartbeat = time.monotonic() + self.interval
+            try:
+                if not JobRepository.heartbeat(self.job_id, self.worker_id):
+                    print(f"[JobHeartbeat] Lease do job {self.job_id} perdido por {self.worker_id}")
+                    lease_lost = True
+                    if self.lease is not None:
+                        self.lease.mark_lost()
+            except Exception as e:
+                print(f"[JobHeartbeat] Falha ao renovar lease do job {self.job_id}: {e}")
+
+    def stop(self):
+        self._stop.set()
+
+
+class JobWorkerPool:
+    """Pool de threads que consome a fila até ser parado."""
+
+    def __init__(self, job_service, size, job_types=None):
+        self.job_service = job_service
+        self.size = size
+        self.job_types = job_types
+        self._stop = threading.Event()
+        self._threads = []
+
+    def worker_id(self, index):
+        return f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+    def start(self):
+        for index in range(self.size):
+            thread = threading.Thread(target=self.run, args=(self.worker_id(index),), name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        print(f"[JobWorkerPool] {self.size} workers iniciados (pid={os.getpid()})")
+
+    def run(self, worker_id):
+        while not self._stop.is_set():
+            try:
+                if not self.job_service.run_next(worker_id, self.job_types):
+                    self._stop.wait(self.job_service.POLL_SECONDS)
+            except Exception as e:
+                print(f"[JobWorkerPool] Erro no worker {worker_id}: {e}")
+                self._stop.wait(self.job_service.POLL_SECONDS)
+
+    def is_alive(self):
+        return any(thread.is_alive() for thread in self._threads)
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
@@ -1,5 +1,6 @@
-import pandas as pd
-from app.repositories.bank_repository import BankRepository
+from app.infra.event_bus import AnalysisEventBus
+from app.infra.job_lease import JobLease
+from app.infra.metrics import Metrics
 from app.services.brandwatch_service import BrandwatchService
 from app.services.mention_service import MentionService
 from app.models.mention_analysis import MentionAnalysis
@@ -7,10 +8,13 @@ from app.enums.sentiment import Sentiment
 from app.enums.reach_group import ReachGroup
 from app.constants.weights import TITLE_WEIGHT, SUBTITLE_WEIGHT, RELEVANT_OUTLET_WEIGHT, NICHE_OUTLET_WEIGHT
 from app.constants.weights import REACH_GROUP_THRESHOLDS, REACH_GROUP_WEIGHTS
-from app.repositories.media_outlet_repository import MediaOutletRepository
 from app.repositories.mention_analysis_repository import MentionAnalysisRepository
 from app.repositories.mention_repository import MentionRepository
 from app.services.bank_analysis_service import BankAnalysisService
+from app.services.reference_data_service import ReferenceDataService
+from app.utils.lazy_import import lazy_import
+
+pd = lazy_import("pandas")
 
 class MentionAnalysisService:
 
@@ -28,8 +32,10 @@ class MentionAnalysisService:
             else:
                 self.process_standard_dates(analysis, bank_analyses, parent_name)
         finally:
-            MentionRepository.flush_batch()
-            MentionAnalysisRepository.flush_batch()
+            # Sem o lease, os CSVs da análise são do novo dono do job
+            if JobLease.held():
+                MentionRepository.flush_batch()
+                MentionAnalysisRepository.flush_batch()
 
     def process_standard_dates(self, analysis, bank_analyses, parent_name):
         results = {}
@@ -37,6 +43,7 @@ class MentionAnalysisService:
             start_date = bank_analyses[0].start_date
             end_date = bank_analyses[0].end_date
             category_names = [bank.bank_name.value for bank in bank_analyses]
+            AnalysisEventBus.stage("fetching", banks=[bank.bank_name.name for bank in bank_analyses])
             mentions = self.mention_service.fetch_and_filter_mentions(
                 start_date=start_date,
                 end_date=end_date,
@@ -46,6 +53,7 @@ class MentionAnalysisService:
             )
 
             for bank_analysis in bank_analyses:
+                AnalysisEventBus.stage("scoring", bank_name=bank_analysis.bank_name.name)
                 processed = self.process_mentions(mentions, bank_analysis.bank_name)
                 results[bank_analysis.bank_name.value] = processed
 
@@ -55,6 +63,7 @@ class MentionAnalysisService:
     def process_custom_dates(self, analysis, bank_analyses, parent_name):
         results = {}
         for bank_analysis in bank_analyses:
+            AnalysisEventBus.stage("fetching", banks=[bank_analysis.bank_name.name])
             mentions = self.mention_service.fetch_and_filter_mentions(
                 start_date=bank_analysis.start_date,
                 end_date=bank_analysis.end_date,
@@ -63,6 +72,7 @@ class MentionAnalysisService:
                 category_names=[bank_analysis.bank_name.value]
             )
 
+            AnalysisEventBus.stage("scoring", bank_name=bank_analysis.bank_name.name)
             processed = self.process_mentions(mentions, bank_analysis.bank_name)
             results[bank_analysis.bank_name.value] = processed
 
@@ -70,7 +80,7 @@ class MentionAnalysisService:
         return results
 
     def process_mentions(self, mentions, bank_name):
-        bank = BankRepository.find_by_name(bank_name)
+        bank = ReferenceDataService.bank(bank_name)
         df_mention_analyses = self.create_mention_analysis_bulk(mentions, bank)
         mention_analyses_dicts = df_mention_analyses.to_dict(orient='records')
         MentionAnalysisRepository.bulk_save(mention_analyses_dicts)
@@ -83,6 +93,8 @@ class MentionAnalysisService:
         mentions_analysis = MentionAnalysis()
         mentions_analysis.mention_url = mention.url
         mentions_analysis.bank_name = bank.name
+        mentions_analysis.published_date = mention.published_date
+        mentions_analysis.domain = mention.domain
         mentions_analysis.sentiment = Sentiment.from_string(mention.sentiment) if mention.sentiment else None
         mentions_analysis.reach_group = self.classify_reach_group(mention.monthly_visitors)
         mentions_analysis.title_mentioned = False
@@ -99,8 +111,7 @@ class MentionAnalysisService:
                 if v and v.lower() in para_lower:
                     mentions_analysis.subtitle_mentioned = True
                     break
-        relevant_domains = [media_outlet.domain for media_outlet in MediaOutletRepository.find_by_niche(False)]
-        niche_domains = [media_outlet.domain for media_outlet in MediaOutletRepository.find_by_niche(True)]
+        relevant_domains, niche_domains = ReferenceDataService.outlet_domains()
         relevant_vehicle = mention.domain in relevant_domains
         niche_vehicle = mention.domain in niche_domains
         mentions_analysis.niche_vehicle = niche_vehicle
@@ -127,13 +138,12 @@ class MentionAnalysisService:
         else:
             sign = 1
         if mentions_analysis.numerator is not None and mentions_analysis.denominator:
-            raw_score = (mentions_analysis.numerator / mentions_analysis.denominator) * sign
-            raw_normalized = ((raw_score + 1) / 2) * 10
+            raw_score = max(-1, min(1, (mentions_analysis.numerator / mentions_analysis.denominator) * sign))
         else:
             raw_score = 0
-            raw_normalized = 0
+        # Mesma ordem do motor em lote: arredonda o score e normaliza o valor arredondado
         mentions_analysis.iedi_score = round(raw_score, 2)
-        mentions_analysis.iedi_normalized = round(raw_normalized, 2)
+        mentions_analysis.iedi_normalized = round(((mentions_analysis.iedi_score + 1) / 2) * 10, 2)
         return mentions_analysis
 
     def extract_first_paragraph(self, full_text: str) -> str:
@@ -158,6 +168,10 @@ class MentionAnalysisService:
         return ReachGroup.D
 
     def create_mention_analysis_bulk(self, mentions, bank):
+        with Metrics.stage("score", len(mentions)):
+            return self.score_bulk(mentions, bank)
+
+    def score_bulk(self, mentions, bank):
         df = pd.DataFrame([{
             'mention_url': mention.url,
             'title': mention.title,
@@ -183,8 +197,7 @@ class MentionAnalysisService:
             ) if row['subtitle_used'] else False,
             axis=1
         )
-        relevant_domains = [media_outlet.domain for media_outlet in MediaOutletRepository.find_by_niche(False)]
-        niche_domains = [media_outlet.domain for media_outlet in MediaOutletRepository.find_by_niche(True)]
+        relevant_domains, niche_domains = ReferenceDataService.outlet_domains()
         df['relevant_vehicle'] = df['domain'].isin(relevant_domains)
         df['niche_vehicle'] = df['domain'].isin(niche_domains)
         df['numerator'] = (
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import base64
+import json
+
+from app.enums.bank_name import BankName
+from app.enums.reach_group import ReachGroup
+from app.enums.sentiment import Sentiment
+from app.infra.csv_storage import CSVStorage
+from app.utils.lru_cache import LRUCache
+from app.utils.lazy_import import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+class MentionIndex:
+    """
+    Índice colunar das menções pontuadas de uma análise: colunas em arrays numpy,
+    máscaras por valor para os filtros categóricos e as ordenações pré-calculadas.
+    Uma consulta combina máscaras e percorre a ordenação, sem reler os CSVs.
+    """
+
+    CATEGORICAL_COLUMNS = ['bank_name', 'sentiment', 'reach_group', 'domain']
+    BOOLEAN_COLUMNS = ['niche_vehicle', 'title_mentioned', 'subtitle_mentioned', 'headline_mentioned']
+    FILTERS = CATEGORICAL_COLUMNS + BOOLEAN_COLUMNS
+    SORTS = ['iedi_score', 'published_date']
+
+    def __init__(self, frame: pd.DataFrame, version: str):
+        self.version = version
+        self.size = len(frame)
+        self.frame = frame.reset_index(drop=True)
+
+        self.masks = {}
+        for column in self.CATEGORICAL_COLUMNS:
+            values = self.frame[column].to_numpy()
+            self.masks[column] = {value: values == value for value in pd.unique(values) if isinstance(value, str)}
+        for column in self.BOOLEAN_COLUMNS:
+            values = self.frame[column].to_numpy(dtype=bool)
+            self.masks[column] = {True: values, False: ~values}
+
+        # Ordem ascendente estável (empate pela posição); nulos sempre no fim
+        self.orders = {}
+        for column in self.SORTS:
+            keys = self.frame[column].to_numpy(dtype='float64')
+            valid = ~np.isnan(keys)
+            ascending = np.flatnonzero(valid)[np.argsort(keys[valid], kind='stable')]
+            descending = np.flatnonzero(valid)[np.argsort(-keys[valid], kind='stable')]
+            missing = np.flatnonzero(~valid)
+            self.orders[column] = np.concatenate([ascending, missing])
+            self.orders[f"-{column}"] = np.concatenate([descending, missing])
+
+    def mask(self, filters) -> np.ndarray:
+        mask = np.ones(self.size, dtype=bool)
+        for column, values in filters.items():
+            column_mask = np.zeros(self.size, dtype=bool)
+            for value in values:
+                value_mask = self.masks[column].get(value)
+                if value_mask is not None:
+                    column_mask |= value_mask
+            mask &= column_mask
+        return mask
+
+    def query(self, filters, sort, limit, after_rank=-1):
+        """Retorna (linhas, rank da última linha ou None, total filtrado)."""
+        order = self.orders[sort]
+        ranks = np.flatnonzero(self.mask(filters)[order])
+        total = len(ranks)
+        ranks = ranks[ranks > after_rank][:limit + 1]
+        has_more = len(ranks) > limit
+        ranks = ranks[:limit]
+        rows = self.frame.iloc[order[ranks]]
+        last_rank = int(ranks[-1]) if has_more else None
+        return rows, last_rank, total
+
+
+class MentionExplorerService:
+    """Consulta interativa das menções pontuadas de uma análise (drill-down do IEDI por banco)."""
+
+    DEFAULT_PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 500
+
+    indexes = LRUCache(maxsize=8)
+
+    def find_page(self, analysis_id, filters=None, sort=None, limit=None, cursor=None):
+        index = self.get_index(analysis_id)
+        sort = sort or "-iedi_score"
+        if sort not in index.orders:
+            raise ValueError(f"Ordenação '{sort}' inválida. Use: {', '.join(index.orders)}.")
+        limit = self.validate_limit(limit)
+        after_rank = self.decode_cursor(cursor, index.version, sort) if cursor else -1
+
+        rows, last_rank, total = index.query(self.validate_filters(filters or {}), sort, limit, after_rank)
+        next_cursor = self.encode_cursor(index.version, sort, last_rank) if last_rank is not None else None
+        return {
+            "mentions": [self.serialize(row) for row in rows.to_dict(orient='records')],
+            "total": total,
+            "next_cursor": next_cursor,
+        }
+
+    def get_index(self, analysis_id) -> MentionIndex:
+        version = self.version(analysis_id)
+        index = self.indexes.get(analysis_id)
+        if index is None or index.version != version:
+            index = MentionIndex(self.load_frame(analysis_id), version)
+            self.indexes.set(analysis_id, index)
+        return index
+
+    def version(self, analysis_id):
+        """Versão dos arquivos da análise: muda quando um recálculo/restart regrava os CSVs."""
+        parts = []
+        for prefix in ("mention_analysis", "mentions"):
+            file_path = CSVStorage.DATA_DIR / f"{prefix}_{analysis_id}.csv"
+            if file_path.exists():
+                stat = file_path.stat()
+                parts.append(f"{stat.st_mtime_ns}:{stat.st_size}")
+            elif prefix == "mention_analysis":
+                raise FileNotFoundError(f"Resultados da análise {analysis_id} não encontrados.")
+        return "|".join(parts)
+
+    def load_frame(self, analysis_id) -> pd.DataFrame:
+        analyses = pd.concat(
+            CSVStorage.iter_csv("mention_analysis", analysis_id, CSVStorage.MENTION_ANALYSIS_COLUMNS),
+            ignore_index=True,
+        )
+        mention_chunks = list(CSVStorage.iter_csv("mentions", analysis_id, ['url', 'title', 'domain', 'published_date']))
+        if mention_chunks:
+            mentions = pd.concat(mention_chunks, ignore_index=True).drop_duplicates(subset=['url'], keep='last')
+            frame = analyses.merge(mentions, left_on='mention_url', right_on='url', how='left')
+        else:
+            frame = analyses.assign(title=None, domain=None, published_date=None)
+
+        bank_names = {bank.value: bank.name for bank in BankName}
+        frame['bank_name'] = frame['bank_name'].map(bank_names)
+        frame['sentiment'] = frame['sentiment'].astype('string').str.lower().astype(object)
+        frame['domain'] = frame['domain'].astype('string').str.lower().astype(object)
+        for column in ('niche_vehicle', 'title_mentioned', 'subtitle_mentioned'):
+            frame[column] = frame[column].astype('string').str.lower().eq('true').fillna(False).astype(bool)
+        # Banco citado no título ou no subtítulo
+        frame['headline_mentioned'] = frame['title_mentioned'] | frame['subtitle_mentioned']
+        # Datas guardadas como segundos desde a época (NaN se ausente) para ordenar como número
+        published_date = pd.to_datetime(frame['published_date'], utc=True, errors='coerce')
+        frame['published_date'] = (published_date - pd.Timestamp(0, tz='UTC')).dt.total_seconds()
+        return frame.drop(columns=['url'], errors='ignore')
+
+    def validate_filters(self, filters):
+        validated = {}
+        for column, values in filters.items():
+            values = [value for value in values if value not in (None, "")]
+            if not values:
+                continue
+            if column == 'bank_name':
+                invalid = [value for value in values if value not in BankName._member_names_]
+            elif column == 'sentiment':
+                values = [value.lower() for value in values]
+                invalid = [value for value in values if value not in {s.value for s in Sentiment}]
+            elif column == 'reach_group':
+                values = [value.upper() for value in values]
+                invalid = [value for value in values if value not in ReachGroup._member_names_]
+            elif column == 'domain':
+                values = [value.lower() for value in values]
+                invalid = []
+            elif column in MentionIndex.BOOLEAN_COLUMNS:
+                invalid = [value for value in values if str(value).lower() not in ("true", "false")]
+                values = [str(value).lower() == "true" for value in values]
+            else:
+                raise ValueError(f"Filtro '{column}' inválido.")
+            if invalid:
+                raise ValueError(f"Valores inválidos para '{column}': {', '.join(map(str, invalid))}.")
+            validated[column] = values
+        return validated
+
+    def validate_limit(self, limit):
+        if limit is None or limit == "":
+            return self.DEFAULT_PAGE_SIZE
+        try:
+            limit = int(limit)
+        except (TypeError, ValueError):
+            raise ValueError("O parâmetro limit deve ser um número inteiro.")
+        if not 1 <= limit <= self.MAX_PAGE_SIZE:
+            raise ValueError(f"O parâmetro limit deve estar entre 1 e {self.MAX_PAGE_SIZE}.")
+        return limit
+
+    def encode_cursor(self, version, sort, rank):
+        content = json.dumps({"v": version, "s": sort, "r": rank})
+        return base64.urlsafe_b64encode(content.encode("utf-8")).decode("ascii")
+
+    def decode_cursor(self, cursor, version, sort):
+        try:
+            content = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            rank = int(content["r"])
+        except (ValueError, KeyError, TypeError):
+            raise ValueError("Cursor de paginação inválido.")
+        if content.get("v") != version or content.get("s") != sort:
+            raise ValueError("Cursor expirado: os resultados da análise mudaram ou a ordenação é outra.")
+        return rank
+
+    def serialize(self, row):
+        published_date = row.get('published_date')
+        return {
+            "mention_url": row.get('mention_url'),
+            "title": row.get('title') if isinstance(row.get('title'), str) else None,
+            "domain": row.get('domain') if isinstance(row.get('domain'), str) else None,
+            "published_date": pd.Timestamp(published_date, unit='s', tz='UTC').isoformat() if not pd.isna(published_date) else None,
+            "bank_name": row.get('bank_name'),
+            "sentiment": row.get('sentiment'),
+            "reach_group": row.get('reach_group'),
+            "niche_vehicle": bool(row.get('niche_vehicle')),
+            "title_mentioned": bool(row.get('title_mentioned')),
+            "subtitle_mentioned": bool(row.get('subtitle_mentioned')),
+            "iedi_score": None if pd.isna(row.get('iedi_score')) else float(row.get('iedi_score')),
+            "iedi_normalized": None if pd.isna(row.get('iedi_normalized')) else float(row.get('iedi_normalized')),
+        }
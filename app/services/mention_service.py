@@ -1,30 +1,104 @@
+import hashlib
+from collections import Counter
+
+from app.infra.csv_storage import CSVStorage
+from app.infra.event_bus import AnalysisEventBus
+from app.infra.metrics import Metrics
 from app.models.mention import Mention
 from app.repositories.mention_repository import MentionRepository
 from app.services.brandwatch_service import BrandwatchService
 from app.utils.date_utils import DateUtils
+from app.utils.domain_validator import DomainValidator
 
 class MentionService:
 
+    REJECTED_DOMAINS_DEFAULT_LIMIT = 50
+    REJECTED_DOMAINS_MAX_LIMIT = 1000
+
     brandwatch_service = BrandwatchService()
+    domain_validator = DomainValidator
 
     def fetch_and_filter_mentions(self, start_date, end_date, query_name, parent_name, category_names=None):
-        mentions_data = self.brandwatch_service.fetch(
-            start_date=start_date,
-            end_date=end_date,
-            query_name=query_name,
-            parent_name=parent_name,
-            category_names=category_names
-        )
+        with Metrics.stage("fetch") as stage:
+            mentions_data = self.brandwatch_service.fetch(
+                start_date=start_date,
+                end_date=end_date,
+                query_name=query_name,
+                parent_name=parent_name,
+                category_names=category_names
+            )
+            stage.rows = len(mentions_data)
 
         filtered_mentions = []
-        for mention_data in mentions_data:
-            if self.passes_filter(mention_data, parent_name, category_names):
-                mention = self.create_mention(mention_data, parent_name)
-                filtered_mentions.append(mention)
+        with Metrics.stage("filter", len(mentions_data)):
+            for mention_data in mentions_data:
+                if self.passes_filter(mention_data, parent_name, category_names):
+                    mention = self.create_mention(mention_data, parent_name)
+                    filtered_mentions.append(mention)
+
+        # Menções de veículos não monitorados saem antes de serem gravadas e pontuadas
+        with Metrics.stage("validate_domains", len(filtered_mentions)):
+            validation = self.domain_validator.validate_mentions(filtered_mentions)
+            filtered_mentions = validation['kept']
+        Metrics.domain_rejected(validation['mode'], validation['invalid_count'])
+        self.save_rejected_domains(validation, start_date, end_date, query_name, parent_name, category_names)
 
         MentionRepository.bulk_save(filtered_mentions)
+        AnalysisEventBus.progress(filtered_mentions=len(filtered_mentions), rejected_mentions=validation['invalid_count'])
         return filtered_mentions
 
+    def save_rejected_domains(self, validation, start_date, end_date, query_name, parent_name, category_names):
+        """Grava o relatório desta coleta; uma coleta repetida (ex.: shard re-executado) sobrescreve o seu."""
+        analysis_id = AnalysisEventBus.current()
+        if not analysis_id or validation['mode'] == "off":
+            return
+        fetch = "|".join(str(part) for part in (query_name, parent_name, sorted(category_names or []), start_date, end_date))
+        fetch_key = hashlib.sha1(fetch.encode("utf-8")).hexdigest()[:12]
+        CSVStorage.save_json("rejected_domains", f"{analysis_id}_{fetch_key}", {
+            "mode": validation['mode'],
+            "start_date": start_date,
+            "end_date": end_date,
+            "category_names": category_names,
+            "total_mentions": validation['total_count'],
+            "rejected_mentions": validation['invalid_count'],
+            "domains": validation['invalid_domains'],
+        })
+
+    def reset_rejected_domains(self, analysis_id):
+        """Descarta os relatórios de uma execução anterior (ex.: reinício com outros bancos)."""
+        return CSVStorage.delete_json_parts("rejected_domains", analysis_id)
+
+    def find_rejected_domains(self, analysis_id, limit=None):
+        """Domínios não monitorados da análise, somando as coletas, do mais frequente ao menos."""
+        limit = self.validate_limit(limit)
+        parts = CSVStorage.load_json_parts("rejected_domains", analysis_id)
+        if not parts:
+            raise FileNotFoundError(f"Nenhum relatório de domínios rejeitados para a análise {analysis_id}.")
+
+        domains = Counter()
+        for part in parts:
+            domains.update(part["domains"])
+        ranked = sorted(domains.items(), key=lambda item: (-item[1], item[0]))
+        return {
+            "analysis_id": analysis_id,
+            "modes": sorted({part["mode"] for part in parts}),
+            "total_mentions": sum(part["total_mentions"] for part in parts),
+            "rejected_mentions": sum(part["rejected_mentions"] for part in parts),
+            "total_domains": len(ranked),
+            "domains": [{"domain": domain, "mentions": count} for domain, count in ranked[:limit]],
+        }
+
+    def validate_limit(self, limit):
+        if limit is None or limit == "":
+            return self.REJECTED_DOMAINS_DEFAULT_LIMIT
+        try:
+            limit = int(limit)
+        except (TypeError, ValueError):
+            raise ValueError("O parâmetro limit deve ser um número inteiro.")
+        if not 1 <= limit <= self.REJECTED_DOMAINS_MAX_LIMIT:
+            raise ValueError(f"O parâmetro limit deve estar entre 1 e {self.REJECTED_DOMAINS_MAX_LIMIT}.")
+        return limit
+
     def passes_filter(self, mention_data, parent_name, category_names):
         content_source = mention_data.get('contentSourceName')
 
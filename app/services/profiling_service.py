@@ -0,0 +1,91 @@
+import cProfile
+import io
+import marshal
+import pstats
+import shutil
+from pathlib import Path
+
+from app.infra.csv_storage import CSVStorage
+
+class ProfilingService:
+    """
+    Profiling opcional (cProfile) dos jobs de uma análise.
+    Cada job com payload["profile"] grava data/profiles/<analysis_id>/<job_id>.prof;
+    o download junta os arquivos da execução (processo, shards e merge) em um único pstats.
+    """
+
+    FORMATS = {"prof": "application/octet-stream", "text": "text/plain; charset=utf-8"}
+    SORTS = ("cumulative", "tottime", "calls", "ncalls")
+    DEFAULT_LIMIT = 50
+    MAX_LIMIT = 1000
+
+    def profile_dir(self, analysis_id) -> Path:
+        return CSVStorage.DATA_DIR / "profiles" / str(analysis_id)
+
+    def reset(self, analysis_id):
+        """Descarta perfis de execuções anteriores antes de uma nova execução com profiling."""
+        shutil.rmtree(self.profile_dir(analysis_id), ignore_errors=True)
+
+    def run(self, job, handler):
+        """Executa handler(job), sob cProfile apenas quando o job pediu profiling."""
+        if not (job.payload or {}).get("profile"):
+            return handler(job)
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            return handler(job)
+        finally:
+            profiler.disable()
+            self.save(job, profiler)
+
+    def save(self, job, profiler):
+        try:
+            directory = self.profile_dir(job.analysis_id)
+            directory.mkdir(parents=True, exist_ok=True)
+            CSVStorage.write_atomic(directory / f"{job.id}.prof", lambda path: profiler.dump_stats(str(path)))
+        except Exception as e:
+            print(f"[ProfilingService] Falha ao salvar perfil do job {job.id}: {e}")
+
+    def validate(self, fmt=None, sort=None, limit=None):
+        fmt = fmt or "prof"
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Formato inválido. Use um de: {', '.join(self.FORMATS)}.")
+
+        sort = sort or "cumulative"
+        if sort not in self.SORTS:
+            raise ValueError(f"Ordenação inválida. Use uma de: {', '.join(self.SORTS)}.")
+
+        if limit in (None, ""):
+            limit = self.DEFAULT_LIMIT
+        try:
+            limit = int(limit)
+        except (TypeError, ValueError):
+            raise ValueError("O parâmetro limit deve ser um número inteiro.")
+        if limit < 1 or limit > self.MAX_LIMIT:
+            raise ValueError(f"O parâmetro limit deve estar entre 1 e {self.MAX_LIMIT}.")
+
+        return {"fmt": fmt, "sort": sort, "limit": limit}
+
+    def load(self, analysis_id) -> pstats.Stats:
+        files = sorted(self.profile_dir(analysis_id).glob("*.prof"))
+        if not files:
+            raise FileNotFoundError("Nenhum perfil encontrado para esta análise. Reprocesse com profile=true.")
+
+        stats = pstats.Stats(str(files[0]), stream=io.StringIO())
+        for file_path in files[1:]:
+            stats.add(str(file_path))
+        return stats
+
+    def export(self, analysis_id, fmt="prof", sort="cumulative", limit=DEFAULT_LIMIT) -> bytes:
+        """pstats binário (para snakeviz/pstats) ou o relatório em texto das funções mais caras."""
+        stats = self.load(analysis_id)
+
+        if fmt == "text":
+            stream = io.StringIO()
+            stats.stream = stream
+            stats.sort_stats(sort).print_stats(limit)
+            return stream.getvalue().encode("utf-8")
+
+        # Mesmo conteúdo de Stats.dump_stats, sem passar por arquivo temporário
+        return marshal.dumps(stats.stats)
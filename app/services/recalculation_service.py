@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from app.enums.analysis_status import AnalysisStatus
+from app.infra.csv_storage import CSVStorage
+from app.infra.job_lease import JobLease
+from app.models.mention import Mention
+from app.repositories.analysis_repository import AnalysisRepository
+from app.repositories.bank_analysis_repository import BankAnalysisRepository
+from app.repositories.mention_analysis_repository import MentionAnalysisRepository
+from app.services.bank_analysis_service import BankAnalysisService
+from app.services.comparison_service import ComparisonService
+from app.services.highlight_service import HighlightService
+from app.services.mention_analysis_service import MentionAnalysisService
+from app.services.reference_data_service import ReferenceDataService
+from app.utils.http_cache import ResponseCache
+from app.utils.lazy_import import lazy_import
+
+pd = lazy_import("pandas")
+
+class RecalculationService:
+    """
+    Recalcula mention_analysis e bank_analysis a partir das mentions já salvas em CSV,
+    sem nova coleta no Brandwatch (ex.: após correção de domínios dos veículos).
+    """
+
+    mention_analysis_service = MentionAnalysisService()
+    bank_analysis_service = BankAnalysisService()
+    comparison_service = ComparisonService()
+    highlight_service = HighlightService()
+
+    def validate(self, analysis_id):
+        analysis = AnalysisRepository.find_by_id(analysis_id)
+        if not analysis:
+            raise LookupError("Análise não encontrada")
+        if analysis.status != AnalysisStatus.DONE:
+            raise ValueError(f"Análise deve estar DONE para recalcular. Status atual: {analysis.status.name}")
+        mentions_csv_path = CSVStorage.DATA_DIR / f"mentions_{analysis_id}.csv"
+        if not mentions_csv_path.exists():
+            raise FileNotFoundError(f"CSV de mentions não encontrado: {mentions_csv_path}")
+        return analysis
+
+    def run_recalculate_job(self, job):
+        return self.recalculate(job.analysis_id)
+
+    def recalculate(self, analysis_id):
+        self.validate(analysis_id)
+        # Recálculo usa bancos e veículos atuais, não o que estiver em memória
+        ReferenceDataService.invalidate()
+
+        mentions_df = CSVStorage.load_mentions(analysis_id)
+        mentions = self.build_mentions(mentions_df)
+        bank_analyses = BankAnalysisRepository.find_by_analysis_id(analysis_id)
+
+        MentionAnalysisRepository.set_analysis_context(analysis_id)
+        banks_updated = 0
+        mentions_recalculated = 0
+        try:
+            for bank_analysis in bank_analyses:
+                bank_mentions = [m for m in mentions if bank_analysis.bank_name.value in m.categories]
+                if not bank_mentions:
+                    continue
+
+                bank = ReferenceDataService.bank(bank_analysis.bank_name)
+                df_mention_analyses = self.mention_analysis_service.create_mention_analysis_bulk(bank_mentions, bank)
+                MentionAnalysisRepository.bulk_save(df_mention_analyses.to_dict(orient='records'))
+                self.bank_analysis_service.compute_and_persist_bank_metrics(bank_analysis, df_mention_analyses)
+
+                banks_updated += 1
+                mentions_recalculated += len(df_mention_analyses)
+        finally:
+            if JobLease.held():
+                MentionAnalysisRepository.flush_batch()
+
+        JobLease.check()
+        self.comparison_service.invalidate(analysis_id)
+        ResponseCache.invalidate(analysis_id)
+        self.highlight_service.compute_and_store(analysis_id)
+        return {
+            "total_mentions": len(mentions),
+            "mentions_recalculated": mentions_recalculated,
+            "banks_updated": banks_updated,
+        }
+
+    def build_mentions(self, mentions_df: pd.DataFrame):
+        mentions = []
+        for row in mentions_df.to_dict(orient='records'):
+            published_date = row.get('published_date')
+            categories = row.get('categories')
+            mentions.append(Mention(
+                url=row.get('url'),
+                title=self.to_text(row.get('title')),
+                snippet=self.to_text(row.get('snippet')),
+                full_text=self.to_text(row.get('full_text')),
+                domain=self.to_text(row.get('domain')),
+                published_date=datetime.fromisoformat(published_date) if isinstance(published_date, str) else None,
+                sentiment=row.get('sentiment') if isinstance(row.get('sentiment'), str) else None,
+                categories=categories.split(',') if isinstance(categories, str) and categories else [],
+                monthly_visitors=int(row.get('monthly_visitors') or 0) if not pd.isna(row.get('monthly_visitors')) else 0,
+            ))
+        return mentions
+
+    def to_text(self, value):
+        return value if isinstance(value, str) else ""
@@ -0,0 +1,81 @@
+import threading
+import time
+
+from app.enums.bank_name import BankName
+from app.repositories.bank_repository import BankRepository
+from app.repositories.media_outlet_repository import MediaOutletRepository
+
+class ReferenceDataService:
+    """
+    Bancos (com variações de nome) e domínios de veículos em memória, recarregados do
+    BigQuery a cada TTL_SECONDS. Evita duas consultas de media_outlet por banco pontuado.
+    """
+
+    TTL_SECONDS = 600
+
+    _lock = threading.Lock()
+    _banks = {}
+    _outlets = None
+    _active_domains = None
+
+    @classmethod
+    def bank(cls, bank_name: BankName):
+        with cls._lock:
+            cached = cls._banks.get(bank_name.name)
+            if cached and time.monotonic() - cached[0] < cls.TTL_SECONDS:
+                return cached[1]
+        bank = BankRepository.find_by_name(bank_name)
+        if bank is not None:
+            with cls._lock:
+                cls._banks[bank_name.name] = (time.monotonic(), bank)
+        return bank
+
+    @classmethod
+    def outlet_domains(cls):
+        """Retorna (domínios relevantes, domínios de nicho) como frozensets."""
+        with cls._lock:
+            cached = cls._outlets
+            if cached and time.monotonic() - cached[0] < cls.TTL_SECONDS:
+                return cached[1], cached[2]
+        relevant = frozenset(outlet.domain for outlet in MediaOutletRepository.find_by_niche(False))
+        niche = frozenset(outlet.domain for outlet in MediaOutletRepository.find_by_niche(True))
+        with cls._lock:
+            cls._outlets = (time.monotonic(), relevant, niche)
+        return relevant, niche
+
+    @classmethod
+    def active_domains(cls):
+        """Domínios dos veículos ativos (monitorados), como frozenset."""
+        with cls._lock:
+            cached = cls._active_domains
+            if cached and time.monotonic() - cached[0] < cls.TTL_SECONDS:
+                return cached[1]
+        domains = frozenset(MediaOutletRepository.find_active_domains())
+        with cls._lock:
+            cls._active_domains = (time.monotonic(), domains)
+        return domains
+
+    @classmethod
+    def load(cls, banks, relevant_domains, niche_domains, active_domains=None):
+        """Carrega bancos e domínios já conhecidos (ex.: benchmarks, aquecimento)."""
+        now = time.monotonic()
+        relevant_domains, niche_domains = frozenset(relevant_domains), frozenset(niche_domains)
+        with cls._lock:
+            cls._banks = {bank.name.name: (now, bank) for bank in banks}
+            cls._outlets = (now, relevant_domains, niche_domains)
+            cls._active_domains = (now, frozenset(active_domains) if active_domains is not None else relevant_domains | niche_domains)
+
+    @classmethod
+    def warm_up(cls):
+        """Carrega todos os bancos e domínios de uma vez (ex.: processo mestre do gunicorn --preload)."""
+        banks = [bank for bank in (cls.bank(bank_name) for bank_name in BankName) if bank is not None]
+        relevant, niche = cls.outlet_domains()
+        active = cls.active_domains()
+        return {"banks": len(banks), "relevant_domains": len(relevant), "niche_domains": len(niche), "active_domains": len(active)}
+
+    @classmethod
+    def invalidate(cls):
+        with cls._lock:
+            cls._banks = {}
+            cls._outlets = None
+            cls._active_domains = None
@@ -0,0 +1,147 @@
+from types import SimpleNamespace
+
+from app.enums.bank_name import BankName
+from app.enums.sentiment import Sentiment
+from app.infra.metrics import Metrics
+from app.services.bank_analysis_service import BankAnalysisService
+from app.services.mention_analysis_service import MentionAnalysisService
+from app.services.mention_service import MentionService
+from app.services.reference_data_service import ReferenceDataService
+from app.utils.date_utils import DateUtils
+from app.utils.micro_batcher import MicroBatcher
+from app.utils.lazy_import import lazy_import
+
+pd = lazy_import("pandas")
+
+class ScoringService:
+    """
+    Pontuação on-line de lotes de menções no formato da API do Brandwatch, sem criar
+    análise. Requisições concorrentes para o mesmo banco são agrupadas pelo MicroBatcher
+    e pontuadas numa única chamada do motor em lote, com bancos e veículos em cache.
+    """
+
+    MAX_MENTIONS = 5_000
+    MAX_BANKS = len(BankName)
+    TIMEOUT_SECONDS = 60
+
+    FEATURE_COLUMNS = [
+        'sentiment', 'reach_group', 'title_mentioned', 'subtitle_used', 'subtitle_mentioned',
+        'relevant_vehicle', 'niche_vehicle', 'numerator', 'denominator', 'iedi_score', 'iedi_normalized',
+    ]
+
+    mention_service = MentionService()
+    mention_analysis_service = MentionAnalysisService()
+    bank_analysis_service = BankAnalysisService()
+
+    batcher = None
+
+    @classmethod
+    def get_batcher(cls) -> MicroBatcher:
+        if cls.batcher is None:
+            cls.batcher = MicroBatcher(cls().score_batch, name="scoring-batcher")
+        return cls.batcher
+
+    def validate(self, payload):
+        if not isinstance(payload, dict):
+            raise ValueError("Corpo da requisição deve ser um objeto JSON.")
+
+        bank_names = payload.get("bank_names")
+        if not bank_names or not isinstance(bank_names, list):
+            raise ValueError("Informe bank_names com ao menos um banco.")
+        invalid = [name for name in bank_names if name not in BankName._member_names_]
+        if invalid:
+            raise ValueError(f"Bancos inválidos: {', '.join(map(str, invalid))}.")
+
+        mentions = payload.get("mentions")
+        if not isinstance(mentions, list) or not mentions:
+            raise ValueError("Informe mentions com ao menos uma menção.")
+        if len(mentions) > self.MAX_MENTIONS:
+            raise ValueError(f"Máximo de {self.MAX_MENTIONS} menções por requisição.")
+
+        for position, mention in enumerate(mentions):
+            if not isinstance(mention, dict):
+                raise ValueError(f"mentions[{position}] deve ser um objeto.")
+            if not (mention.get("url") or mention.get("originalUrl")):
+                raise ValueError(f"mentions[{position}] sem url.")
+            if not isinstance(mention.get("title"), str):
+                raise ValueError(f"mentions[{position}] sem title.")
+            # parse_date devolve None para texto fora do formato (e levanta TypeError para não-texto)
+            try:
+                published_date = DateUtils.parse_date(mention.get("date"))
+            except (TypeError, ValueError):
+                published_date = None
+            if published_date is None:
+                raise ValueError(f"mentions[{position}] com date ausente ou inválida.")
+            sentiment = mention.get("sentiment")
+            if sentiment and sentiment not in Sentiment._value2member_map_:
+                raise ValueError(f"mentions[{position}] com sentiment inválido: {sentiment}.")
+
+        return [BankName[name] for name in dict.fromkeys(bank_names)], mentions, payload.get("parent_name")
+
+    def score(self, payload):
+        bank_names, mentions_data, parent_name = self.validate(payload)
+        mentions = [
+            self.mention_service.create_mention(
+                {**mention_data, "snippet": mention_data.get("snippet") or "", "fullText": mention_data.get("fullText") or ""},
+                parent_name,
+            )
+            for mention_data in mentions_data
+        ]
+        # Mesma etapa do processamento em lote: domínios não monitorados não são pontuados
+        validation = self.mention_service.domain_validator.validate_mentions(mentions)
+        mentions = validation['kept']
+        Metrics.domain_rejected(validation['mode'], validation['invalid_count'])
+
+        batcher = self.get_batcher()
+        futures = {bank_name: batcher.submit(bank_name, mentions) for bank_name in bank_names} if mentions else {}
+
+        scored = []
+        banks = {}
+        for bank_name in bank_names:
+            rows = futures[bank_name].result(timeout=self.TIMEOUT_SECONDS) if bank_name in futures else []
+            scored.extend(rows)
+            banks[bank_name.name] = self.aggregate(rows)
+        return {
+            "mentions": scored,
+            "banks": banks,
+            "rejected_domains": {
+                "mode": validation['mode'],
+                "rejected_mentions": validation['invalid_count'],
+                "domains": validation['invalid_domains'],
+            },
+        }
+
+    def score_batch(self, bank_name: BankName, mentions):
+        """Handler do MicroBatcher: pontua todas as menções agrupadas para o banco."""
+        bank = ReferenceDataService.bank(bank_name)
+        if bank is None:
+            raise ValueError(f"Banco {bank_name.name} não cadastrado.")
+
+        df = self.mention_analysis_service.create_mention_analysis_bulk(mentions, bank)
+        features = df.reindex(columns=['mention_url', 'domain'] + self.FEATURE_COLUMNS)
+        features['sentiment'] = features['sentiment'].map(lambda s: s.value if s is not None else None)
+        features['reach_group'] = features['reach_group'].map(lambda rg: rg.value if rg is not None else None)
+        features.insert(1, 'bank_name', bank_name.name)
+        records = features.astype(object).where(features.notna(), None).to_dict(orient='records')
+        for record in records:
+            for column in ('title_mentioned', 'subtitle_used', 'subtitle_mentioned', 'relevant_vehicle', 'niche_vehicle'):
+                record[column] = bool(record[column])
+            for column in ('numerator', 'denominator'):
+                record[column] = int(record[column])
+            for column in ('iedi_score', 'iedi_normalized'):
+                record[column] = float(record[column])
+        return records
+
+    def aggregate(self, rows):
+        # Com todas as menções rejeitadas não há linhas: o frame vazio mantém as colunas
+        frame = pd.DataFrame(rows, columns=['mention_url', 'bank_name', 'domain'] + self.FEATURE_COLUMNS)
+        aggregates = self.bank_analysis_service.compute_aggregates(frame)
+        bank = self.bank_analysis_service.apply_aggregates(SimpleNamespace(), aggregates)
+        return {
+            "total_mentions": bank.total_mentions,
+            "positive_volume": bank.positive_volume,
+            "negative_volume": bank.negative_volume,
+            "iedi_mean": bank.iedi_mean,
+            "iedi_score": bank.iedi_score,
+            "summary": bank.summary,
+        }
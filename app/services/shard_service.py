@@ -0,0 +1,161 @@
+import os
+from datetime import datetime, timedelta
+
+from app.enums.bank_name import BankName
+from app.enums.job_type import JobType
+from app.infra.event_bus import AnalysisEventBus
+from app.infra.csv_storage import CSVStorage
+from app.infra.job_lease import JobLease
+from app.repositories.analysis_repository import AnalysisRepository
+from app.repositories.bank_analysis_repository import BankAnalysisRepository
+from app.repositories.mention_repository import MentionRepository
+from app.services.bank_analysis_service import BankAnalysisService
+from app.services.job_service import JobService
+from app.services.mention_analysis_service import MentionAnalysisService
+from app.services.reference_data_service import ReferenceDataService
+from app.services.mention_service import MentionService
+from app.utils.uuid_generator import generate_uuid
+
+class ShardService:
+    """
+    Execução distribuída de uma análise grande: cada (banco × janela de datas) vira um
+    job independente na fila, que qualquer processo/host pode reservar. Cada shard grava
+    um CSV parcial e agregados aditivos; o último shard concluído enfileira a consolidação.
+    """
+
+    SHARD_DAYS = int(os.getenv("IEDI_SHARD_DAYS", "7"))
+    SHARD_THRESHOLD_DAYS = int(os.getenv("IEDI_SHARD_THRESHOLD_DAYS", "92"))
+
+    mention_service = MentionService()
+    mention_analysis_service = MentionAnalysisService()
+    bank_analysis_service = BankAnalysisService()
+    job_service = JobService()
+
+    def should_shard(self, bank_analyses, sharded=None):
+        if sharded is not None:
+            return bool(sharded)
+        return any((ba.end_date - ba.start_date).days > self.SHARD_THRESHOLD_DAYS for ba in bank_analyses)
+
+    def plan(self, bank_analyses, shard_days=None):
+        """Divide cada BankAnalysis em janelas [início, fim) de shard_days dias."""
+        shard_days = shard_days or self.SHARD_DAYS
+        if shard_days <= 0:
+            raise ValueError("O tamanho do shard deve ser maior que zero.")
+
+        units = []
+        for bank_analysis in sorted(bank_analyses, key=lambda ba: ba.bank_name.name):
+            window_start = bank_analysis.start_date
+            index = 0
+            while window_start < bank_analysis.end_date:
+                window_end = min(window_start + timedelta(days=shard_days), bank_analysis.end_date)
+                units.append({
+                    "unit_key": f"{bank_analysis.bank_name.name}_{index:04d}",
+                    "bank_analysis_id": bank_analysis.id,
+                    "bank_name": bank_analysis.bank_name.name,
+                    "start_date": window_start.isoformat(),
+                    "end_date": window_end.isoformat(),
+                    "is_last": window_end == bank_analysis.end_date,
+                })
+                window_start = window_end
+                index += 1
+        return units
+
+    def enqueue_shards(self, analysis, bank_analyses, parent_name, shard_days=None, profile=False):
+        plan_id = generate_uuid()
+        units = self.plan(bank_analyses, shard_days)
+        for unit in units:
+            days = (datetime.fromisoformat(unit["end_date"]) - datetime.fromisoformat(unit["start_date"])).days
+            self.job_service.enqueue(
+                JobType.ANALYSIS_SHARD,
+                analysis_id=analysis.id,
+                payload={"plan_id": plan_id, "parent_name": parent_name, "shard_count": len(units), "profile": bool(profile), **unit},
+                priority=max(1, days),
+                dedupe_key=f"shard:{plan_id}:{unit['unit_key']}"
+            )
+        print(f"[ShardService] Análise {analysis.id} dividida em {len(units)} shards (plan_id={plan_id})")
+        return {"plan_id": plan_id, "shard_count": len(units)}
+
+    def in_window(self, published_date, start_date, end_date, is_last):
+        # Janela semiaberta: uma menção na fronteira pertence a um único shard
+        if published_date is None:
+            return True
+        if published_date < start_date:
+            return False
+        return published_date <= end_date if is_last else published_date < end_date
+
+    def run_shard_job(self, job):
+        payload = job.payload
+        analysis = AnalysisRepository.find_by_id(job.analysis_id)
+        if not analysis:
+            raise ValueError("Análise não encontrada.")
+
+        bank_name = BankName[payload["bank_name"]]
+        AnalysisEventBus.stage("shard", unit_key=payload["unit_key"], shard_count=payload["shard_count"])
+        start_date = datetime.fromisoformat(payload["start_date"])
+        end_date = datetime.fromisoformat(payload["end_date"])
+
+        MentionRepository.set_analysis_context(analysis.id)
+        mentions = self.mention_service.fetch_and_filter_mentions(
+            start_date=start_date,
+            end_date=end_date,
+            query_name=analysis.query_name,
+            parent_name=payload["parent_name"],
+            category_names=[bank_name.value]
+        )
+        mention_dicts = MentionRepository.drain_batch()
+
+        keep = [self.in_window(m.published_date, start_date, end_date, payload["is_last"]) for m in mentions]
+        mentions = [m for m, k in zip(mentions, keep) if k]
+        mention_dicts = [d for d, k in zip(mention_dicts, keep) if k]
+
+        aggregates = {"bank_name": bank_name.name, "total_mentions": 0, "negative_mentions": 0,
+                      "iedi_normalized_sum": 0.0, "iedi_normalized_count": 0}
+        mention_analyses = []
+        if mentions:
+            bank = ReferenceDataService.bank(bank_name)
+            df = self.mention_analysis_service.create_mention_analysis_bulk(mentions, bank)
+            aggregates.update(self.bank_analysis_service.compute_aggregates(df))
+            mention_analyses = df.reindex(columns=CSVStorage.MENTION_ANALYSIS_FILE_COLUMNS).to_dict(orient='records')
+
+        JobLease.check()
+        CSVStorage.save_shard(analysis.id, payload["plan_id"], payload["unit_key"], mention_dicts, mention_analyses, aggregates)
+
+        AnalysisEventBus.progress(shards_done=1)
+
+        completed = CSVStorage.load_shard_aggregates(analysis.id, payload["plan_id"])
+        if len(completed) >= payload["shard_count"]:
+            self.job_service.enqueue(
+                JobType.MERGE_SHARDS,
+                analysis_id=analysis.id,
+                payload={"plan_id": payload["plan_id"], "shard_count": payload["shard_count"], "profile": payload.get("profile", False)},
+                priority=0,
+                dedupe_key=f"merge:{payload['plan_id']}"
+            )
+
+        return {"unit_key": payload["unit_key"], "mentions": len(mentions)}
+
+    def merge(self, job):
+        """Consolida os shards de forma determinística (ordem das chaves) e persiste as métricas."""
+        plan_id = job.payload["plan_id"]
+        AnalysisEventBus.stage("merging", shard_count=job.payload["shard_count"])
+        completed = CSVStorage.load_shard_aggregates(job.analysis_id, plan_id)
+        if len(completed) < job.payload["shard_count"]:
+            raise RuntimeError(f"Shards incompletos: {len(completed)}/{job.payload['shard_count']}")
+
+        unit_keys = sorted(completed)
+        by_bank = {}
+        for unit_key in unit_keys:
+            by_bank.setdefault(completed[unit_key]["bank_name"], []).append(completed[unit_key])
+
+        bank_analyses = BankAnalysisRepository.find_by_analysis_id(job.analysis_id)
+        for bank_analysis in bank_analyses:
+            aggregates = self.bank_analysis_service.merge_aggregates(by_bank.get(bank_analysis.bank_name.name, []))
+            if aggregates["total_mentions"] == 0:
+                continue
+            self.bank_analysis_service.apply_aggregates(bank_analysis, aggregates)
+            self.bank_analysis_service.persist_bank_analysis(bank_analysis)
+            self.bank_analysis_service.persist_domain_metrics(bank_analysis, aggregates)
+
+        JobLease.check()
+        counts = CSVStorage.merge_shards(job.analysis_id, plan_id, unit_keys)
+        return {"plan_id": plan_id, "shards": len(unit_keys), **counts}
@@ -33,3 +33,9 @@ class DateUtils:
             return datetime.strptime(date_string, "%Y-%m-%dT%H:%M:%S.%f%z")
         except ValueError:
             return None
+
+    @staticmethod
+    def to_quarter_label(dt: datetime) -> str:
+        """Rótulo trimestral no formato dos relatórios (ex.: 3T25)."""
+        quarter = (dt.month - 1) // 3 + 1
+        return f"{quarter}T{dt.year % 100:02d}"
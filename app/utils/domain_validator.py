@@ -1,69 +1,169 @@
-from urllib.parse import urlparse
-from typing import Set, List, Dict
-from app.infra.bigquery_sa import get_session
-from app.models.media_outlet import MediaOutlet
+import os
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+from app.services.reference_data_service import ReferenceDataService
+
+# Prefixos que não identificam o veículo (versões web, mobile e AMP do mesmo site)
+IGNORED_PREFIXES = ("www", "www2", "www3", "m", "mobile", "amp")
+
+NO_DOMAIN = "(sem domínio)"
+
+
+def normalize_host(value: Optional[str]) -> Optional[str]:
+    """
+    Host canônico de uma URL ou domínio: minúsculo, sem esquema, usuário, porta,
+    caminho, ponto final nem prefixos www/m/mobile/amp.
+    Ex.: 'https://M.G1.globo.com:443/economia' -> 'g1.globo.com'.
+    """
+    if not value:
+        return None
+    value = value.strip().lower()
+    host = urlsplit(value if "://" in value else f"//{value}").hostname
+    if not host:
+        return None
+    labels = host.rstrip(".").split(".")
+    while len(labels) > 2 and labels[0] in IGNORED_PREFIXES:
+        labels = labels[1:]
+    return ".".join(labels) or None
+
+
+class DomainIndex:
+    """
+    Domínios monitorados indexados pelo host normalizado. Um host casa com o veículo
+    cujo domínio é seu sufixo por rótulos (g1.globo.com -> globo.com), como o
+    Brandwatch, que às vezes devolve o subdomínio e às vezes o domínio raiz.
+    """
+
+    MAX_CACHED_HOSTS = 100_000
+
+    def __init__(self, domains: Iterable[str]):
+        # host normalizado -> domínio como está cadastrado (é o que o cálculo do IEDI compara)
+        self.domains = {}
+        for domain in domains:
+            host = normalize_host(domain)
+            if host:
+                self.domains.setdefault(host, domain)
+        self._matches = {}
+
+    def match(self, host: Optional[str]) -> Optional[str]:
+        """Domínio cadastrado do veículo do host (já normalizado) ou None."""
+        if not host:
+            return None
+        if host in self._matches:
+            return self._matches[host]
+
+        labels = host.split(".")
+        outlet = None
+        for start in range(len(labels) - 1):
+            outlet = self.domains.get(".".join(labels[start:]))
+            if outlet is not None:
+                break
+
+        if len(self._matches) >= self.MAX_CACHED_HOSTS:
+            self._matches = {}
+        self._matches[host] = outlet
+        return outlet
+
 
 class DomainValidator:
-    
-    _monitored_domains_cache: Set[str] = None
-    
+    """
+    Etapa do pipeline que separa as menções de veículos monitorados (media_outlet ativo)
+    das demais antes da pontuação. IEDI_DOMAIN_VALIDATION define o que fazer com as
+    rejeitadas: drop (padrão) as remove, flag só as reporta e off desliga a etapa.
+    """
+
+    MODES = ("drop", "flag", "off")
+
+    _lock = threading.Lock()
+    _index = None
+    _index_source = None
+
     @classmethod
-    def load_monitored_domains(cls) -> Set[str]:
-        if cls._monitored_domains_cache is not None:
-            return cls._monitored_domains_cache
-        
-        with get_session() as session:
-            outlets = session.query(MediaOutlet.domain).filter(MediaOutlet.active == True).all()
-            cls._monitored_domains_cache = {outlet.domain for outlet in outlets}
-        
-        return cls._monitored_domains_cache
-    
+    def mode(cls) -> str:
+        mode = os.getenv("IEDI_DOMAIN_VALIDATION", "drop").lower()
+        if mode not in cls.MODES:
+            raise ValueError(f"IEDI_DOMAIN_VALIDATION inválido: {mode}. Use um de: {', '.join(cls.MODES)}.")
+        return mode
+
     @classmethod
-    def extract_domain(cls, url: str) -> str:
-        if not url:
-            return None
-        
-        parsed = urlparse(url)
-        domain = parsed.netloc or parsed.path
-        
-        if domain.startswith('www.'):
-            domain = domain[4:]
-        
-        return domain
-    
+    def load_index(cls) -> DomainIndex:
+        """Índice dos veículos ativos, reconstruído só quando o ReferenceDataService recarrega os domínios."""
+        domains = ReferenceDataService.active_domains()
+        with cls._lock:
+            if cls._index is None or cls._index_source is not domains:
+                cls._index = DomainIndex(domains)
+                cls._index_source = domains
+            return cls._index
+
+    @classmethod
+    def extract_domain(cls, url: str) -> Optional[str]:
+        return normalize_host(url)
+
     @classmethod
     def is_monitored_domain(cls, url: str) -> bool:
-        domain = cls.extract_domain(url)
-        monitored_domains = cls.load_monitored_domains()
-        return domain in monitored_domains
-    
+        return cls.load_index().match(normalize_host(url)) is not None
+
     @classmethod
-    def validate_mentions(cls, mentions: List[Dict]) -> Dict:
-        monitored_domains = cls.load_monitored_domains()
-        
-        valid_mentions = []
-        invalid_mentions = []
-        invalid_domains = set()
-        
+    def mention_host(cls, mention) -> Optional[str]:
+        """Host da menção: o domínio informado pelo Brandwatch ou, na falta dele, o da URL."""
+        if isinstance(mention, dict):
+            domain, url = mention.get("domain"), mention.get("url")
+        else:
+            domain, url = mention.domain, mention.url
+        return normalize_host(domain) or normalize_host(url)
+
+    @classmethod
+    def validate_mentions(cls, mentions: List, mode: str = None) -> Dict:
+        """
+        Classifica as menções (Mention ou dict do Brandwatch) preservando a ordem.
+        As aceitas passam a ter o domínio cadastrado do veículo (g1.globo.com -> globo.com),
+        para que o cálculo reconheça o veículo relevante/de nicho.
+        'kept' é a lista que segue no pipeline de acordo com o modo.
+        """
+        mode = mode or cls.mode()
+        if mode == "off":
+            return cls.report(mode, mentions, list(mentions), list(mentions), [], Counter())
+
+        index = cls.load_index()
+        outlets = {}
+        valid, invalid = [], []
+        invalid_domains = Counter()
         for mention in mentions:
-            url = mention.get('url', '')
-            domain = cls.extract_domain(url)
-            
-            if domain in monitored_domains:
-                valid_mentions.append(mention)
+            host = cls.mention_host(mention)
+            if host not in outlets:
+                outlets[host] = index.match(host)
+            outlet = outlets[host]
+            if outlet is None:
+                invalid.append(mention)
+                invalid_domains[host or NO_DOMAIN] += 1
+                continue
+            if isinstance(mention, dict):
+                mention["domain"] = outlet
             else:
-                invalid_mentions.append(mention)
-                invalid_domains.add(domain)
-        
+                mention.domain = outlet
+            valid.append(mention)
+
+        kept = valid if mode == "drop" else list(mentions)
+        return cls.report(mode, mentions, kept, valid, invalid, invalid_domains)
+
+    @classmethod
+    def report(cls, mode: str, mentions: List, kept: List, valid: List, invalid: List, invalid_domains: Counter) -> Dict:
         return {
-            'valid': valid_mentions,
-            'invalid': invalid_mentions,
-            'invalid_domains': list(invalid_domains),
-            'valid_count': len(valid_mentions),
-            'invalid_count': len(invalid_mentions),
-            'total_count': len(mentions)
+            'mode': mode,
+            'kept': kept,
+            'valid': valid,
+            'invalid': invalid,
+            'invalid_domains': dict(invalid_domains.most_common()),
+            'valid_count': len(valid),
+            'invalid_count': len(invalid),
+            'total_count': len(mentions),
         }
-    
+
     @classmethod
     def clear_cache(cls):
-        cls._monitored_domains_cache = None
+        with cls._lock:
+            cls._index = None
+            cls._index_source = None
@@ -0,0 +1,85 @@
+import gzip
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Hashable, Optional
+
+from flask import Response, request
+
+from app.utils.lru_cache import LRUCache
+
+@dataclass(frozen=True)
+class CachedResponse:
+    payload: Any
+    body: bytes
+    gzipped: Optional[bytes]
+    etag: str
+    revision: str
+
+class ResponseCache:
+    """
+    Respostas JSON serializadas de análises DONE, que não mudam mais até um
+    restart/recálculo. Cada entrada guarda a revisão da análise no registro local de
+    jobs; se outra instância reprocessou a análise, a revisão muda e a entrada é descartada.
+    Requisições condicionais (If-None-Match) recebem 304 sem consultar o BigQuery.
+    """
+
+    GZIP_MIN_BYTES = 1024
+    CACHE_CONTROL = "private, no-cache"
+
+    cache = LRUCache(maxsize=512)
+
+    @classmethod
+    def get(cls, key: Hashable, revision: Optional[str]) -> Optional[CachedResponse]:
+        if revision is None:
+            return None
+        entry = cls.cache.get(key)
+        if entry is None:
+            return None
+        if entry.revision != revision:
+            cls.cache.pop(key)
+            return None
+        return entry
+
+    @classmethod
+    def build(cls, payload, revision: Optional[str] = None) -> CachedResponse:
+        """Serializa o payload (ETag + gzip) sem guardá-lo no cache."""
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        gzipped = gzip.compress(body, compresslevel=6) if len(body) >= cls.GZIP_MIN_BYTES else None
+        return CachedResponse(
+            payload=payload,
+            body=body,
+            gzipped=gzipped,
+            etag=hashlib.sha256(body).hexdigest()[:32],
+            revision=revision,
+        )
+
+    @classmethod
+    def store(cls, key: Hashable, payload, revision: str) -> CachedResponse:
+        entry = cls.build(payload, revision)
+        cls.cache.set(key, entry)
+        return entry
+
+    @classmethod
+    def invalidate(cls, analysis_id) -> int:
+        """Descarta todas as respostas da análise. As chaves são (endpoint, analysis_id)."""
+        return cls.cache.invalidate(lambda key: key[1] == analysis_id)
+
+    @classmethod
+    def respond(cls, entry: CachedResponse, status=200) -> Response:
+        use_gzip = entry.gzipped is not None and "gzip" in request.headers.get("Accept-Encoding", "")
+        # ETag forte: cada codificação é uma representação distinta, e só a que
+        # esta requisição receberia vale para o 304
+        etag = f"{entry.etag}-gz" if use_gzip else entry.etag
+
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(entry.gzipped if use_gzip else entry.body, status=status, mimetype="application/json")
+            if use_gzip:
+                response.headers["Content-Encoding"] = "gzip"
+
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = cls.CACHE_CONTROL
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
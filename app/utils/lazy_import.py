@@ -0,0 +1,34 @@
+import importlib
+import sys
+import threading
+import types
+
+class LazyModule(types.ModuleType):
+    """
+    Módulo importado só no primeiro acesso a um atributo (ex.: pd.DataFrame).
+    Depois disso os atributos do módulo real são copiados para o proxy e o acesso
+    passa a ser direto, sem custo extra.
+    """
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__["_lazy_lock"] = threading.Lock()
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self):
+        with self._lazy_lock:
+            if self._lazy_module is None:
+                module = importlib.import_module(self.__name__)
+                self.__dict__.update(module.__dict__)
+                self.__dict__["_lazy_module"] = module
+        return self._lazy_module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+def lazy_import(name):
+    """Devolve o módulo já importado ou um LazyModule que o importa no primeiro uso."""
+    return sys.modules.get(name) or LazyModule(name)
@@ -0,0 +1,86 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable, List
+
+class MicroBatcher:
+    """
+    Agrupa requisições concorrentes em lotes. Cada submit(key, items) entra numa fila;
+    uma thread de despacho espera até max_wait segundos (ou max_items itens), junta os
+    itens de mesma chave e chama handler(key, itens) uma única vez. O resultado, alinhado
+    aos itens, é repartido entre os Futures de cada requisição. Se o handler falhar num
+    lote com várias requisições, cada uma é repetida sozinha: o erro só chega a quem o causou.
+    """
+
+    def __init__(self, handler: Callable[[Hashable, List[Any]], List[Any]], max_wait: float = 0.005,
+                 max_items: int = 20_000, name: str = "micro-batcher"):
+        self.handler = handler
+        self.max_wait = max_wait
+        self.max_items = max_items
+        self.name = name
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, key: Hashable, items: List[Any]) -> Future:
+        future = Future()
+        self._ensure_started()
+        self._queue.put((key, list(items), future))
+        return future
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            batch = [first]
+            count = len(first[1])
+            deadline = time.monotonic() + self.max_wait
+            while count < self.max_items:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                batch.append(request)
+                count += len(request[1])
+            self._dispatch(batch)
+
+    def _dispatch(self, batch):
+        by_key = {}
+        for key, items, future in batch:
+            by_key.setdefault(key, []).append((items, future))
+
+        for key, requests in by_key.items():
+            try:
+                self._resolve(key, requests)
+            except Exception as e:
+                if len(requests) == 1:
+                    requests[0][1].set_exception(e)
+                    continue
+                for request in requests:
+                    try:
+                        self._resolve(key, [request])
+                    except Exception as request_error:
+                        request[1].set_exception(request_error)
+
+    def _resolve(self, key, requests):
+        items = [item for request_items, _ in requests for item in request_items]
+        results = self.handler(key, items) if items else []
+        if len(results) != len(items):
+            raise RuntimeError(f"{self.name}: handler retornou {len(results)} resultados para {len(items)} itens")
+
+        offset = 0
+        for request_items, future in requests:
+            future.set_result(results[offset:offset + len(request_items)])
+            offset += len(request_items)
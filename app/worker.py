@@ -0,0 +1,116 @@
+"""
+Processo de worker separado do tier web (gunicorn).
+
+Consome a fila local de jobs (data/iedi_local.sqlite3) e executa a coleta no
+Brandwatch e o cálculo do IEDI em processos próprios, para que análises grandes
+não disputem o GIL com as requisições da interface.
+
+Uso:
+    python -m app.worker --processes 2 --threads 1
+"""
+import argparse
+import multiprocessing
+import os
+import signal
+import sys
+import time
+
+from app.enums.job_type import JobType
+
+def run_worker_process(threads, job_types):
+    # Conexões herdadas do processo pai não podem ser compartilhadas
+    from app.infra import bq_sa, local_sa
+    from app.services.job_service import JobService, JobWorkerPool
+
+    bq_sa.dispose_engine()
+    local_sa.dispose_local_engine()
+
+    pool = JobWorkerPool(JobService(), threads, job_types)
+    # Jobs que enfileiram outros (shards, merge, cópia) chamam ensure_workers: registrado
+    # como pool do processo, ele não abre um segundo pool fora de --threads/--job-types
+    with JobService._pool_lock:
+        JobService._pool = pool
+
+    def handle_stop(signum, frame):
+        print(f"[worker] pid={os.getpid()} recebeu sinal {signum}, finalizando...")
+        pool.stop()
+
+    signal.signal(signal.SIGTERM, handle_stop)
+    signal.signal(signal.SIGINT, handle_stop)
+
+    pool.start()
+    while pool.is_alive():
+        time.sleep(1)
+
+def mark_process_dead(pid):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Worker de processamento de análises IEDI")
+    parser.add_argument("--processes", type=int, default=int(os.getenv("IEDI_WORKER_PROCESSES", "2")),
+                        help="Número de processos de worker")
+    parser.add_argument("--threads", type=int, default=int(os.getenv("IEDI_WORKER_THREADS", "1")),
+                        help="Jobs simultâneos por processo")
+    parser.add_argument("--job-types", default=os.getenv("IEDI_WORKER_JOB_TYPES", ""),
+                        help="Tipos de job aceitos, separados por vírgula (padrão: todos)")
+    args = parser.parse_args(argv)
+
+    if args.processes <= 0 or args.threads <= 0:
+        parser.error("--processes e --threads devem ser maiores que zero")
+
+    job_types = [t.strip() for t in args.job_types.split(",") if t.strip()]
+    invalid = [t for t in job_types if t not in JobType._member_names_]
+    if invalid:
+        parser.error(f"Tipos de job inválidos: {', '.join(invalid)}")
+    args.job_types = job_types or None
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from app.infra.metrics import Metrics
+
+        # Diretório exclusivo deste serviço: séries de processos de uma execução anterior não contam
+        Metrics.reset_multiprocess_dir()
+    context = multiprocessing.get_context("spawn")
+    stopping = False
+    processes = []
+
+    def start_process():
+        process = context.Process(target=run_worker_process, args=(args.threads, args.job_types), daemon=False)
+        process.start()
+        print(f"[worker] Processo {process.pid} iniciado ({args.threads} thread(s))")
+        return process
+
+    def handle_stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    signal.signal(signal.SIGTERM, handle_stop)
+    signal.signal(signal.SIGINT, handle_stop)
+
+    processes.extend(start_process() for _ in range(args.processes))
+
+    # Supervisiona os processos: um worker que morre é substituído e
+    # seus jobs voltam para a fila quando o lease expira.
+    while not stopping:
+        for index, process in enumerate(processes):
+            if not process.is_alive() and not stopping:
+                print(f"[worker] Processo {process.pid} terminou (exitcode={process.exitcode}), reiniciando")
+                mark_process_dead(process.pid)
+                processes[index] = start_process()
+        time.sleep(2)
+
+    for process in processes:
+        process.join(timeout=30)
+        mark_process_dead(process.pid)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
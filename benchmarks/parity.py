@@ -0,0 +1,167 @@
+"""
+Paridade entre o motor por linha (create_mention_analysis) e o motor em lote
+(create_mention_analysis_bulk) usando os CSVs golden em data/mention_analysis_*.csv.
+
+Os CSVs guardam as features de cada menção, mas não o texto. Cada linha é reconstruída
+como uma Mention que produz as mesmas features: título com/sem variação do banco,
+primeiro parágrafo com/sem variação, visitantes no limiar do grupo de alcance e domínio
+relevante/nicho/outro. O veículo relevante não é gravado; é deduzido do numerador.
+As duas saídas são comparadas com o golden em numerator, denominator, iedi_score
+e iedi_normalized.
+
+Uso:
+    python -m benchmarks.parity [--output parity_report.json] [arquivos...]
+"""
+import argparse
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from app.constants.weights import (NICHE_OUTLET_WEIGHT, REACH_GROUP_THRESHOLDS, REACH_GROUP_WEIGHTS,
+                                   RELEVANT_OUTLET_WEIGHT, SUBTITLE_WEIGHT, TITLE_WEIGHT)
+from app.enums.bank_name import BankName
+from app.infra.csv_storage import CSVStorage
+from app.models.mention import Mention
+from app.services.mention_analysis_service import MentionAnalysisService
+from app.services.reference_data_service import ReferenceDataService
+from benchmarks.synthetic import load_banks
+
+COLUMNS = ['numerator', 'denominator', 'iedi_score', 'iedi_normalized']
+TOLERANCE = 0.005
+
+RELEVANT_DOMAIN = "relevante.paridade"
+NICHE_DOMAIN = "nicho.paridade"
+# Após sql/11 alguns domínios raiz (ex.: estadao.com.br) são relevantes e de nicho ao mesmo tempo
+BOTH_DOMAIN = "relevante-nicho.paridade"
+OTHER_DOMAIN = "outro.paridade"
+
+REACH_GROUP_VISITORS = {
+    "A": REACH_GROUP_THRESHOLDS["A"] + 1,
+    "B": REACH_GROUP_THRESHOLDS["B"] + 1,
+    "C": REACH_GROUP_THRESHOLDS["C"],
+    "D": 0,
+}
+
+def golden_files():
+    return sorted(CSVStorage.DATA_DIR.glob("mention_analysis_*.csv"))
+
+def infer_relevant(golden: pd.DataFrame) -> pd.Series:
+    """Pontos de veículo relevante = numerador − demais componentes (0 ou RELEVANT_OUTLET_WEIGHT)."""
+    rest = (
+        golden['title_mentioned'].astype(int) * TITLE_WEIGHT
+        + (golden['subtitle_mentioned'] & golden['subtitle_used']).astype(int) * SUBTITLE_WEIGHT
+        + golden['reach_group'].map(REACH_GROUP_WEIGHTS).fillna(0).astype(int)
+        + golden['niche_vehicle'].astype(int) * NICHE_OUTLET_WEIGHT
+    )
+    return golden['numerator'] - rest
+
+def build_mentions(golden: pd.DataFrame, bank):
+    variation = next(v for v in bank.variations if v)
+    residual = infer_relevant(golden)
+    mentions = []
+    for row, relevant_points in zip(golden.itertuples(index=False), residual):
+        relevant = relevant_points == RELEVANT_OUTLET_WEIGHT
+        if row.niche_vehicle:
+            domain = BOTH_DOMAIN if relevant else NICHE_DOMAIN
+        else:
+            domain = RELEVANT_DOMAIN if relevant else OTHER_DOMAIN
+        lead = f"{variation} em destaque" if row.subtitle_mentioned else "Destaque do dia"
+        mentions.append(Mention(
+            url=row.mention_url,
+            title=f"{variation} na notícia" if row.title_mentioned else "Notícia do dia",
+            snippet="Resumo",
+            full_text=f"{lead}\n\nCorpo" if row.subtitle_used else "Resumo",
+            domain=domain,
+            sentiment=row.sentiment.lower(),
+            categories=[bank.name.value],
+            monthly_visitors=REACH_GROUP_VISITORS.get(row.reach_group, 0),
+        ))
+    consistent = residual.isin([0, RELEVANT_OUTLET_WEIGHT])
+    return mentions, consistent.to_numpy()
+
+def score_row_engine(service, mentions, bank) -> pd.DataFrame:
+    analyses = [service.create_mention_analysis(mention, bank) for mention in mentions]
+    return pd.DataFrame({column: [getattr(analysis, column) for analysis in analyses] for column in COLUMNS})
+
+def compare(left: pd.DataFrame, right: pd.DataFrame, mask=None) -> dict:
+    result = {}
+    for column in COLUMNS:
+        diff = np.abs(left[column].to_numpy(dtype='float64') - right[column].to_numpy(dtype='float64'))
+        if mask is not None:
+            diff = diff[mask]
+        mismatched = diff > TOLERANCE
+        result[column] = {
+            "mismatches": int(mismatched.sum()),
+            "max_abs_diff": round(float(diff.max()), 6) if len(diff) else 0.0,
+        }
+    return result
+
+def check_file(path: Path, banks_by_value=None, samples: int = 5) -> dict:
+    banks_by_value = banks_by_value or {bank.name.value: bank for bank in load_banks()}
+    ReferenceDataService.load(banks_by_value.values(), [RELEVANT_DOMAIN, BOTH_DOMAIN], [NICHE_DOMAIN, BOTH_DOMAIN])
+    service = MentionAnalysisService()
+
+    golden = pd.read_csv(path)
+    report = {"file": path.name, "rows": len(golden), "banks": {}}
+    for bank_value, bank_golden in golden.groupby('bank_name', sort=True):
+        bank = banks_by_value[BankName.from_value(bank_value).value]
+        bank_golden = bank_golden.reset_index(drop=True)
+        mentions, consistent = build_mentions(bank_golden, bank)
+
+        bulk = service.create_mention_analysis_bulk(mentions, bank)
+        row = score_row_engine(service, mentions, bank)
+
+        mismatched = np.zeros(len(bank_golden), dtype=bool)
+        for column in COLUMNS:
+            mismatched |= np.abs(bulk[column].to_numpy(dtype='float64') - row[column].to_numpy(dtype='float64')) > TOLERANCE
+
+        report["banks"][BankName.from_value(bank_value).name] = {
+            "rows": len(bank_golden),
+            # Linhas cujo numerador não se explica pelos pesos atuais (golden de outra versão dos pesos)
+            "unreconstructable": int((~consistent).sum()),
+            "bulk_vs_golden": compare(bulk, bank_golden, consistent),
+            "row_vs_golden": compare(row, bank_golden, consistent),
+            "bulk_vs_row": compare(bulk, row),
+            "bulk_vs_row_samples": [
+                {"mention_url": bank_golden.at[i, 'mention_url'],
+                 "bulk": {c: float(bulk.at[i, c]) for c in COLUMNS},
+                 "row": {c: float(row.at[i, c]) for c in COLUMNS}}
+                for i in np.flatnonzero(mismatched)[:samples]
+            ],
+        }
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Paridade entre os motores por linha e em lote do IEDI.")
+    parser.add_argument("files", nargs="*", type=Path, help="CSVs golden (padrão: data/mention_analysis_*.csv).")
+    parser.add_argument("--output", default="-", help="Arquivo JSON do relatório ('-' para stdout).")
+    args = parser.parse_args(argv)
+
+    files = args.files or golden_files()
+    banks_by_value = {bank.name.value: bank for bank in load_banks()}
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "tolerance": TOLERANCE,
+        "files": [check_file(path, banks_by_value) for path in files],
+    }
+    body = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output == "-":
+        print(body)
+    else:
+        Path(args.output).write_text(body + "\n", encoding="utf-8")
+        print(f"[parity] Relatório salvo em {args.output}", file=sys.stderr)
+
+    mismatches = sum(
+        stats["mismatches"]
+        for file_report in report["files"]
+        for bank in file_report["banks"].values()
+        for stats in bank["bulk_vs_row"].values()
+    )
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""
+Benchmark do pipeline de cálculo do IEDI com menções sintéticas.
+
+Cada tamanho roda num subprocesso próprio (pico de RSS isolado) e passa pelas mesmas
+etapas de uma análise: filtro e criação das Mentions, descarte dos domínios não
+monitorados, gravação do CSV de mentions, pontuação em lote por banco, agregados do
+banco e gravação do CSV de mention_analysis.
+Bancos e veículos vêm dos seeds SQL; nada é consultado no BigQuery ou no Brandwatch.
+
+Uso:
+    python -m benchmarks.run --sizes 10k 100k 1m --output bench_report.json
+"""
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+DEFAULT_SIZES = ["10k", "100k", "1m"]
+ANALYSIS_ID = "benchmark"
+
+def parse_size(value: str) -> int:
+    value = value.strip().lower()
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(value[-1], 1)
+    number = value[:-1] if multiplier > 1 else value
+    try:
+        return int(float(number) * multiplier)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Tamanho inválido: {value}")
+
+def peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KiB; macOS em bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+class StageTimer:
+    def __init__(self):
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry = self.stages.setdefault(name, {"seconds": 0.0, "rows": 0})
+            entry["seconds"] += time.perf_counter() - started
+            entry["rows"] += rows or 0
+
+def run_single(size: int, seed: int) -> dict:
+    """Executa o pipeline para um tamanho no processo atual."""
+    from app.infra.csv_storage import CSVStorage
+    from app.repositories.mention_analysis_repository import MentionAnalysisRepository
+    from app.repositories.mention_repository import MentionRepository
+    from app.services.bank_analysis_service import BankAnalysisService
+    from app.services.mention_analysis_service import MentionAnalysisService
+    from app.services.mention_service import MentionService
+    from app.services.reference_data_service import ReferenceDataService
+    from benchmarks.synthetic import PARENT_NAME, generate_mentions, load_banks, load_outlets
+
+    banks = load_banks()
+    relevant, niche = load_outlets()
+    ReferenceDataService.load(banks, relevant, niche)
+    category_names = [bank.name.value for bank in banks]
+
+    mention_service = MentionService()
+    mention_analysis_service = MentionAnalysisService()
+    bank_analysis_service = BankAnalysisService()
+    timer = StageTimer()
+    started = time.perf_counter()
+
+    with tempfile.TemporaryDirectory(prefix="iedi-bench-") as data_dir:
+        CSVStorage.DATA_DIR = Path(data_dir)
+        MentionRepository.set_analysis_context(ANALYSIS_ID)
+        MentionAnalysisRepository.set_analysis_context(ANALYSIS_ID)
+
+        with timer.stage("generate", size):
+            mentions_data = list(generate_mentions(size, seed, banks, (relevant, niche)))
+
+        with timer.stage("filter_and_build", size):
+            mentions = [
+                mention_service.create_mention(mention_data, PARENT_NAME)
+                for mention_data in mentions_data
+                if mention_service.passes_filter(mention_data, PARENT_NAME, category_names)
+            ]
+        del mentions_data
+
+        with timer.stage("validate_domains", len(mentions)):
+            mentions = mention_service.domain_validator.validate_mentions(mentions)['kept']
+
+        with timer.stage("persist_mentions", len(mentions)):
+            MentionRepository.bulk_save(mentions)
+            MentionRepository.flush_batch()
+
+        scored_rows = 0
+        for bank in banks:
+            bank_mentions = [mention for mention in mentions if bank.name.value in mention.categories]
+            with timer.stage("score", len(bank_mentions)):
+                df = mention_analysis_service.create_mention_analysis_bulk(bank_mentions, bank)
+            with timer.stage("aggregate", len(df)):
+                bank_analysis_service.compute_aggregates(df)
+            with timer.stage("persist_analyses", len(df)):
+                MentionAnalysisRepository.bulk_save(df.to_dict(orient="records"))
+            scored_rows += len(df)
+
+        with timer.stage("persist_analyses"):
+            MentionAnalysisRepository.flush_batch()
+
+    seconds = time.perf_counter() - started
+    pipeline_seconds = seconds - timer.stages["generate"]["seconds"]
+    return {
+        "size": size,
+        "mentions": len(mentions),
+        "scored_rows": scored_rows,
+        "seconds": round(seconds, 3),
+        # Geração sintética não faz parte do pipeline: fica fora da vazão total
+        "rows_per_second": round(size / pipeline_seconds, 1) if pipeline_seconds > 0 else None,
+        "peak_rss_mb": round(peak_rss_bytes() / 2**20, 1),
+        "stages": {
+            name: {
+                "seconds": round(entry["seconds"], 3),
+                "rows": entry["rows"],
+                "rows_per_second": round(entry["rows"] / entry["seconds"], 1) if entry["seconds"] > 0 and entry["rows"] else None,
+                "share": round(entry["seconds"] / seconds, 4) if seconds > 0 else None,
+            }
+            for name, entry in timer.stages.items()
+        },
+    }
+
+def run_isolated(size: int, seed: int) -> dict:
+    with tempfile.NamedTemporaryFile(suffix=".json") as result_file:
+        completed = subprocess.run(
+            [sys.executable, "-m", "benchmarks.run", "--single", str(size), "--seed", str(seed),
+             "--result-file", result_file.name],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"Benchmark de {size} linhas falhou:\n{completed.stderr}")
+        return json.loads(Path(result_file.name).read_text(encoding="utf-8"))
+
+def build_report(runs, seed):
+    from app.constants.weights import WEIGHTS_VERSION
+
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "seed": seed,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "weights_version": WEIGHTS_VERSION,
+        "runs": runs,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline do IEDI com menções sintéticas.")
+    parser.add_argument("--sizes", nargs="+", type=parse_size, default=[parse_size(s) for s in DEFAULT_SIZES],
+                        help="Quantidade de menções por execução (aceita sufixos k e m).")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="bench_report.json", help="Arquivo JSON do relatório ('-' para stdout).")
+    parser.add_argument("--single", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.single is not None:
+        result = run_single(args.single, args.seed)
+        Path(args.result_file).write_text(json.dumps(result), encoding="utf-8")
+        return
+
+    runs = []
+    for size in args.sizes:
+        print(f"[benchmark] {size} menções...", file=sys.stderr)
+        run = run_isolated(size, args.seed)
+        print(f"[benchmark] {size}: {run['rows_per_second']} linhas/s, pico {run['peak_rss_mb']} MB", file=sys.stderr)
+        runs.append(run)
+
+    body = json.dumps(build_report(runs, args.seed), indent=2, ensure_ascii=False)
+    if args.output == "-":
+        print(body)
+    else:
+        Path(args.output).write_text(body + "\n", encoding="utf-8")
+        print(f"[benchmark] Relatório salvo em {args.output}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Gerador determinístico de menções sintéticas no formato da API do Brandwatch.
+
+Bancos e veículos vêm dos seeds em sql/09_insert_banks.sql e
+sql/10_insert_media_outlets.sql, para que o motor de pontuação encontre a mesma
+proporção de veículos relevantes/nicho que em produção. A mesma seed gera sempre
+as mesmas menções.
+"""
+import re
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+
+from app.enums.bank_name import BankName
+from app.models.bank import Bank
+
+SQL_DIR = Path(__file__).parent.parent / "sql"
+PARENT_NAME = "Bancos"
+
+OUTLET_ROW = re.compile(r"\('[^']*',\s*'((?:[^']|'')*)',\s*'([^']*)',\s*(NULL|\d+),\s*(TRUE|FALSE)")
+BANK_ROW = re.compile(r"\('[^']*',\s*'([A-Z_]+)',\s*\[([^\]]*)\]")
+
+# Domínios fora da lista de veículos: parte das menções reais vem de sites não cadastrados
+UNKNOWN_DOMAINS = [f"portal{i}.com.br" for i in range(200)]
+
+def load_outlets(path: Path = SQL_DIR / "10_insert_media_outlets.sql"):
+    """Retorna (domínios relevantes, domínios de nicho) do seed de media_outlet."""
+    relevant, niche = [], []
+    for _, domain, _, is_niche in OUTLET_ROW.findall(path.read_text(encoding="utf-8")):
+        (niche if is_niche == "TRUE" else relevant).append(domain)
+    return sorted(set(relevant)), sorted(set(niche))
+
+def load_banks(path: Path = SQL_DIR / "09_insert_banks.sql"):
+    banks = []
+    for name, variations in BANK_ROW.findall(path.read_text(encoding="utf-8")):
+        bank = Bank(id=name, variations=re.findall(r"'([^']*)'", variations), active=True)
+        bank.name = BankName[name]
+        banks.append(bank)
+    return banks
+
+def generate_mentions(size: int, seed: int = 42, banks=None, outlets=None):
+    """Gera `size` menções; cada uma cita de 1 a 2 bancos (categorias) e é notícia."""
+    rng = np.random.default_rng(seed)
+    banks = banks or load_banks()
+    relevant, niche = outlets or load_outlets()
+    domains = np.array(relevant + niche + UNKNOWN_DOMAINS, dtype=object)
+    domain_weights = np.concatenate([
+        np.full(len(relevant), 0.6 / len(relevant)),
+        np.full(len(niche), 0.25 / len(niche)),
+        np.full(len(UNKNOWN_DOMAINS), 0.15 / len(UNKNOWN_DOMAINS)),
+    ])
+
+    domain_index = rng.choice(len(domains), size=size, p=domain_weights)
+    sentiments = rng.choice(np.array(["positive", "neutral", "negative"], dtype=object), size=size, p=[0.3, 0.45, 0.25])
+    # Visitantes diários com cauda longa: poucos veículos grandes (grupos A/B), muitos pequenos
+    daily_visitors = np.floor(rng.lognormal(mean=10.5, sigma=2.2, size=size)).astype(np.int64)
+    primary_bank = rng.integers(0, len(banks), size=size)
+    second_bank = np.where(rng.random(size) < 0.15, rng.integers(0, len(banks), size=size), -1)
+    in_title = rng.random(size) < 0.35
+    with_subtitle = rng.random(size) < 0.6
+    in_subtitle = rng.random(size) < 0.4
+    seconds = rng.integers(0, 90 * 24 * 3600, size=size)
+    start = datetime(2025, 7, 1, tzinfo=timezone.utc)
+
+    for i in range(size):
+        bank = banks[primary_bank[i]]
+        variation = bank.variations[i % len(bank.variations)]
+        category_banks = [bank] if second_bank[i] in (-1, primary_bank[i]) else [bank, banks[second_bank[i]]]
+        title = f"{variation} anuncia resultado trimestral" if in_title[i] else f"Mercado reage a anúncio #{i}"
+        snippet = f"Resumo da notícia {i}."
+        lead = f"{variation} ampliou a carteira de crédito." if in_subtitle[i] else "O setor bancário teve um trimestre estável."
+        full_text = f"{lead}\n\nCorpo da notícia {i}." if with_subtitle[i] else snippet
+        published = start + timedelta(seconds=int(seconds[i]))
+
+        yield {
+            "url": f"https://{domains[domain_index[i]]}/noticia/{seed}/{i}",
+            "title": title,
+            "snippet": snippet,
+            "fullText": full_text,
+            "domain": domains[domain_index[i]],
+            "date": published.strftime("%Y-%m-%dT%H:%M:%S.000+0000"),
+            "sentiment": sentiments[i],
+            "dailyVisitors": int(daily_visitors[i]),
+            "contentSourceName": "News",
+            "categoryDetails": [{"name": b.name.value, "parentName": PARENT_NAME} for b in category_banks],
+        }
@@ -0,0 +1,61 @@
+"""
+Hooks do gunicorn (lido automaticamente do diretório de trabalho).
+
+Com --preload o app é importado uma única vez no processo mestre; when_ready então
+carrega pandas/numpy e os dados de referência (bancos e veículos) antes do fork,
+e os workers herdam essas páginas em copy-on-write em vez de repetir o trabalho
+a cada boot ou reciclagem.
+"""
+import gc
+import os
+import time
+
+def on_starting(server):
+    from app.infra.metrics import Metrics
+
+    # O diretório é só do serviço web (o worker tem o seu): esvaziado antes de qualquer worker subir
+    path = Metrics.reset_multiprocess_dir()
+    if path:
+        server.log.info(f"[metrics] Diretório multiprocess {path} limpo")
+
+def when_ready(server):
+    if not server.cfg.preload_app:
+        return
+
+    from app.infra import bq_sa
+    from app.services.reference_data_service import ReferenceDataService
+    from app.utils.lazy_import import lazy_import
+
+    started = time.perf_counter()
+    try:
+        lazy_import("pandas").DataFrame
+        lazy_import("numpy").ndarray
+        loaded = ReferenceDataService.warm_up()
+        server.log.info(f"[warm-up] {loaded} em {time.perf_counter() - started:.2f}s")
+    except Exception as e:
+        # Sem BigQuery o boot segue; cada worker carrega os dados sob demanda
+        server.log.warning(f"[warm-up] Falha ao carregar dados de referência: {e}")
+    finally:
+        # Conexões não podem ser compartilhadas com os workers
+        bq_sa.dispose_engine()
+
+    # Tira os objetos já carregados do GC para não sujar as páginas compartilhadas
+    gc.freeze()
+
+def post_fork(server, worker):
+    from app.infra import bq_sa, local_sa
+    from app.services.job_service import JobService
+
+    bq_sa.dispose_engine()
+    local_sa.dispose_local_engine()
+
+    # Threads não sobrevivem ao fork: cada worker abre o próprio pool (se IEDI_INPROCESS_WORKERS > 0)
+    # e retoma a fila sem esperar a próxima análise ser enviada
+    JobService().ensure_workers()
+
+def child_exit(server, worker):
+    # Descarta as séries "live" (gauges) do worker que saiu; contadores continuam somados
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
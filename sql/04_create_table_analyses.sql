@@ -3,5 +3,7 @@ CREATE TABLE IF NOT EXISTS iedi.analysis (
   name STRING(255) NOT NULL,
   query_name STRING(255) NOT NULL,
   status STRING(50) NOT NULL,
-  is_custom_dates BOOL NOT NULL
+  is_custom_dates BOOL NOT NULL,
+  created_at TIMESTAMP NOT NULL,
+  resource_usage STRING
 );
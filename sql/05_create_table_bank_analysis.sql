@@ -14,7 +14,8 @@ CREATE TABLE IF NOT EXISTS iedi.bank_analysis (
   positive_volume FLOAT64 DEFAULT 0.0,
   negative_volume FLOAT64 DEFAULT 0.0,
   iedi_mean FLOAT64,
-  iedi_score FLOAT64
+  iedi_score FLOAT64,
+  summary STRING
 );
 
 -- Comentários dos campos:
@@ -28,3 +29,5 @@ CREATE TABLE IF NOT EXISTS iedi.bank_analysis (
 -- negative_volume: Volume de mentions negativas
 -- iedi_mean: IEDI médio calculado para este banco
 -- iedi_score: IEDI score final para este banco
+-- summary: JSON compacto com as distribuições do banco (sentimento, grupo de alcance,
+--          título/subtítulo, nicho/relevante), usado pelo dashboard
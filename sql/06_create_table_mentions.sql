@@ -15,4 +15,7 @@ CREATE TABLE IF NOT EXISTS iedi.mention (
   reach_group STRING(10) NOT NULL,
   created_at TIMESTAMP NOT NULL,
   updated_at TIMESTAMP
-);
+)
+-- Partição mensal: consultas por período (ex.: relatório trimestral) leem só os meses filtrados
+PARTITION BY TIMESTAMP_TRUNC(published_date, MONTH)
+CLUSTER BY domain;
@@ -17,8 +17,14 @@ CREATE TABLE IF NOT EXISTS iedi.mention_analysis (
   iedi_score FLOAT64,
   iedi_normalized FLOAT64,
   numerator INT64,
-  denominator INT64
-);
+  denominator INT64,
+  published_date TIMESTAMP,
+  domain STRING(255)
+)
+-- Partição mensal por published_date (copiado da mention) e cluster por banco/veículo:
+-- consultas de um banco em um trimestre leem só as partições e blocos desse banco
+PARTITION BY TIMESTAMP_TRUNC(published_date, MONTH)
+CLUSTER BY bank_name, domain;
 
 -- Comentários dos campos:
 -- mention_analysis_id: ID único para cada análise de menção (PK)
@@ -34,3 +40,5 @@ CREATE TABLE IF NOT EXISTS iedi.mention_analysis (
 -- iedi_normalized: IEDI normalizado (0 a 10)
 -- numerator: Numerador da fórmula IEDI
 -- denominator: Denominador da fórmula IEDI
+-- published_date: Data de publicação da mention (coluna de partição)
+-- domain: Domínio do veículo da mention (cluster)
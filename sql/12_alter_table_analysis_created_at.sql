@@ -0,0 +1,12 @@
+-- ============================================================================
+-- Adiciona created_at em iedi.analysis (bases criadas antes da coluna existir)
+-- Usado na listagem paginada por cursor (created_at DESC, id DESC)
+-- ============================================================================
+
+ALTER TABLE iedi.analysis
+ADD COLUMN IF NOT EXISTS created_at TIMESTAMP;
+
+-- Análises antigas não têm data de criação: ficam no fim da listagem
+UPDATE iedi.analysis
+SET created_at = TIMESTAMP '1970-01-01 00:00:00 UTC'
+WHERE created_at IS NULL;
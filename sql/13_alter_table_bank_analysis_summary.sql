@@ -0,0 +1,8 @@
+-- ============================================================================
+-- Adiciona summary em iedi.bank_analysis (bases criadas antes da coluna existir)
+-- JSON com as distribuições por banco calculadas junto das métricas; o dashboard
+-- monta os gráficos a partir dele, sem reler as menções
+-- ============================================================================
+
+ALTER TABLE iedi.bank_analysis
+ADD COLUMN IF NOT EXISTS summary STRING;
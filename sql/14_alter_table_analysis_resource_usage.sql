@@ -0,0 +1,8 @@
+-- ============================================================================
+-- Adiciona resource_usage em iedi.analysis (bases criadas antes da coluna existir)
+-- JSON com CPU, tempo por etapa, pico de RSS, páginas/bytes do Brandwatch,
+-- retentativas, consultas/bytes do BigQuery e linhas gravadas no processamento
+-- ============================================================================
+
+ALTER TABLE iedi.analysis
+ADD COLUMN IF NOT EXISTS resource_usage STRING;
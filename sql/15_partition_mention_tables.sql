@@ -0,0 +1,128 @@
+-- ============================================================================
+-- Particiona iedi.mention e iedi.mention_analysis (bases criadas antes do layout
+-- particionado em 06/07). O BigQuery não altera particionamento de tabela existente:
+-- a tabela é recriada com o layout novo e os dados são copiados.
+-- Em bases novas (06/07 já particionadas) o script não faz nada.
+--
+-- Nenhum passo apaga dados antes de a cópia estar conferida: a tabela nova é
+-- preenchida e comparada por contagem de linhas; só então a original vira
+-- <tabela>_backup, a nova assume o nome e o backup é removido. Se a execução
+-- parar entre as renomeações, a próxima coloca a cópia conferida no lugar.
+-- ============================================================================
+
+-- Execução anterior interrompida depois de mention -> mention_backup
+IF NOT EXISTS (SELECT 1 FROM iedi.INFORMATION_SCHEMA.TABLES WHERE table_name = 'mention')
+  AND EXISTS (SELECT 1 FROM iedi.INFORMATION_SCHEMA.TABLES WHERE table_name = 'mention_partitioned') THEN
+  ALTER TABLE iedi.mention_partitioned RENAME TO mention;
+END IF;
+
+IF NOT EXISTS (
+  SELECT 1 FROM iedi.INFORMATION_SCHEMA.COLUMNS
+  WHERE table_name = 'mention' AND is_partitioning_column = 'YES'
+) THEN
+  -- Uma cópia parcial de execução anterior é descartada; a original segue intacta
+  CREATE OR REPLACE TABLE iedi.mention_partitioned (
+    id STRING(36) NOT NULL,
+    url STRING(500) NOT NULL,
+    brandwatch_id STRING(255),
+    original_url STRING(500),
+    categories ARRAY<STRING>,
+    sentiment STRING(50) NOT NULL,
+    title STRING,
+    snippet STRING,
+    full_text STRING,
+    domain STRING(255),
+    published_date TIMESTAMP,
+    media_outlet_id STRING(36),
+    monthly_visitors INT64,
+    reach_group STRING(10) NOT NULL,
+    created_at TIMESTAMP NOT NULL,
+    updated_at TIMESTAMP
+  )
+  PARTITION BY TIMESTAMP_TRUNC(published_date, MONTH)
+  CLUSTER BY domain;
+
+  INSERT INTO iedi.mention_partitioned (
+    id, url, brandwatch_id, original_url, categories, sentiment, title, snippet, full_text,
+    domain, published_date, media_outlet_id, monthly_visitors, reach_group, created_at, updated_at
+  )
+  SELECT
+    id, url, brandwatch_id, original_url, categories, sentiment, title, snippet, full_text,
+    domain, published_date, media_outlet_id, monthly_visitors, reach_group, created_at, updated_at
+  FROM iedi.mention;
+
+  IF (SELECT COUNT(*) FROM iedi.mention_partitioned) != (SELECT COUNT(*) FROM iedi.mention) THEN
+    RAISE USING MESSAGE = 'mention: contagem de linhas da cópia diverge da original; nada foi trocado';
+  END IF;
+
+  ALTER TABLE iedi.mention RENAME TO mention_backup;
+  ALTER TABLE iedi.mention_partitioned RENAME TO mention;
+END IF;
+
+-- O backup só sai depois de a tabela particionada estar no lugar
+IF EXISTS (
+  SELECT 1 FROM iedi.INFORMATION_SCHEMA.COLUMNS
+  WHERE table_name = 'mention' AND is_partitioning_column = 'YES'
+) THEN
+  DROP TABLE IF EXISTS iedi.mention_backup;
+END IF;
+
+-- Execução anterior interrompida depois de mention_analysis -> mention_analysis_backup
+IF NOT EXISTS (SELECT 1 FROM iedi.INFORMATION_SCHEMA.TABLES WHERE table_name = 'mention_analysis')
+  AND EXISTS (SELECT 1 FROM iedi.INFORMATION_SCHEMA.TABLES WHERE table_name = 'mention_analysis_partitioned') THEN
+  ALTER TABLE iedi.mention_analysis_partitioned RENAME TO mention_analysis;
+END IF;
+
+IF NOT EXISTS (
+  SELECT 1 FROM iedi.INFORMATION_SCHEMA.COLUMNS
+  WHERE table_name = 'mention_analysis' AND is_partitioning_column = 'YES'
+) THEN
+  -- Uma cópia parcial de execução anterior é descartada; a original segue intacta
+  CREATE OR REPLACE TABLE iedi.mention_analysis_partitioned (
+    id STRING(36) NOT NULL,
+    mention_id STRING(36) NOT NULL,
+    bank_name STRING(255) NOT NULL,
+    sentiment STRING(50),
+    reach_group STRING(10),
+    niche_vehicle BOOL,
+    title_mentioned BOOL,
+    subtitle_used BOOL,
+    subtitle_mentioned BOOL,
+    iedi_score FLOAT64,
+    iedi_normalized FLOAT64,
+    numerator INT64,
+    denominator INT64,
+    published_date TIMESTAMP,
+    domain STRING(255)
+  )
+  PARTITION BY TIMESTAMP_TRUNC(published_date, MONTH)
+  CLUSTER BY bank_name, domain;
+
+  -- published_date e domain vêm da mention de cada análise
+  INSERT INTO iedi.mention_analysis_partitioned (
+    id, mention_id, bank_name, sentiment, reach_group, niche_vehicle, title_mentioned,
+    subtitle_used, subtitle_mentioned, iedi_score, iedi_normalized, numerator, denominator,
+    published_date, domain
+  )
+  SELECT
+    ma.id, ma.mention_id, ma.bank_name, ma.sentiment, ma.reach_group, ma.niche_vehicle, ma.title_mentioned,
+    ma.subtitle_used, ma.subtitle_mentioned, ma.iedi_score, ma.iedi_normalized, ma.numerator, ma.denominator,
+    m.published_date, m.domain
+  FROM iedi.mention_analysis ma
+  LEFT JOIN iedi.mention m ON m.id = ma.mention_id;
+
+  IF (SELECT COUNT(*) FROM iedi.mention_analysis_partitioned) != (SELECT COUNT(*) FROM iedi.mention_analysis) THEN
+    RAISE USING MESSAGE = 'mention_analysis: contagem de linhas da cópia diverge da original; nada foi trocado';
+  END IF;
+
+  ALTER TABLE iedi.mention_analysis RENAME TO mention_analysis_backup;
+  ALTER TABLE iedi.mention_analysis_partitioned RENAME TO mention_analysis;
+END IF;
+
+-- O backup só sai depois de a tabela particionada estar no lugar
+IF EXISTS (
+  SELECT 1 FROM iedi.INFORMATION_SCHEMA.COLUMNS
+  WHERE table_name = 'mention_analysis' AND is_partitioning_column = 'YES'
+) THEN
+  DROP TABLE IF EXISTS iedi.mention_analysis_backup;
+END IF;
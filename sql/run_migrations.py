@@ -2,156 +2,459 @@
 """
 Script para executar migrations SQL no Google BigQuery.
 
+Cada arquivo aplicado é registrado em iedi.schema_migrations (nome + checksum SHA-256);
+execuções seguintes só rodam os arquivos pendentes. Os create_table_* pendentes são
+submetidos juntos (jobs do BigQuery em paralelo); inserts, fixes e alters rodam em
+seguida, um a um, na ordem numérica.
+
 Uso:
-    python sql/run_migrations.py
+    python sql/run_migrations.py              # aplica as pendentes (pede confirmação)
+    python sql/run_migrations.py --dry-run    # lista pendentes e estimativa de bytes, sem executar
+    python sql/run_migrations.py --yes        # sem confirmação (deploy)
+    python sql/run_migrations.py --baseline   # registra tudo como aplicado sem executar
+                                              # (bases criadas antes do controle de migrations)
+    python sql/run_migrations.py --reset      # remove o schema iedi e aplica tudo do zero
 
 Variáveis de ambiente necessárias:
     GOOGLE_CLOUD_PROJECT_ID - ID do projeto GCP
     GOOGLE_APPLICATION_CREDENTIALS - Caminho para arquivo JSON do service account
 """
 
+import argparse
+import hashlib
 import os
+import re
 import sys
+import time
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
 from google.cloud import bigquery
 from google.oauth2 import service_account
 from dotenv import load_dotenv
 
 load_dotenv()
 
+LEDGER_TABLE = "iedi.schema_migrations"
+LEDGER_DDL = f"""
+CREATE SCHEMA IF NOT EXISTS iedi;
+CREATE TABLE IF NOT EXISTS {LEDGER_TABLE} (
+  filename STRING NOT NULL,
+  checksum STRING NOT NULL,
+  applied_at TIMESTAMP NOT NULL,
+  bytes_processed INT64,
+  duration_seconds FLOAT64,
+  baseline BOOL
+);
+"""
+
+# Layout esperado das tabelas grandes: consultas por período leem só as partições filtradas
+EXPECTED_LAYOUT = {
+    "mention": {"partition": "published_date", "cluster": ["domain"]},
+    "mention_analysis": {"partition": "published_date", "cluster": ["bank_name", "domain"]},
+}
+
+DATASET = "dataset"
+TABLE = "table"
+CHANGE = "change"
+
+@dataclass
+class Migration:
+    name: str
+    sql: str
+    checksum: str
+    kind: str
+
+
 def get_bigquery_client():
     project_id = os.getenv('GOOGLE_CLOUD_PROJECT_ID')
     credentials_path = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
-    
+
     if not project_id:
         raise ValueError("GOOGLE_CLOUD_PROJECT_ID não definido")
-    
+
     if not credentials_path:
         raise ValueError("GOOGLE_APPLICATION_CREDENTIALS não definido")
-    
+
     if not os.path.exists(credentials_path):
         raise FileNotFoundError(f"Arquivo de credenciais não encontrado: {credentials_path}")
-    
+
     credentials = service_account.Credentials.from_service_account_file(
         credentials_path,
         scopes=["https://www.googleapis.com/auth/bigquery"]
     )
-    
+
     client = bigquery.Client(
         project=project_id,
         credentials=credentials
     )
-    
+
     return client
 
 
-def get_sql_files(sql_dir: Path):
-    sql_files = sorted(sql_dir.glob('*.sql'))
-    
-    create_dataset = [f for f in sql_files if 'create_dataset' in f.name]
-    create_tables = [f for f in sql_files if 'create_table' in f.name]
-    inserts = [f for f in sql_files if 'insert' in f.name]
-    
-    return create_dataset + create_tables + inserts
-
-
-def execute_sql_file(client: bigquery.Client, sql_file: Path):
-    print(f"\n{'='*80}")
-    print(f"Executando: {sql_file.name}")
-    print('='*80)
-    
-    with open(sql_file, 'r', encoding='utf-8') as f:
-        sql_content = f.read()
-    
-    if not sql_content.strip():
-        print("⚠️  Arquivo vazio, pulando...")
-        return True
-    
+# ========================================
+# PLANEJAMENTO (sem BigQuery)
+# ========================================
+
+def compute_checksum(sql_content: str) -> str:
+    normalized = sql_content.replace("\r\n", "\n").strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def migration_kind(filename: str) -> str:
+    if 'create_dataset' in filename:
+        return DATASET
+    if 'create_table' in filename:
+        return TABLE
+    return CHANGE
+
+
+def load_migrations(sql_dir: Path) -> List[Migration]:
+    """Arquivos .sql na ordem numérica (dataset, tabelas e depois inserts/fixes/alters)."""
+    migrations = []
+    for sql_file in sorted(sql_dir.glob('*.sql')):
+        sql_content = sql_file.read_text(encoding='utf-8')
+        migrations.append(Migration(
+            name=sql_file.name,
+            sql=sql_content,
+            checksum=compute_checksum(sql_content),
+            kind=migration_kind(sql_file.name),
+        ))
+    order = {DATASET: 0, TABLE: 1, CHANGE: 2}
+    return sorted(migrations, key=lambda m: (order[m.kind], m.name))
+
+
+def plan_migrations(migrations: List[Migration], applied: Set[Tuple[str, str]]) -> Dict[str, List[Migration]]:
+    """
+    Separa em aplicadas, pendentes e alteradas. Uma migration é identificada por
+    (nome, checksum): um arquivo já aplicado cujo conteúdo mudou fica em "changed".
+    """
+    applied_names = {name for name, _ in applied}
+    plan = {"applied": [], "pending": [], "changed": []}
+    for migration in migrations:
+        if (migration.name, migration.checksum) in applied:
+            plan["applied"].append(migration)
+        elif migration.name in applied_names:
+            plan["changed"].append(migration)
+        else:
+            plan["pending"].append(migration)
+    return plan
+
+
+def select_runnable(plan: Dict[str, List[Migration]], allow_changed: bool = False) -> Tuple[List[Migration], List[Migration]]:
+    """
+    (a executar, alteradas bloqueadas). create_table alterado é reexecutado sempre:
+    o IF NOT EXISTS não mexe em tabela existente (mudanças de layout vão em arquivo próprio).
+    """
+    changed_tables = [m for m in plan["changed"] if m.kind == TABLE]
+    blocked = [m for m in plan["changed"] if m.kind != TABLE]
+    to_run = plan["pending"] + changed_tables + (blocked if allow_changed else [])
+    order = {DATASET: 0, TABLE: 1, CHANGE: 2}
+    return sorted(to_run, key=lambda m: (order[m.kind], m.name)), ([] if allow_changed else blocked)
+
+
+def build_batches(migrations: List[Migration]) -> List[List[Migration]]:
+    """Lotes executados em sequência; os create_table de um lote rodam em paralelo."""
+    batches = [[m] for m in migrations if m.kind == DATASET]
+    tables = [m for m in migrations if m.kind == TABLE]
+    if tables:
+        batches.append(tables)
+    batches.extend([m] for m in migrations if m.kind == CHANGE)
+    return batches
+
+
+def split_statements(sql_content: str) -> List[str]:
+    """Comandos do arquivo (sem comentários de linha), para estimar cada um no dry-run."""
+    lines = [line for line in sql_content.splitlines() if not line.strip().startswith('--')]
+    return [statement.strip() for statement in "\n".join(lines).split(';') if statement.strip()]
+
+
+def is_script(sql_content: str) -> bool:
+    """Arquivos com blocos de script (IF/DECLARE/BEGIN) são estimados inteiros, não por comando."""
+    return re.search(r"^\s*(IF|DECLARE|BEGIN)\b", sql_content, re.MULTILINE | re.IGNORECASE) is not None
+
+
+def layout_problems(columns: List[Dict]) -> List[str]:
+    """
+    Compara EXPECTED_LAYOUT com linhas de INFORMATION_SCHEMA.COLUMNS
+    (table_name, column_name, is_partitioning_column, clustering_ordinal_position).
+    """
+    problems = []
+    for table_name, expected in EXPECTED_LAYOUT.items():
+        table_columns = [c for c in columns if c["table_name"] == table_name]
+        if not table_columns:
+            problems.append(f"iedi.{table_name}: tabela inexistente")
+            continue
+        partition = [c["column_name"] for c in table_columns if c["is_partitioning_column"] == "YES"]
+        if partition != [expected["partition"]]:
+            problems.append(f"iedi.{table_name}: particionada por {partition or 'nada'}, esperado {expected['partition']}")
+        clustered = sorted(
+            (c for c in table_columns if c["clustering_ordinal_position"] is not None),
+            key=lambda c: c["clustering_ordinal_position"],
+        )
+        cluster = [c["column_name"] for c in clustered]
+        if cluster != expected["cluster"]:
+            problems.append(f"iedi.{table_name}: cluster {cluster or 'nenhum'}, esperado {expected['cluster']}")
+    return problems
+
+
+def format_bytes(value: Optional[int]) -> str:
+    if value is None:
+        return "n/d"
+    return f"{value / (1024 * 1024):.2f} MB"
+
+
+# ========================================
+# BIGQUERY
+# ========================================
+
+def fetch_applied(client: bigquery.Client) -> Set[Tuple[str, str]]:
+    from google.api_core.exceptions import NotFound
+
     try:
-        query_job = client.query(sql_content)
-        query_job.result()
-        
-        print(f"✓ {sql_file.name} executado com sucesso")
-        
-        if query_job.total_bytes_processed:
-            bytes_processed = query_job.total_bytes_processed / (1024 * 1024)
-            print(f"  Bytes processados: {bytes_processed:.2f} MB")
-        
-        if query_job.num_dml_affected_rows is not None:
-            print(f"  Linhas afetadas: {query_job.num_dml_affected_rows}")
-        
-        return True
-        
-    except Exception as e:
-        print(f"✗ Erro ao executar {sql_file.name}:")
-        print(f"  {str(e)}")
-        return False
+        rows = client.query(f"SELECT filename, checksum FROM {LEDGER_TABLE}").result()
+    except NotFound:
+        return set()
+    return {(row.filename, row.checksum) for row in rows}
+
+
+def ensure_ledger(client: bigquery.Client):
+    client.query(LEDGER_DDL).result()
+
+
+def record_migration(client: bigquery.Client, migration: Migration, bytes_processed=None, duration_seconds=None, baseline=False):
+    client.query(
+        f"INSERT INTO {LEDGER_TABLE} (filename, checksum, applied_at, bytes_processed, duration_seconds, baseline) "
+        "VALUES (@filename, @checksum, CURRENT_TIMESTAMP(), @bytes_processed, @duration_seconds, @baseline)",
+        job_config=bigquery.QueryJobConfig(query_parameters=[
+            bigquery.ScalarQueryParameter("filename", "STRING", migration.name),
+            bigquery.ScalarQueryParameter("checksum", "STRING", migration.checksum),
+            bigquery.ScalarQueryParameter("bytes_processed", "INT64", bytes_processed),
+            bigquery.ScalarQueryParameter("duration_seconds", "FLOAT64", duration_seconds),
+            bigquery.ScalarQueryParameter("baseline", "BOOL", baseline),
+        ]),
+    ).result()
+
+
+def estimate_bytes(client: bigquery.Client, migration: Migration) -> Tuple[Optional[int], Optional[str]]:
+    """Soma dos bytes estimados (dry-run) dos comandos do arquivo; DDL estima 0."""
+    total = 0
+    statements = [migration.sql] if is_script(migration.sql) else split_statements(migration.sql)
+    for statement in statements:
+        try:
+            job = client.query(statement, job_config=bigquery.QueryJobConfig(dry_run=True, use_query_cache=False))
+            total += job.total_bytes_processed or 0
+        except Exception as e:
+            # Ex.: a tabela ainda não existe porque é criada por outra migration pendente
+            return None, str(e).splitlines()[0]
+    return total, None
+
+
+def fetch_layout(client: bigquery.Client) -> List[Dict]:
+    from google.api_core.exceptions import NotFound
 
+    query = (
+        "SELECT table_name, column_name, is_partitioning_column, clustering_ordinal_position "
+        "FROM iedi.INFORMATION_SCHEMA.COLUMNS WHERE table_name IN UNNEST(@tables)"
+    )
+    try:
+        rows = client.query(query, job_config=bigquery.QueryJobConfig(query_parameters=[
+            bigquery.ArrayQueryParameter("tables", "STRING", list(EXPECTED_LAYOUT)),
+        ])).result()
+    except NotFound:
+        return []
+    return [dict(row.items()) for row in rows]
+
+
+def validate_layout(client: bigquery.Client) -> bool:
+    print("Validando particionamento/cluster...")
+    problems = layout_problems(fetch_layout(client))
+    for problem in problems:
+        print(f"  ✗ {problem}")
+    if not problems:
+        print(f"  ✓ {', '.join(f'iedi.{table}' for table in EXPECTED_LAYOUT)} com o layout esperado")
+    print()
+    return not problems
+
+
+def execute_batch(client: bigquery.Client, batch: List[Migration], maximum_bytes_billed=None) -> Tuple[int, int]:
+    """Submete todos os jobs do lote e depois aguarda cada um; registra os que concluírem."""
+    job_config = bigquery.QueryJobConfig(maximum_bytes_billed=maximum_bytes_billed) if maximum_bytes_billed else None
+    submitted = []
+    for migration in batch:
+        print(f"→ Executando: {migration.name}")
+        started = time.perf_counter()
+        try:
+            submitted.append((migration, client.query(migration.sql, job_config=job_config), started))
+        except Exception as e:
+            print(f"✗ Erro ao submeter {migration.name}:")
+            print(f"  {str(e)}")
+            submitted.append((migration, None, started))
+
+    success_count = 0
+    error_count = 0
+    for migration, query_job, started in submitted:
+        if query_job is None:
+            error_count += 1
+            continue
+        try:
+            query_job.result()
+            duration = time.perf_counter() - started
+            record_migration(client, migration, query_job.total_bytes_processed, duration)
+            print(f"✓ {migration.name} executado com sucesso ({duration:.1f}s)")
+            if query_job.total_bytes_processed:
+                print(f"  Bytes processados: {format_bytes(query_job.total_bytes_processed)}")
+            if query_job.num_dml_affected_rows is not None:
+                print(f"  Linhas afetadas: {query_job.num_dml_affected_rows}")
+            success_count += 1
+        except Exception as e:
+            print(f"✗ Erro ao executar {migration.name}:")
+            print(f"  {str(e)}")
+            error_count += 1
+    return success_count, error_count
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Migrations BigQuery - Sistema IEDI")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Lista as migrations pendentes com a estimativa de bytes, sem executar")
+    parser.add_argument("--yes", "-y", action="store_true", help="Não pede confirmação")
+    parser.add_argument("--baseline", action="store_true",
+                        help="Registra todos os arquivos como aplicados sem executá-los")
+    parser.add_argument("--allow-changed", action="store_true",
+                        help="Reexecuta arquivos já aplicados cujo conteúdo mudou")
+    parser.add_argument("--reset", action="store_true",
+                        help="Remove o schema iedi (dados e registro de migrations) antes de aplicar")
+    parser.add_argument("--maximum-bytes-billed", type=int, default=None,
+                        help="Limite de bytes faturados por migration (o job falha acima disso)")
+    args = parser.parse_args(argv)
+    if args.dry_run and (args.baseline or args.reset):
+        parser.error("--dry-run não pode ser combinado com --baseline ou --reset")
+    return args
+
+
+def confirm(args, message="Pressione ENTER para continuar ou Ctrl+C para cancelar..."):
+    if not args.yes:
+        input(message)
+        print()
+
+
+def main(argv=None):
+    args = parse_args(argv)
 
-def main():
     print("="*80)
-    print("MIGRATIONS BIGQUERY - Sistema IEDI")
+    print("MIGRATIONS BIGQUERY - Sistema IEDI" + (" (dry-run)" if args.dry_run else ""))
     print("="*80)
     print()
-    
+
     try:
         print("Conectando ao BigQuery...")
         client = get_bigquery_client()
         print(f"✓ Conectado ao projeto: {client.project}")
         print()
-        
-        print("Removendo schema 'iedi' existente (se houver)...")
-        try:
+
+        migrations = load_migrations(Path(__file__).parent)
+        if not migrations:
+            print("✗ Nenhum arquivo SQL encontrado")
+            return 1
+
+        if args.reset:
+            print("⚠️  --reset remove o schema 'iedi' com todos os dados e o registro de migrations.")
+            confirm(args)
             client.query("DROP SCHEMA IF EXISTS iedi CASCADE").result()
             print("✓ Schema 'iedi' removido")
-        except Exception as e:
-            print(f"⚠️  Aviso ao remover schema: {str(e)}")
+            print()
+
+        if not args.dry_run:
+            ensure_ledger(client)
+
+        plan = plan_migrations(migrations, fetch_applied(client))
+        to_run, blocked = select_runnable(plan, args.allow_changed)
+
+        print(f"Aplicadas: {len(plan['applied'])} | Pendentes: {len(plan['pending'])} | Alteradas: {len(plan['changed'])}")
+        for migration in plan["changed"]:
+            if migration.kind == TABLE:
+                print(f"  ⚠️  {migration.name} mudou desde que foi aplicado (reexecutado; tabela existente não é alterada)")
+            else:
+                print(f"  ⚠️  {migration.name} mudou desde que foi aplicado"
+                      + ("" if args.allow_changed else " (use --allow-changed para reexecutar)"))
         print()
-        
-        sql_dir = Path(__file__).parent
-        sql_files = get_sql_files(sql_dir)
-        
-        if not sql_files:
-            print("✗ Nenhum arquivo SQL encontrado")
+
+        if args.baseline:
+            if not to_run:
+                print("✓ Nada a registrar")
+                return 0
+            for migration in to_run:
+                print(f"  - {migration.name}")
+            confirm(args, "Registrar como aplicadas sem executar? ENTER para continuar ou Ctrl+C para cancelar...")
+            for migration in to_run:
+                record_migration(client, migration, baseline=True)
+            print(f"✓ {len(to_run)} migrations registradas como aplicadas")
+            return 0
+
+        if blocked and not args.dry_run:
+            print("✗ Existem migrations alteradas após aplicadas. Crie um novo arquivo ou use --allow-changed.")
             return 1
-        
-        print(f"Encontrados {len(sql_files)} arquivos SQL:")
-        for sql_file in sql_files:
-            print(f"  - {sql_file.name}")
-        print()
-        
-        input("Pressione ENTER para continuar ou Ctrl+C para cancelar...")
+
+        if not to_run:
+            print("✓ Nenhuma migration pendente")
+            print()
+            return 0 if validate_layout(client) else 1
+
+        # Estimativa (dry-run) de inserts/fixes/alters; DDL não processa bytes
+        print("Migrations a executar:")
+        total_estimate = 0
+        for migration in to_run:
+            if migration.kind == CHANGE:
+                estimate, error = estimate_bytes(client, migration)
+                total_estimate += estimate or 0
+                detail = f"~{format_bytes(estimate)}" + (f" ({error})" if error else "")
+            else:
+                detail = "DDL" + (" (paralelo)" if migration.kind == TABLE else "")
+            print(f"  - {migration.name}: {detail}")
+        print(f"Total estimado: {format_bytes(total_estimate)}")
         print()
-        
+
+        if args.dry_run:
+            # Layout atual (antes das pendentes); sem efeito no código de saída
+            validate_layout(client)
+            print("✓ Dry-run concluído; nada foi executado")
+            return 0
+
+        confirm(args)
+
         success_count = 0
         error_count = 0
-        
-        for sql_file in sql_files:
-            if execute_sql_file(client, sql_file):
-                success_count += 1
-            else:
-                error_count += 1
-        
+        for batch in build_batches(to_run):
+            succeeded, failed = execute_batch(client, batch, args.maximum_bytes_billed)
+            success_count += succeeded
+            error_count += failed
+            if failed:
+                # Migrations seguintes podem depender das que falharam
+                break
+
         print()
         print("="*80)
         print("RESUMO")
         print("="*80)
-        print(f"Total de arquivos: {len(sql_files)}")
-        print(f"Executados com sucesso: {success_count}")
+        print(f"Migrations a executar: {len(to_run)}")
+        print(f"Executadas com sucesso: {success_count}")
         print(f"Erros: {error_count}")
+        print(f"Não executadas: {len(to_run) - success_count - error_count}")
         print()
-        
+
         if error_count == 0:
             print("✓ Todas as migrations foram executadas com sucesso!")
-            return 0
+            print()
+            return 0 if validate_layout(client) else 1
         else:
             print("✗ Algumas migrations falharam. Verifique os erros acima.")
             return 1
-            
+
     except KeyboardInterrupt:
         print("\n\n✗ Operação cancelada pelo usuário")
         return 1
-        
+
     except Exception as e:
         print(f"\n✗ Erro fatal: {str(e)}")
         import traceback
@@ -46,10 +46,18 @@ async function request(endpoint, options = {}) {
  */
 const API = {
     /**
-     * Get all analyses
+     * Get a page of analyses (keyset pagination)
+     * filters: { limit, cursor, status, name_prefix, created_from, created_to }
      */
-    getAnalyses: async () => {
-        return request('/api/analyses');
+    getAnalyses: async (filters = {}) => {
+        const params = new URLSearchParams();
+        Object.entries(filters).forEach(([key, value]) => {
+            if (value !== null && value !== undefined && value !== '') {
+                params.append(key, value);
+            }
+        });
+        const query = params.toString();
+        return request(`/api/analyses${query ? `?${query}` : ''}`);
     },
     
     /**
@@ -66,6 +74,34 @@ const API = {
         return request(`/api/analyses/${analysisId}/banks`);
     },
     
+    /**
+     * Get bank analyses of several analyses with a single request
+     */
+    getBankAnalysesBatch: async (analysisIds) => {
+        return request(`/api/bank-analyses?analysis_ids=${analysisIds.map(encodeURIComponent).join(',')}`);
+    },
+    
+    /**
+     * Get a page of scored mentions of an analysis
+     * params: { bank_name, sentiment, reach_group, headline_mentioned, domain, sort, limit, cursor }
+     */
+    getAnalysisMentions: async (analysisId, params = {}) => {
+        const query = new URLSearchParams();
+        Object.entries(params).forEach(([key, value]) => {
+            if (value !== null && value !== undefined && value !== '') {
+                query.append(key, value);
+            }
+        });
+        return request(`/api/analyses/${analysisId}/mentions?${query.toString()}`);
+    },
+    
+    /**
+     * Open a Server-Sent Events stream with the analysis progress
+     */
+    streamAnalysisEvents: (analysisId) => {
+        return new EventSource(`${API_BASE_URL}/api/analyses/${analysisId}/events`);
+    },
+    
     /**
      * Create new analysis
      */
@@ -76,6 +112,13 @@ const API = {
         });
     },
     
+    /**
+     * Get rankings and comparisons across analyses
+     */
+    getComparison: async (analysisIds) => {
+        return request(`/api/comparisons?analysis_ids=${analysisIds.map(encodeURIComponent).join(',')}`);
+    },
+    
     /**
      * Get all available banks
      */
@@ -120,6 +163,7 @@ function getStatusBadgeClass(status) {
         'PENDING': 'badge-pending',
         'PROCESSING': 'badge-processing',
         'COMPLETED': 'badge-completed',
+        'DONE': 'badge-completed',
         'FAILED': 'badge-failed',
     };
     return statusMap[status] || 'badge-pending';
@@ -133,6 +177,7 @@ function getStatusLabel(status) {
         'PENDING': 'Pendente',
         'PROCESSING': 'Processando',
         'COMPLETED': 'Concluída',
+        'DONE': 'Concluída',
         'FAILED': 'Falhou',
     };
     return statusMap[status] || status;
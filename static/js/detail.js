@@ -3,6 +3,10 @@
  */
 
 let currentAnalysisId = null;
+let eventSource = null;
+let partialBanks = {};
+let mentionFilters = {};
+let mentionsCursor = null;
 
 // Load analysis details on page load
 document.addEventListener('DOMContentLoaded', () => {
@@ -45,7 +49,9 @@ async function loadAnalysisDetails() {
         if (analysis.status === 'PENDING' || analysis.status === 'PROCESSING') {
             document.getElementById('processing-message').style.display = 'flex';
             document.getElementById('results-container').style.display = 'none';
+            openEventStream(bankAnalyses);
         } else {
+            closeEventStream();
             document.getElementById('processing-message').style.display = 'none';
             
             // Render bank results
@@ -58,6 +64,7 @@ async function loadAnalysisDetails() {
                 document.getElementById('results-container').style.display = 'block';
                 document.getElementById('no-results').style.display = 'none';
                 document.getElementById('results-grid').style.display = 'grid';
+                setupMentionsExplorer(bankAnalyses);
             }
         }
         
@@ -69,6 +76,113 @@ async function loadAnalysisDetails() {
     }
 }
 
+/**
+ * Follow processing through Server-Sent Events instead of polling the API
+ */
+function openEventStream(bankAnalyses) {
+    if (eventSource) return;
+    
+    partialBanks = {};
+    bankAnalyses.forEach(bankAnalysis => {
+        partialBanks[bankAnalysis.bank_name] = bankAnalysis;
+    });
+    
+    let stage = null;
+    let progress = {};
+    eventSource = API.streamAnalysisEvents(currentAnalysisId);
+    
+    eventSource.addEventListener('snapshot', (event) => {
+        const state = JSON.parse(event.data);
+        stage = state.stage;
+        progress = state.progress || {};
+        Object.values(state.banks || {}).forEach(mergePartialBank);
+        renderProgress(stage, progress);
+    });
+    
+    eventSource.addEventListener('stage', (event) => {
+        stage = JSON.parse(event.data).stage;
+        renderProgress(stage, progress);
+    });
+    
+    eventSource.addEventListener('progress', (event) => {
+        const counters = JSON.parse(event.data);
+        Object.entries(counters).forEach(([key, value]) => {
+            progress[key] = (progress[key] || 0) + value;
+        });
+        renderProgress(stage, progress);
+    });
+    
+    eventSource.addEventListener('bank', (event) => {
+        mergePartialBank(JSON.parse(event.data));
+    });
+    
+    eventSource.addEventListener('done', () => {
+        closeEventStream();
+        loadAnalysisDetails();
+    });
+    
+    eventSource.addEventListener('error', (event) => {
+        // Erros de conexão não trazem dados: o EventSource reconecta sozinho,
+        // exceto quando o servidor recusa o stream (ex.: limite de streams, 503)
+        if (!event.data) {
+            if (eventSource && eventSource.readyState === EventSource.CLOSED) {
+                closeEventStream();
+                setTimeout(loadAnalysisDetails, 5000);
+            }
+            return;
+        }
+        const data = JSON.parse(event.data);
+        if (!data.will_retry) {
+            closeEventStream();
+            showError('error', data.error || 'Falha no processamento da análise');
+        }
+    });
+}
+
+/**
+ * Close the current event stream, if any
+ */
+function closeEventStream() {
+    if (eventSource) {
+        eventSource.close();
+        eventSource = null;
+    }
+}
+
+/**
+ * Update a partial bank result and re-render the cards
+ */
+function mergePartialBank(bankMetrics) {
+    partialBanks[bankMetrics.bank_name] = { ...partialBanks[bankMetrics.bank_name], ...bankMetrics };
+    const finished = Object.values(partialBanks).filter(bankAnalysis => bankAnalysis.iedi_score !== null && bankAnalysis.iedi_score !== undefined);
+    if (finished.length === 0) return;
+    
+    renderBankResults(finished);
+    document.getElementById('results-container').style.display = 'block';
+    document.getElementById('no-results').style.display = 'none';
+    document.getElementById('results-grid').style.display = 'grid';
+}
+
+/**
+ * Render processing stage and counters
+ */
+function renderProgress(stage, progress) {
+    const stageLabels = {
+        'job_started': 'Iniciando',
+        'fetching': 'Coletando menções',
+        'scoring': 'Calculando IEDI',
+        'shard': 'Processando partes',
+        'merging': 'Consolidando resultados',
+    };
+    const parts = [];
+    if (stage) parts.push(stageLabels[stage] || stage);
+    if (progress.pages) parts.push(`${progress.pages} páginas`);
+    if (progress.fetched_mentions) parts.push(`${progress.fetched_mentions} menções coletadas`);
+    if (progress.filtered_mentions) parts.push(`${progress.filtered_mentions} menções válidas`);
+    if (progress.shards_done) parts.push(`${progress.shards_done} partes concluídas`);
+    document.getElementById('processing-progress').textContent = parts.join(' · ');
+}
+
 /**
  * Render analysis information
  */
@@ -141,3 +255,99 @@ function createBankResultCard(bankAnalysis) {
     
     return card;
 }
+
+/**
+ * Fill the bank filter and load the first page of mentions
+ */
+function setupMentionsExplorer(bankAnalyses) {
+    const bankSelect = document.getElementById('mentions-bank');
+    bankSelect.innerHTML = '<option value="">Todos os bancos</option>';
+    bankAnalyses.forEach(bankAnalysis => {
+        const option = document.createElement('option');
+        option.value = bankAnalysis.bank_name;
+        option.textContent = formatBankName(bankAnalysis.bank_name);
+        bankSelect.appendChild(option);
+    });
+    
+    document.getElementById('mentions-container').style.display = 'block';
+    loadMentions();
+}
+
+/**
+ * Read the filters form and reload the mentions
+ */
+function applyMentionFilters(event) {
+    event.preventDefault();
+    mentionFilters = {
+        bank_name: document.getElementById('mentions-bank').value,
+        sentiment: document.getElementById('mentions-sentiment').value,
+        reach_group: document.getElementById('mentions-reach-group').value,
+        headline_mentioned: document.getElementById('mentions-headline').value,
+        domain: document.getElementById('mentions-domain').value.trim(),
+        sort: document.getElementById('mentions-sort').value,
+    };
+    loadMentions();
+}
+
+/**
+ * Load the first page of mentions for the current filters
+ */
+async function loadMentions() {
+    document.getElementById('mentions-tbody').innerHTML = '';
+    mentionsCursor = null;
+    await loadMoreMentions(true);
+}
+
+/**
+ * Append the next page of mentions
+ */
+async function loadMoreMentions(firstPage = false) {
+    if (!firstPage && !mentionsCursor) return;
+    
+    try {
+        const data = await API.getAnalysisMentions(currentAnalysisId, { ...mentionFilters, cursor: mentionsCursor });
+        renderMentionRows(data.mentions || []);
+        mentionsCursor = data.next_cursor || null;
+        document.getElementById('mentions-total').textContent = `${data.total} menções encontradas`;
+        document.getElementById('mentions-load-more').style.display = mentionsCursor ? 'inline-flex' : 'none';
+    } catch (error) {
+        document.getElementById('mentions-total').textContent = error.message || 'Erro ao carregar menções';
+    }
+}
+
+/**
+ * Render mention rows
+ */
+function renderMentionRows(mentions) {
+    const tbody = document.getElementById('mentions-tbody');
+    
+    mentions.forEach(mention => {
+        const row = document.createElement('tr');
+        const title = document.createElement('a');
+        title.href = mention.mention_url;
+        title.target = '_blank';
+        title.rel = 'noopener';
+        title.textContent = mention.title || mention.mention_url;
+        
+        const cells = [
+            null,
+            formatBankName(mention.bank_name || '-'),
+            mention.sentiment || '-',
+            mention.reach_group || '-',
+            mention.domain || '-',
+            formatDate(mention.published_date),
+            formatIEDI(mention.iedi_score),
+        ];
+        cells.forEach((value, index) => {
+            const cell = document.createElement('td');
+            if (index === 0) {
+                cell.appendChild(title);
+            } else {
+                cell.textContent = value;
+            }
+            row.appendChild(cell);
+        });
+        
+        tbody.appendChild(row);
+    });
+}
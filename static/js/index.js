@@ -2,13 +2,17 @@
  * IEDI - Index Page (Analyses List)
  */
 
+const PAGE_SIZE = 20;
+let nextCursor = null;
+let currentFilters = {};
+
 // Load analyses on page load
 document.addEventListener('DOMContentLoaded', () => {
     loadAnalyses();
 });
 
 /**
- * Load and display all analyses
+ * Load and display the first page of analyses
  */
 async function loadAnalyses() {
     showLoading('loading');
@@ -17,9 +21,12 @@ async function loadAnalyses() {
     document.getElementById('analyses-container').style.display = 'none';
     
     try {
-        const data = await API.getAnalyses();
+        const data = await API.getAnalyses({ ...currentFilters, limit: PAGE_SIZE });
         hideLoading('loading');
         
+        document.getElementById('analyses-tbody').innerHTML = '';
+        updateNextCursor(data.next_cursor);
+        
         if (!data.analyses || data.analyses.length === 0) {
             document.getElementById('empty').style.display = 'block';
             return;
@@ -35,11 +42,59 @@ async function loadAnalyses() {
 }
 
 /**
- * Render analyses table
+ * Load the next page and append it to the table
+ */
+async function loadMoreAnalyses() {
+    if (!nextCursor) return;
+    
+    const button = document.getElementById('load-more');
+    button.disabled = true;
+    
+    try {
+        const data = await API.getAnalyses({ ...currentFilters, limit: PAGE_SIZE, cursor: nextCursor });
+        renderAnalysesTable(data.analyses || []);
+        updateNextCursor(data.next_cursor);
+    } catch (error) {
+        showError('error', error.message || 'Erro ao carregar análises');
+    } finally {
+        button.disabled = false;
+    }
+}
+
+/**
+ * Apply the filters form and reload from the first page
+ */
+function applyFilters(event) {
+    event.preventDefault();
+    currentFilters = {
+        name_prefix: document.getElementById('filter-name').value.trim(),
+        status: document.getElementById('filter-status').value,
+        created_from: document.getElementById('filter-created-from').value,
+        created_to: toEndOfDay(document.getElementById('filter-created-to').value),
+    };
+    loadAnalyses();
+}
+
+/**
+ * created_to is exclusive on the API: include the whole selected day
+ */
+function toEndOfDay(dateValue) {
+    return dateValue ? `${dateValue}T23:59:59.999999` : '';
+}
+
+/**
+ * Store the cursor of the next page and toggle the "load more" button
+ */
+function updateNextCursor(cursor) {
+    nextCursor = cursor || null;
+    document.getElementById('load-more').style.display = nextCursor ? 'inline-flex' : 'none';
+}
+
+/**
+ * Append analyses to the table
  */
 function renderAnalysesTable(analyses) {
     const tbody = document.getElementById('analyses-tbody');
-    tbody.innerHTML = '';
     
     analyses.forEach(analysis => {
         const row = document.createElement('tr');
@@ -59,6 +114,7 @@ function renderAnalysesTable(analyses) {
                     ${getTypeLabel(analysis.is_custom_dates)}
                 </span>
             </td>
+            <td id="iedi-${analysis.id}">-</td>
             <td>${formatDate(analysis.created_at)}</td>
             <td>
                 <button 
@@ -72,6 +128,29 @@ function renderAnalysesTable(analyses) {
         
         tbody.appendChild(row);
     });
+    
+    loadBankScores(analyses.map(analysis => analysis.id));
+}
+
+/**
+ * Fill the per-bank IEDI column of a page with a single batch request
+ */
+async function loadBankScores(analysisIds) {
+    if (analysisIds.length === 0) return;
+    
+    try {
+        const data = await API.getBankAnalysesBatch(analysisIds);
+        Object.entries(data.bank_analyses || {}).forEach(([analysisId, bankAnalyses]) => {
+            const cell = document.getElementById(`iedi-${analysisId}`);
+            if (!cell) return;
+            const scores = bankAnalyses
+                .filter(bankAnalysis => bankAnalysis.iedi_score !== null && bankAnalysis.iedi_score !== undefined)
+                .map(bankAnalysis => `${escapeHtml(formatBankName(bankAnalysis.bank_name))}: ${formatIEDI(bankAnalysis.iedi_score)}`);
+            cell.innerHTML = scores.length ? scores.join('<br>') : '-';
+        });
+    } catch (error) {
+        console.error('Erro ao carregar IEDI por banco:', error);
+    }
 }
 
 /**
@@ -0,0 +1,26 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+import pytest
+
+from app.services.analysis_service import AnalysisService
+
+def test_cursor_round_trip():
+    service = AnalysisService()
+    analysis = SimpleNamespace(id="b-42", created_at=datetime(2025, 10, 1, 12, 30, tzinfo=timezone.utc))
+
+    created_at, analysis_id = service.decode_cursor(service.encode_cursor(analysis))
+
+    assert created_at == analysis.created_at
+    assert analysis_id == "b-42"
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "eyJmb28iOiAxfQ=="])
+def test_invalid_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        AnalysisService().decode_cursor(cursor)
+
+def test_page_limit_validation():
+    service = AnalysisService()
+    assert service.validate_page_limit(None) == AnalysisService.DEFAULT_PAGE_SIZE
+    assert service.validate_page_limit("5") == 5
+    with pytest.raises(ValueError):
+        service.validate_page_limit(AnalysisService.MAX_PAGE_SIZE + 1)
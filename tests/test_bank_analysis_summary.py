@@ -0,0 +1,66 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+import pandas as pd
+
+from app.enums.bank_name import BankName
+from app.enums.reach_group import ReachGroup
+from app.enums.sentiment import Sentiment
+from app.models.bank_analysis import BankAnalysis
+from app.services.bank_analysis_service import BankAnalysisService
+
+BR_TZ = ZoneInfo("America/Sao_Paulo")
+
+def build_frame():
+    return pd.DataFrame({
+        "sentiment": [Sentiment.POSITIVE, Sentiment.NEGATIVE, Sentiment.NEUTRAL, Sentiment.POSITIVE],
+        "reach_group": [ReachGroup.A, ReachGroup.D, None, ReachGroup.A],
+        "title_mentioned": [True, False, False, True],
+        "subtitle_mentioned": [False, True, False, False],
+        "niche_vehicle": [False, False, True, False],
+        "relevant_vehicle": [True, True, False, False],
+        "iedi_normalized": [8.0, 2.0, 5.0, 9.0],
+    })
+
+def test_distributions_are_computed_with_the_metrics():
+    service = BankAnalysisService()
+    summary = service.compute_aggregates(build_frame())["summary"]
+
+    assert summary["sentiment"] == {"positive": 2, "negative": 1, "neutral": 1}
+    assert summary["reach_group"] == {"A": 2, "B": 0, "C": 0, "D": 1, "unknown": 1}
+    assert summary["headline"] == {"title": 2, "subtitle": 1}
+    assert summary["vehicle"] == {"niche": 1, "relevant": 2}
+
+def test_dashboard_is_built_from_stored_summaries():
+    service = BankAnalysisService()
+    bank_analysis = BankAnalysis(
+        bank_name=BankName.ITAU,
+        start_date=datetime(2025, 1, 1, tzinfo=BR_TZ),
+        end_date=datetime(2025, 1, 31, tzinfo=BR_TZ),
+    )
+    service.apply_aggregates(bank_analysis, service.compute_aggregates(build_frame()))
+    legacy = BankAnalysis(
+        bank_name=BankName.BRADESCO,
+        start_date=datetime(2025, 1, 1, tzinfo=BR_TZ),
+        end_date=datetime(2025, 1, 31, tzinfo=BR_TZ),
+    )
+
+    dashboard = service.build_dashboard([bank_analysis, legacy])
+
+    assert dashboard["missing_summary"] == ["BRADESCO"]
+    [itau] = dashboard["banks"]
+    assert itau["total_mentions"] == 4
+    assert itau["sentiment"]["shares"]["positive"] == 0.5
+    assert itau["reach_group"]["shares"]["unknown"] == 0.25
+
+def test_domain_metrics_merge_across_shards():
+    service = BankAnalysisService()
+    frame = build_frame().assign(domain=["g1.globo.com", "valor.com.br", "G1.globo.com", "valor.com.br"])
+
+    single = service.compute_aggregates(frame)
+    merged = service.merge_aggregates([service.compute_aggregates(frame.iloc[:1]), service.compute_aggregates(frame.iloc[1:])])
+    rows = {row["domain"]: row for row in service.domain_metrics_service.finalize(merged)}
+
+    assert merged["domains"] == single["domains"]
+    assert rows["g1.globo.com"]["total_mentions"] == 2
+    assert rows["g1.globo.com"]["contribution_share"] == round(13 / 24, 4)
+    assert rows["valor.com.br"]["negative_share"] == 0.5
@@ -0,0 +1,19 @@
+from itertools import islice
+
+from benchmarks.synthetic import UNKNOWN_DOMAINS, generate_mentions, load_banks, load_outlets
+
+def test_generator_is_deterministic_and_uses_seeded_outlets():
+    relevant, niche = load_outlets()
+    first = list(generate_mentions(500, seed=7))
+
+    assert first == list(generate_mentions(500, seed=7))
+    assert first != list(generate_mentions(500, seed=8))
+    assert "g1.globo.com" in relevant and "jota.info" in niche
+    assert {m["domain"] for m in first} <= set(relevant) | set(niche) | set(UNKNOWN_DOMAINS)
+
+def test_mentions_are_categorized_for_seeded_banks():
+    bank_values = {bank.name.value for bank in load_banks()}
+    for mention in islice(generate_mentions(200), 200):
+        categories = [c["name"] for c in mention["categoryDetails"]]
+        assert categories and set(categories) <= bank_values
+        assert len(categories) == len(set(categories))
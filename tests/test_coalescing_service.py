@@ -0,0 +1,73 @@
+from datetime import datetime
+from types import SimpleNamespace
+import pytest
+
+from app.enums.bank_name import BankName
+from app.enums.coalescing_status import CoalescingStatus
+from app.infra import local_sa
+from app.services.coalescing_service import CoalescingService
+
+@pytest.fixture(autouse=True)
+def local_db(tmp_path, monkeypatch):
+    monkeypatch.setenv("IEDI_LOCAL_DB_PATH", str(tmp_path / "local.sqlite3"))
+    local_sa.dispose_local_engine()
+    yield
+    local_sa.dispose_local_engine()
+
+def bank_analysis(bank_name, start, end):
+    return SimpleNamespace(bank_name=bank_name, start_date=datetime(*start), end_date=datetime(*end))
+
+def test_fingerprint_ignores_bank_order_and_changes_with_windows():
+    service = CoalescingService()
+    itau = bank_analysis(BankName.ITAU, (2025, 7, 1), (2025, 9, 30))
+    bradesco = bank_analysis(BankName.BRADESCO, (2025, 7, 1), (2025, 9, 30))
+
+    first = service.fingerprint("q", "p", [itau, bradesco], False)
+    second = service.fingerprint("q", "p", [bradesco, itau], False)
+    shifted = service.fingerprint("q", "p", [itau, bank_analysis(BankName.BRADESCO, (2025, 7, 2), (2025, 9, 30))], False)
+
+    assert first == second
+    assert first != shifted
+    assert first != service.fingerprint("q", "outro", [itau, bradesco], False)
+
+def test_followers_attach_to_leader_and_are_released_on_finish():
+    service = CoalescingService()
+
+    assert service.register("leader", "fp") is None
+    leader = service.register("follower", "fp")
+    assert leader.analysis_id == "leader"
+    assert leader.status == CoalescingStatus.IN_FLIGHT
+
+    followers = service.release("leader")
+    assert [f.analysis_id for f in followers] == ["follower"]
+
+    late = service.register("late", "fp")
+    assert late.analysis_id == "leader"
+    assert late.status == CoalescingStatus.DONE
+
+def test_abandoned_leader_frees_the_fingerprint():
+    service = CoalescingService()
+    service.register("leader", "fp")
+    service.register("follower", "fp")
+
+    followers = service.abandon("leader")
+
+    assert [f.analysis_id for f in followers] == ["follower"]
+    assert service.register("retry", "fp") is None
+
+def test_follower_registered_after_release_sees_done_leader():
+    service = CoalescingService()
+    service.register("leader", "fp")
+
+    assert service.release("leader") == []
+    leader = service.register("follower", "fp")
+
+    assert leader.status == CoalescingStatus.DONE
+
+def test_abandon_detaches_followers_once():
+    service = CoalescingService()
+    service.register("leader", "fp")
+    service.register("follower", "fp")
+
+    assert [f.analysis_id for f in service.abandon("leader")] == ["follower"]
+    assert service.abandon("leader") == []
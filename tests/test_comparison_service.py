@@ -0,0 +1,57 @@
+from datetime import datetime
+import pytest
+from zoneinfo import ZoneInfo
+
+from app.enums.bank_name import BankName
+from app.models.bank_analysis import BankAnalysis
+from app.services.comparison_service import ComparisonService
+
+BR_TZ = ZoneInfo("America/Sao_Paulo")
+
+def build_bank_analysis(analysis_id, bank_name, start, end, iedi_mean, positive, negative):
+    return BankAnalysis(
+        analysis_id=analysis_id,
+        bank_name=bank_name,
+        start_date=datetime(*start, tzinfo=BR_TZ),
+        end_date=datetime(*end, tzinfo=BR_TZ),
+        total_mentions=int(positive + negative),
+        positive_volume=positive,
+        negative_volume=negative,
+        iedi_mean=iedi_mean,
+        iedi_score=iedi_mean,
+    )
+
+def test_ranking_and_sector_average():
+    """
+    Reproduz o ranking 3T25 e a média do setor publicados em data/processed.
+    """
+    q3 = ((2025, 7, 1), (2025, 9, 30, 23, 59))
+    q2 = ((2025, 4, 1), (2025, 6, 30, 23, 59))
+    bank_analyses = [
+        build_bank_analysis("a3", BankName.SANTANDER, *q3, 5.780756655768332, 1799, 342),
+        build_bank_analysis("a3", BankName.BRADESCO, *q3, 5.757681465821001, 2343, 495),
+        build_bank_analysis("a3", BankName.BANCO_DO_BRASIL, *q3, 5.6213028764805415, 4841, 1069),
+        build_bank_analysis("a3", BankName.ITAU, *q3, 5.585323417987933, 6151, 976),
+        build_bank_analysis("a2", BankName.BANCO_DO_BRASIL, *q2, 5.270366433216609, 2000, 854),
+        build_bank_analysis("a2", BankName.ITAU, *q2, 6.015342960288809, 3000, 300),
+        build_bank_analysis("pending", BankName.ITAU, *q2, None, 0, 0),
+    ]
+
+    service = ComparisonService()
+    result = service.build_comparison(service.build_frame(bank_analyses))
+
+    assert result["periods"] == ["2T25", "3T25"]
+    ranking = [entry["bank_name"] for entry in result["rankings"]["3T25"]]
+    assert ranking == ["SANTANDER", "BRADESCO", "BANCO_DO_BRASIL", "ITAU"]
+
+    sector_3t25 = result["sector_average"][1]
+    assert abs(sector_3t25["iedi_mean"] - 5.686266104014452) < 1e-9
+
+    bb = result["series"]["BANCO_DO_BRASIL"]
+    assert bb[0]["delta_vs_previous"] is None
+    assert abs(bb[1]["delta_vs_previous"] - (5.6213028764805415 - 5.270366433216609)) < 1e-9
+    assert result["series"]["ITAU"][0]["position"] == 1
+
+def test_validate_rejects_empty_list():
+    with pytest.raises(ValueError):
+        ComparisonService().validate(["", " "])
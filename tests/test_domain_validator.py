@@ -0,0 +1,91 @@
+import pytest
+
+from app.infra.csv_storage import CSVStorage
+from app.models.mention import Mention
+from app.services.mention_service import MentionService
+from app.services.reference_data_service import ReferenceDataService
+from app.utils.domain_validator import DomainIndex, DomainValidator, normalize_host
+
+@pytest.fixture
+def outlets():
+    ReferenceDataService.load([], ["globo.com", "www.estadao.com.br"], ["jota.info"])
+    DomainValidator.clear_cache()
+    yield
+    ReferenceDataService.invalidate()
+    DomainValidator.clear_cache()
+
+def test_normalize_host_strips_prefixes_ports_and_paths():
+    assert normalize_host("https://M.G1.Globo.com:443/economia?x=1") == "g1.globo.com"
+    assert normalize_host("www.estadao.com.br.") == "estadao.com.br"
+    assert normalize_host("mobile.jota.info") == "jota.info"
+    assert normalize_host("user@amp.valor.com.br:8080") == "valor.com.br"
+    assert normalize_host("m.com") == "m.com"
+    assert normalize_host("") is None and normalize_host(None) is None
+
+def test_index_matches_by_label_suffix():
+    index = DomainIndex(["globo.com", "www.estadao.com.br"])
+
+    assert index.match("g1.globo.com") == "globo.com"
+    assert index.match("estadao.com.br") == "www.estadao.com.br"
+    assert index.match("naoglobo.com") is None
+    assert index.match("com.br") is None
+
+def test_drop_removes_unmonitored_and_canonicalizes_domain(outlets):
+    mentions = [
+        Mention(url="https://g1.globo.com/a", domain="g1.globo.com"),
+        Mention(url="https://portal1.com.br/b", domain="portal1.com.br"),
+        Mention(url="https://www.jota.info/c", domain=None),
+        Mention(url="https://portal1.com.br/d", domain="portal1.com.br"),
+    ]
+
+    report = DomainValidator.validate_mentions(mentions, mode="drop")
+
+    assert [m.url for m in report['kept']] == ["https://g1.globo.com/a", "https://www.jota.info/c"]
+    assert [m.domain for m in report['kept']] == ["globo.com", "jota.info"]
+    assert report['invalid_domains'] == {"portal1.com.br": 2}
+    assert (report['valid_count'], report['invalid_count'], report['total_count']) == (2, 2, 4)
+
+def test_flag_keeps_every_mention(outlets):
+    mentions = [Mention(url="https://a.com/1", domain="a.com"), Mention(url="https://jota.info/2", domain="jota.info")]
+
+    report = DomainValidator.validate_mentions(mentions, mode="flag")
+
+    assert report['kept'] == mentions
+    assert report['invalid_domains'] == {"a.com": 1}
+
+def test_index_follows_reference_data_reload(outlets):
+    assert not DomainValidator.is_monitored_domain("https://valor.com.br/x")
+
+    ReferenceDataService.load([], [], [], active_domains=["valor.com.br"])
+
+    assert DomainValidator.is_monitored_domain("https://valor.com.br/x")
+    assert not DomainValidator.is_monitored_domain("https://globo.com/x")
+
+def test_rejected_domains_report_sums_fetches(tmp_path, monkeypatch):
+    monkeypatch.setattr(CSVStorage, "DATA_DIR", tmp_path)
+    for key, domains in (("a", {"x.com": 2, "y.com": 1}), ("b", {"y.com": 3})):
+        CSVStorage.save_json("rejected_domains", f"an1_{key}", {
+            "mode": "drop", "total_mentions": 10, "rejected_mentions": sum(domains.values()), "domains": domains,
+        })
+
+    report = MentionService().find_rejected_domains("an1", limit="1")
+
+    assert report["rejected_mentions"] == 6 and report["total_mentions"] == 20
+    assert report["total_domains"] == 2
+    assert report["domains"] == [{"domain": "y.com", "mentions": 4}]
+    with pytest.raises(FileNotFoundError):
+        MentionService().find_rejected_domains("an2")
+
+def test_rejected_domains_follow_coalesced_copy_and_reset(tmp_path, monkeypatch):
+    monkeypatch.setattr(CSVStorage, "DATA_DIR", tmp_path)
+    CSVStorage.save_json("rejected_domains", "leader_a", {
+        "mode": "drop", "total_mentions": 5, "rejected_mentions": 2, "domains": {"x.com": 2},
+    })
+
+    CSVStorage.copy_analysis_files("leader", "follower")
+    assert MentionService().find_rejected_domains("follower")["rejected_mentions"] == 2
+
+    MentionService().reset_rejected_domains("follower")
+    with pytest.raises(FileNotFoundError):
+        MentionService().find_rejected_domains("follower")
+    assert MentionService().find_rejected_domains("leader")["rejected_mentions"] == 2
@@ -0,0 +1,13 @@
+from benchmarks.parity import check_file
+from app.infra.csv_storage import CSVStorage
+
+GOLDEN = CSVStorage.DATA_DIR / "mention_analysis_1575aaec-09de-4709-ac95-d1b83a81c214.csv"
+
+def test_row_and_bulk_engines_match_golden():
+    report = check_file(GOLDEN)
+
+    assert sum(bank["rows"] for bank in report["banks"].values()) == report["rows"]
+    for bank in report["banks"].values():
+        assert bank["unreconstructable"] == 0
+        for comparison in ("bulk_vs_golden", "row_vs_golden", "bulk_vs_row"):
+            assert all(stats["mismatches"] == 0 for stats in bank[comparison].values()), (comparison, bank[comparison])
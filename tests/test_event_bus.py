@@ -0,0 +1,52 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.enums.bank_name import BankName
+from app.infra import local_sa
+from app.infra.event_bus import AnalysisEventBus
+
+@pytest.fixture(autouse=True)
+def local_db(tmp_path, monkeypatch):
+    monkeypatch.setenv("IEDI_LOCAL_DB_PATH", str(tmp_path / "local.sqlite3"))
+    local_sa.dispose_local_engine()
+    yield
+    local_sa.dispose_local_engine()
+
+def test_events_are_read_from_the_ledger_and_snapshot_accumulates():
+    try:
+        AnalysisEventBus.set_context("analysis-1")
+        AnalysisEventBus.stage("fetching")
+        AnalysisEventBus.progress(pages=1, fetched_mentions=100)
+        AnalysisEventBus.progress(pages=1, fetched_mentions=50)
+        AnalysisEventBus.bank(SimpleNamespace(
+            analysis_id="analysis-1", bank_name=BankName.ITAU, total_mentions=150,
+            positive_volume=140, negative_volume=10, iedi_mean=6.5, iedi_score=6.07,
+        ))
+    finally:
+        AnalysisEventBus.clear_context()
+
+    events = AnalysisEventBus.read("analysis-1")
+    assert [event["event"] for event in events] == ["stage", "progress", "progress", "bank"]
+    assert [event["event"] for event in AnalysisEventBus.read("analysis-1", events[1]["id"])] == ["progress", "bank"]
+
+    snapshot = AnalysisEventBus.snapshot("analysis-1")
+    assert snapshot["stage"] == "fetching"
+    assert snapshot["progress"] == {"pages": 2, "fetched_mentions": 150}
+    assert snapshot["banks"]["ITAU"]["iedi_score"] == 6.07
+    assert snapshot["last_event_id"] == events[-1]["id"]
+
+def test_reset_discards_previous_run_without_reusing_ids():
+    AnalysisEventBus.publish("analysis-1", "done", {"status": "DONE"})
+    last_id = AnalysisEventBus.read("analysis-1")[-1]["id"]
+
+    AnalysisEventBus.reset("analysis-1")
+    AnalysisEventBus.publish("analysis-1", "stage", {"stage": "fetching"})
+
+    assert AnalysisEventBus.snapshot("analysis-1")["status"] == "PENDING"
+    assert AnalysisEventBus.read("analysis-1", last_id)[0]["event"] == "stage"
+
+def test_events_without_context_are_ignored():
+    AnalysisEventBus.clear_context()
+    AnalysisEventBus.stage("fetching")
+    assert AnalysisEventBus.snapshot(None) is None
@@ -0,0 +1,44 @@
+import io
+import pandas as pd
+import pytest
+
+from app.infra.csv_storage import CSVStorage
+from app.services.export_service import ExportService
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(CSVStorage, "DATA_DIR", tmp_path)
+    pd.DataFrame([
+        {"url": "u1", "title": "Itaú lucra", "domain": "a.com", "published_date": "2025-08-01T10:00:00"},
+        {"url": "u2", "title": "Bradesco cai", "domain": "b.com", "published_date": "2025-08-02T10:00:00"},
+    ]).to_csv(tmp_path / "mentions_a1.csv", index=False)
+    pd.DataFrame([
+        {"mention_url": "u1", "bank_name": "Itaú", "sentiment": "positive", "iedi_score": 0.5},
+        {"mention_url": "u1", "bank_name": "Bradesco", "sentiment": "neutral", "iedi_score": 0.1},
+        {"mention_url": "u2", "bank_name": "Bradesco", "sentiment": "negative", "iedi_score": -0.4},
+    ]).reindex(columns=CSVStorage.MENTION_ANALYSIS_COLUMNS).to_csv(tmp_path / "mention_analysis_a1.csv", index=False)
+    return tmp_path
+
+def export_csv(service, **kwargs):
+    options = service.validate("a1", **kwargs)
+    body = b"".join(service.stream("a1", options["fmt"], options["columns"], options["bank_values"], options["sentiment_values"]))
+    return pd.read_csv(io.BytesIO(body))
+
+def test_export_joins_mentions_with_selected_columns_and_filters(data_dir):
+    service = ExportService()
+    service.CHUNK_SIZE = 1
+
+    df = export_csv(service, columns=["mention_url", "bank_name", "title", "iedi_score"], bank_names=["BRADESCO"])
+
+    assert list(df.columns) == ["mention_url", "bank_name", "title", "iedi_score"]
+    assert sorted(df["title"]) == ["Bradesco cai", "Itaú lucra"]
+
+    negative = export_csv(service, columns=["mention_url", "domain"], sentiments=["NEGATIVE"])
+    assert negative.to_dict(orient="records") == [{"mention_url": "u2", "domain": "b.com"}]
+
+def test_export_validates_columns_and_missing_results(data_dir):
+    service = ExportService()
+    with pytest.raises(ValueError):
+        service.validate("a1", columns=["password"])
+    with pytest.raises(FileNotFoundError):
+        service.validate("missing")
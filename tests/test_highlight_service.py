@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from app.services.highlight_service import HighlightService
+
+def test_select_matches_full_sort():
+    values = np.random.default_rng(7).normal(size=500)
+    service = HighlightService()
+
+    assert list(service.select(values, 5, largest=True)) == list(np.argsort(-values, kind="stable")[:5])
+    assert list(service.select(values, 5, largest=False)) == list(np.argsort(values, kind="stable")[:5])
+    assert len(service.select(values[:3], 5)) == 3
+
+def test_contribution_scales_deviation_by_reach():
+    frame = pd.DataFrame({
+        "mention_url": ["a", "b", "c", "d"],
+        "bank_name": ["ITAU"] * 4,
+        "iedi_normalized": [9.0, 9.0, 1.0, 5.0],
+        "reach_group": ["A", "D", "A", None],
+        "sentiment": ["positive", "positive", "negative", "neutral"],
+    })
+
+    bank = HighlightService().compute(frame, k=2)["ITAU"]
+
+    assert bank["mean_iedi_normalized"] == 6.0
+    assert [row["mention_url"] for row in bank["top"]] == ["a", "b"]
+    assert bank["top"][0]["contribution"] == 3.0 * 91
+    assert bank["bottom"][0]["mention_url"] == "c"
+    assert bank["bottom"][0]["contribution"] == -5.0 * 91
@@ -0,0 +1,56 @@
+from flask import Flask
+
+from app.utils.http_cache import ResponseCache
+
+app = Flask(__name__)
+
+def setup_function():
+    ResponseCache.cache.clear()
+
+def test_conditional_request_returns_304_with_same_etag():
+    entry = ResponseCache.store(("analysis", "a1"), {"analysis": {"id": "a1"}}, revision="1:x")
+
+    with app.test_request_context(headers={"If-None-Match": f'"{entry.etag}"'}):
+        response = ResponseCache.respond(entry)
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == f'"{entry.etag}"'
+    assert response.headers["Cache-Control"] == ResponseCache.CACHE_CONTROL
+
+def test_large_bodies_are_gzipped_only_when_accepted():
+    payload = {"bank_analyses": [{"bank_name": "ITAU", "iedi_score": i} for i in range(200)]}
+    entry = ResponseCache.store(("banks", "a1"), payload, revision="1:x")
+
+    with app.test_request_context(headers={"Accept-Encoding": "gzip, deflate"}):
+        gzipped = ResponseCache.respond(entry)
+    with app.test_request_context():
+        plain = ResponseCache.respond(entry)
+
+    assert gzipped.headers["Content-Encoding"] == "gzip"
+    assert gzipped.headers["ETag"] != plain.headers["ETag"]
+    assert plain.get_data() == entry.body
+
+def test_304_only_for_the_etag_of_the_negotiated_encoding():
+    payload = {"bank_analyses": [{"bank_name": "ITAU", "iedi_score": i} for i in range(200)]}
+    entry = ResponseCache.store(("banks", "a1"), payload, revision="1:x")
+
+    with app.test_request_context(headers={"If-None-Match": f'"{entry.etag}-gz"'}):
+        plain = ResponseCache.respond(entry)
+    with app.test_request_context(headers={"If-None-Match": f'"{entry.etag}-gz"', "Accept-Encoding": "gzip"}):
+        not_modified = ResponseCache.respond(entry)
+
+    assert plain.status_code == 200
+    assert plain.get_data() == entry.body
+    assert not_modified.status_code == 304
+    assert not_modified.headers["Vary"] == "Accept-Encoding"
+
+def test_entries_are_dropped_on_revision_change_and_invalidation():
+    ResponseCache.store(("analysis", "a1"), {}, revision="1:x")
+    ResponseCache.store(("banks", "a1"), {}, revision="1:x")
+
+    assert ResponseCache.get(("analysis", "a1"), None) is None
+    assert ResponseCache.get(("analysis", "a1"), "2:y") is None
+    assert ResponseCache.get(("banks", "a1"), "1:x") is not None
+
+    ResponseCache.invalidate("a1")
+    assert ResponseCache.get(("banks", "a1"), "1:x") is None
@@ -0,0 +1,160 @@
+from datetime import datetime, timedelta
+import pytest
+
+from app.enums.job_status import JobStatus
+from app.enums.job_type import JobType
+from app.infra import local_sa
+from app.infra.local_sa import get_local_session
+from app.models.job import Job
+from app.repositories.job_repository import JobRepository
+
+@pytest.fixture(autouse=True)
+def local_db(tmp_path, monkeypatch):
+    monkeypatch.setenv("IEDI_LOCAL_DB_PATH", str(tmp_path / "local.sqlite3"))
+    local_sa.dispose_local_engine()
+    yield
+    local_sa.dispose_local_engine()
+
+def enqueue(priority, max_attempts=3):
+    return JobRepository.save(Job(job_type=JobType.PROCESS_ANALYSIS, analysis_id="a", payload={}, priority=priority, max_attempts=max_attempts))
+
+def test_claim_respects_priority_and_is_exclusive():
+    large = enqueue(priority=365)
+    small = enqueue(priority=3)
+
+    first = JobRepository.claim("w1", lease_seconds=60)
+    second = JobRepository.claim("w2", lease_seconds=60)
+
+    assert first.id == small.id
+    assert second.id == large.id
+    assert JobRepository.claim("w3", lease_seconds=60) is None
+
+def test_stale_lease_is_reclaimed():
+    job = enqueue(priority=1)
+    JobRepository.claim("dead-worker", lease_seconds=60)
+    with get_local_session() as session:
+        session.query(Job).filter(Job.id == job.id).update({Job.heartbeat_at: datetime.utcnow() - timedelta(minutes=5)})
+
+    reclaimed = JobRepository.claim("w2", lease_seconds=60)
+
+    assert reclaimed.id == job.id
+    assert reclaimed.attempts == 2
+    assert not JobRepository.heartbeat(job.id, "dead-worker")
+    assert JobRepository.heartbeat(job.id, "w2")
+
+def test_stale_lease_without_attempts_left_is_reported():
+    job = enqueue(priority=1, max_attempts=1)
+    JobRepository.claim("dead-worker", lease_seconds=60)
+    with get_local_session() as session:
+        session.query(Job).filter(Job.id == job.id).update({Job.heartbeat_at: datetime.utcnow() - timedelta(minutes=5)})
+
+    exhausted = []
+    assert JobRepository.claim("w2", lease_seconds=60, exhausted=exhausted) is None
+
+    assert [failed.id for failed in exhausted] == [job.id]
+    assert JobRepository.find_by_id(job.id).status == JobStatus.FAILED
+
+def test_fail_requeues_until_max_attempts():
+    job = enqueue(priority=1, max_attempts=2)
+
+    JobRepository.fail(JobRepository.claim("w1", 60).id, "w1", "erro 1")
+    assert JobRepository.find_by_id(job.id).status == JobStatus.QUEUED
+
+    JobRepository.fail(JobRepository.claim("w1", 60).id, "w1", "erro 2")
+    failed = JobRepository.find_by_id(job.id)
+    assert failed.status == JobStatus.FAILED
+    assert failed.error == "erro 2"
+    assert JobRepository.count_by_status()["FAILED"] == 1
+
+def test_revisions_track_active_and_settled_jobs():
+    from app.services.job_service import JobService
+
+    service = JobService()
+    job = JobRepository.save(Job(job_type=JobType.PROCESS_ANALYSIS, analysis_id="done", payload={}))
+    JobRepository.save(Job(job_type=JobType.PROCESS_ANALYSIS, analysis_id="queued", payload={}))
+    claimed = JobRepository.claim("w1", lease_seconds=60)
+    JobRepository.complete(claimed.id, "w1")
+
+    revisions = service.revisions(["done", "queued", "legacy"], settled_only=True)
+
+    assert claimed.id == job.id
+    assert revisions["done"].startswith("1:")
+    assert revisions["queued"] is None
+    assert revisions["legacy"] is None
+    assert service.revisions(["legacy"])["legacy"] == "0:"
+
+def test_jobless_done_analysis_is_settled():
+    from app.services.job_service import JobService
+
+    service = JobService()
+    JobRepository.save(Job(job_type=JobType.PROCESS_ANALYSIS, analysis_id="queued", payload={}))
+    done_ids = lambda analysis_ids: {analysis_id for analysis_id in analysis_ids if analysis_id.startswith("legacy-done")}
+
+    revisions = service.revisions(["legacy-done", "legacy-pending", "queued"], settled_only=True, find_done_ids=done_ids)
+
+    assert revisions == {"legacy-done": "0:", "legacy-pending": None, "queued": None}
+
+def test_resource_usage_sums_executions_since_last_run():
+    from app.infra.metrics import Metrics
+    from app.infra.resource_tracker import ResourceTracker
+    from app.services.job_service import JobService
+
+    class FakeJobService(JobService):
+        def execute(self, job):
+            with Metrics.stage("score", 100):
+                ResourceTracker.add(rows_written=100, brandwatch_pages=2)
+            if job.attempts == 1:
+                raise RuntimeError("falha transitória")
+
+    service = FakeJobService()
+    enqueue(priority=1)
+    assert service.run_next("w1")
+    assert service.run_next("w1")
+
+    usage = service.resource_usage("a")
+
+    assert usage["executions"] == 2
+    assert usage["job_retries"] == 1
+    assert usage["rows_written"] == 200
+    assert usage["brandwatch_pages"] == 4
+    assert usage["stages"]["score"] >= 0
+    assert usage["peak_rss_mb"] > 0
+
+def test_job_that_lost_its_lease_does_not_commit():
+    from app.infra.job_lease import JobLease
+    from app.services.job_service import JobService
+
+    steps = []
+
+    class FakeJobService(JobService):
+        def execute(self, job):
+            # Outro worker reserva o job enquanto este ainda executa
+            with get_local_session() as session:
+                session.query(Job).filter(Job.id == job.id).update({Job.heartbeat_at: datetime.utcnow() - timedelta(minutes=5)})
+            assert JobRepository.claim("w2", lease_seconds=60).id == job.id
+            steps.append(JobLease.held())
+
+    job = enqueue(priority=1)
+    assert FakeJobService().run_next("w1")
+
+    current = JobRepository.find_by_id(job.id)
+    assert steps == [False]
+    assert current.status == JobStatus.RUNNING
+    assert current.worker_id == "w2"
+    assert current.error is None
+    assert JobLease.current() is None
+
+def test_peak_rss_is_measured_per_job():
+    from app.infra.resource_tracker import ResourceTracker
+
+    ResourceTracker.start()
+    sample = ResourceTracker.sampler()
+    buffer = bytearray(200 * 2**20)
+    sample()
+    del buffer
+    large = ResourceTracker.stop()["peak_rss_mb"]
+
+    ResourceTracker.start()
+    small = ResourceTracker.stop()["peak_rss_mb"]
+
+    assert large - small > 100
@@ -0,0 +1,18 @@
+import subprocess
+import sys
+
+from app.utils.lazy_import import LazyModule, lazy_import
+
+def test_lazy_module_imports_on_first_attribute_access():
+    module = LazyModule("json")
+
+    assert module.dumps({"a": 1}) == '{"a": 1}'
+    assert "dumps" in vars(module)
+    assert lazy_import("json") is sys.modules["json"]
+
+def test_importing_app_defers_heavy_dependencies():
+    heavy = ("pandas", "numpy", "sqlalchemy_bigquery", "google.cloud.bigquery", "bcr_api")
+    code = f"import sys, app; app.create_app(); print([m for m in {heavy!r} if m in sys.modules])"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+
+    assert output.strip() == "[]"
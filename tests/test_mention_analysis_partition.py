@@ -0,0 +1,31 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pandas as pd
+
+from app.enums.bank_name import BankName
+from app.infra.csv_storage import CSVStorage
+from app.models.mention import Mention
+from app.services.mention_analysis_service import MentionAnalysisService
+from app.services.reference_data_service import ReferenceDataService
+
+def test_scored_rows_carry_partition_and_cluster_columns(tmp_path, monkeypatch):
+    monkeypatch.setattr(CSVStorage, "DATA_DIR", tmp_path)
+    ReferenceDataService.load([], ["globo.com"], [])
+    try:
+        mention = Mention(
+            url="https://g1.globo.com/a", title="Itaú lucra", snippet="s", full_text="s",
+            domain="globo.com", published_date=datetime(2025, 8, 3, 12, 0), sentiment="positive",
+            categories=[BankName.ITAU.value], monthly_visitors=10,
+        )
+        bank = SimpleNamespace(name=BankName.ITAU, variations=["Itaú"])
+        df = MentionAnalysisService().score_bulk([mention], bank)
+    finally:
+        ReferenceDataService.invalidate()
+
+    CSVStorage.save_mention_analyses(df.to_dict(orient="records"), "a1")
+
+    saved = pd.read_csv(tmp_path / "mention_analysis_a1.csv")
+    assert list(saved.columns) == CSVStorage.MENTION_ANALYSIS_FILE_COLUMNS
+    assert saved.at[0, "domain"] == "globo.com"
+    assert saved.at[0, "published_date"].startswith("2025-08-03")
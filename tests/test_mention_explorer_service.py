@@ -0,0 +1,42 @@
+import pandas as pd
+import pytest
+
+from app.infra.csv_storage import CSVStorage
+from app.services.mention_explorer_service import MentionExplorerService
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.setattr(CSVStorage, "DATA_DIR", tmp_path)
+    MentionExplorerService.indexes.clear()
+    rows = [
+        {"mention_url": f"u{i}", "bank_name": "Itaú" if i % 2 else "Bradesco", "sentiment": "negative" if i % 3 == 0 else "positive",
+         "reach_group": "A" if i < 3 else "D", "niche_vehicle": False, "title_mentioned": i == 4, "subtitle_mentioned": i == 5,
+         "iedi_score": i / 10}
+        for i in range(8)
+    ]
+    pd.DataFrame(rows).reindex(columns=CSVStorage.MENTION_ANALYSIS_COLUMNS).to_csv(tmp_path / "mention_analysis_a1.csv", index=False)
+    return MentionExplorerService()
+
+def test_filters_combine_across_columns(service):
+    page = service.find_page("a1", {"bank_name": ["ITAU"], "sentiment": ["POSITIVE"]}, sort="iedi_score")
+    assert [m["mention_url"] for m in page["mentions"]] == ["u1", "u5", "u7"]
+
+    headline = service.find_page("a1", {"headline_mentioned": ["true"]})
+    assert sorted(m["mention_url"] for m in headline["mentions"]) == ["u4", "u5"]
+
+def test_cursor_pagination_walks_the_sorted_results(service):
+    seen = []
+    cursor = None
+    while True:
+        page = service.find_page("a1", sort="-iedi_score", limit=3, cursor=cursor)
+        seen += [m["iedi_score"] for m in page["mentions"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert page["total"] == 8
+    assert seen == sorted(seen, reverse=True) and len(seen) == 8
+
+def test_cursor_is_rejected_when_sort_changes(service):
+    cursor = service.find_page("a1", sort="-iedi_score", limit=2)["next_cursor"]
+    with pytest.raises(ValueError):
+        service.find_page("a1", sort="iedi_score", cursor=cursor)
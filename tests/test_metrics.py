@@ -0,0 +1,27 @@
+from app.infra.metrics import Metrics
+
+def sample(name, labels):
+    from prometheus_client import REGISTRY
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+def test_stage_records_duration_rows_and_throughput():
+    before_count = sample("iedi_stage_seconds_count", {"stage": "test_stage"})
+    before_rows = sample("iedi_stage_rows_total", {"stage": "test_stage"})
+
+    with Metrics.stage("test_stage") as stage:
+        stage.rows = 250
+
+    assert stage.seconds >= 0
+    assert sample("iedi_stage_seconds_count", {"stage": "test_stage"}) == before_count + 1
+    assert sample("iedi_stage_rows_total", {"stage": "test_stage"}) == before_rows + 250
+    assert sample("iedi_stage_rows_per_second_count", {"stage": "test_stage"}) >= 1
+
+def test_render_exposes_histograms_and_queue():
+    Metrics.page(0.3, 100)
+    body, content_type = Metrics.render()
+    text = body.decode("utf-8")
+
+    assert content_type.startswith("text/plain")
+    assert "iedi_brandwatch_page_seconds_bucket" in text
+    assert "iedi_job_queue_depth_bucket" in text
+    assert 'iedi_job_queue{status="QUEUED"}' in text
@@ -0,0 +1,76 @@
+import threading
+
+import pytest
+
+from app.utils.micro_batcher import MicroBatcher
+
+def test_concurrent_requests_share_one_handler_call_per_key():
+    calls = []
+
+    def handler(key, items):
+        calls.append((key, list(items)))
+        return [f"{key}:{item}" for item in items]
+
+    batcher = MicroBatcher(handler, max_wait=0.2)
+    release = threading.Barrier(3)
+    results = {}
+
+    def request(name, key, items):
+        release.wait()
+        results[name] = batcher.submit(key, items).result(timeout=5)
+
+    threads = [
+        threading.Thread(target=request, args=("r1", "ITAU", [1, 2])),
+        threading.Thread(target=request, args=("r2", "ITAU", [3])),
+        threading.Thread(target=request, args=("r3", "BRADESCO", [4])),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results["r1"] == ["ITAU:1", "ITAU:2"]
+    assert results["r2"] == ["ITAU:3"]
+    assert results["r3"] == ["BRADESCO:4"]
+    assert sorted(len(items) for key, items in calls if key == "ITAU") == [3]
+
+def test_handler_errors_reach_every_request_of_the_key():
+    def handler(key, items):
+        raise ValueError("falhou")
+
+    batcher = MicroBatcher(handler, max_wait=0.01)
+    with pytest.raises(ValueError):
+        batcher.submit("ITAU", [1]).result(timeout=5)
+
+def test_failing_request_does_not_break_the_rest_of_its_batch():
+    calls = []
+
+    def handler(key, items):
+        calls.append(list(items))
+        if "mixed" in items:
+            raise ValueError("Invalid sentiment value: mixed")
+        return [item.upper() for item in items]
+
+    batcher = MicroBatcher(handler, max_wait=0.2)
+    release = threading.Barrier(2)
+    results = {}
+
+    def request(name, items):
+        release.wait()
+        try:
+            results[name] = batcher.submit("ITAU", items).result(timeout=5)
+        except ValueError as e:
+            results[name] = e
+
+    threads = [
+        threading.Thread(target=request, args=("good", ["positive"])),
+        threading.Thread(target=request, args=("bad", ["mixed"])),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results["good"] == ["POSITIVE"]
+    assert isinstance(results["bad"], ValueError)
+    assert len(calls[0]) == 2
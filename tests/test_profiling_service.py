@@ -0,0 +1,44 @@
+import marshal
+from types import SimpleNamespace
+
+import pytest
+
+from app.infra.csv_storage import CSVStorage
+from app.services.profiling_service import ProfilingService
+
+def busy_handler(job):
+    return sum(i * i for i in range(10_000))
+
+def test_profiles_only_flagged_jobs_and_merges_them(tmp_path, monkeypatch):
+    monkeypatch.setattr(CSVStorage, "DATA_DIR", tmp_path)
+    service = ProfilingService()
+
+    plain = SimpleNamespace(id="j0", analysis_id="a1", payload={})
+    assert service.run(plain, busy_handler) == busy_handler(plain)
+    with pytest.raises(FileNotFoundError):
+        service.export("a1")
+
+    for job_id in ("j1", "j2"):
+        service.run(SimpleNamespace(id=job_id, analysis_id="a1", payload={"profile": True}), busy_handler)
+    assert sorted(path.name for path in service.profile_dir("a1").iterdir()) == ["j1.prof", "j2.prof"]
+
+    stats = marshal.loads(service.export("a1"))
+    calls = [value[1] for key, value in stats.items() if key[2] == "busy_handler"]
+    assert calls == [2]
+
+    text = service.export("a1", fmt="text", limit=5).decode("utf-8")
+    assert "busy_handler" in text
+
+    service.reset("a1")
+    assert not service.profile_dir("a1").exists()
+
+def test_validate_rejects_unknown_options():
+    service = ProfilingService()
+
+    assert service.validate() == {"fmt": "prof", "sort": "cumulative", "limit": 50}
+    with pytest.raises(ValueError):
+        service.validate(fmt="html")
+    with pytest.raises(ValueError):
+        service.validate(sort="name")
+    with pytest.raises(ValueError):
+        service.validate(limit="0")
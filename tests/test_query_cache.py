@@ -0,0 +1,76 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.infra import local_sa
+from app.infra.query_cache import QueryCache
+from app.models.media_outlet import MediaOutlet
+from app.repositories.query_cache_generation_repository import QueryCacheGenerationRepository
+
+@pytest.fixture(autouse=True)
+def local_db(tmp_path, monkeypatch):
+    monkeypatch.setenv("IEDI_LOCAL_DB_PATH", str(tmp_path / "local.sqlite3"))
+    local_sa.dispose_local_engine()
+    QueryCache.cache.clear()
+    yield
+    QueryCache.cache.clear()
+    local_sa.dispose_local_engine()
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+    @event.listens_for(engine, "connect")
+    def attach_schema(dbapi_connection, connection_record):
+        dbapi_connection.execute("ATTACH DATABASE ':memory:' AS iedi")
+
+    MediaOutlet.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as session:
+        now = datetime(2025, 1, 1)
+        session.add_all([
+            MediaOutlet(id="1", name="G1", domain="g1.globo.com", is_niche=False, active=True, created_at=now, updated_at=now),
+            MediaOutlet(id="2", name="Valor", domain="valor.globo.com", is_niche=True, active=True, created_at=now, updated_at=now),
+        ])
+        session.commit()
+
+    factory.statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: factory.statements.append(args[2]))
+    return factory
+
+def find_relevant(factory):
+    with factory() as session:
+        return QueryCache.all(session.query(MediaOutlet).filter(MediaOutlet.is_niche == False))
+
+def test_repeated_query_is_served_from_cache_with_fresh_instances(session_factory):
+    first = find_relevant(session_factory)
+    first[0].domain = "changed.example"
+    second = find_relevant(session_factory)
+
+    assert len(session_factory.statements) == 1
+    assert [outlet.domain for outlet in second] == ["g1.globo.com"]
+    assert second[0] is not first[0]
+
+def test_write_in_any_process_invalidates_the_table(session_factory):
+    find_relevant(session_factory)
+
+    QueryCache.invalidate(MediaOutlet.__tablename__)
+    find_relevant(session_factory)
+    # Outro processo: só a geração no SQLite muda, o LRU local continua com a entrada
+    find_relevant(session_factory)
+    QueryCacheGenerationRepository.bump([MediaOutlet.__tablename__])
+    find_relevant(session_factory)
+
+    assert len(session_factory.statements) == 3
+    assert QueryCacheGenerationRepository.find_generation(MediaOutlet.__tablename__) == 2
+
+def test_different_parameters_do_not_share_entries(session_factory):
+    with session_factory() as session:
+        niche = QueryCache.all(session.query(MediaOutlet).filter(MediaOutlet.is_niche == True))
+
+    assert [outlet.domain for outlet in niche] == ["valor.globo.com"]
+    assert [outlet.domain for outlet in find_relevant(session_factory)] == ["g1.globo.com"]
+    assert len(session_factory.statements) == 2
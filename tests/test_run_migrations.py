@@ -0,0 +1,68 @@
+import importlib.util
+from pathlib import Path
+
+SQL_DIR = Path(__file__).parent.parent / "sql"
+spec = importlib.util.spec_from_file_location("run_migrations", SQL_DIR / "run_migrations.py")
+run_migrations = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(run_migrations)
+
+def test_plan_uses_filename_and_checksum():
+    migrations = run_migrations.load_migrations(SQL_DIR)
+    banks = next(m for m in migrations if m.name == "09_insert_banks.sql")
+    dataset = migrations[0]
+
+    plan = run_migrations.plan_migrations(migrations, {
+        (dataset.name, dataset.checksum),
+        (banks.name, "checksum-antigo"),
+    })
+
+    assert plan["applied"] == [dataset]
+    assert plan["changed"] == [banks]
+    assert len(plan["pending"]) == len(migrations) - 2
+
+def test_create_tables_run_as_one_parallel_batch_between_dataset_and_changes():
+    migrations = run_migrations.load_migrations(SQL_DIR)
+    batches = run_migrations.build_batches(migrations)
+
+    assert [m.name for m in batches[0]] == ["01_create_dataset.sql"]
+    assert all(m.kind == run_migrations.TABLE for m in batches[1])
+    assert len(batches[1]) == sum(1 for m in migrations if "create_table" in m.name)
+    assert all(len(batch) == 1 and batch[0].kind == run_migrations.CHANGE for batch in batches[2:])
+    assert [batch[0].name for batch in batches[2:]] == sorted(batch[0].name for batch in batches[2:])
+
+def test_split_statements_ignores_comments_and_checksum_ignores_line_endings():
+    sql = "-- comentário; não é comando\nUPDATE t SET a = 1;\n\nSELECT 1;\n"
+
+    assert run_migrations.split_statements(sql) == ["UPDATE t SET a = 1", "SELECT 1"]
+    assert run_migrations.compute_checksum(sql) == run_migrations.compute_checksum(sql.replace("\n", "\r\n"))
+
+def test_changed_create_table_is_rerun_but_changed_insert_is_blocked():
+    migrations = run_migrations.load_migrations(SQL_DIR)
+    mentions = next(m for m in migrations if m.name == "06_create_table_mentions.sql")
+    banks = next(m for m in migrations if m.name == "09_insert_banks.sql")
+    applied = {(m.name, m.checksum) for m in migrations if m not in (mentions, banks)}
+    applied |= {(mentions.name, "antigo"), (banks.name, "antigo")}
+
+    to_run, blocked = run_migrations.select_runnable(run_migrations.plan_migrations(migrations, applied))
+
+    assert to_run == [mentions]
+    assert blocked == [banks]
+    assert run_migrations.is_script((SQL_DIR / "15_partition_mention_tables.sql").read_text(encoding="utf-8"))
+
+def test_layout_problems_reports_missing_partition_and_cluster_order():
+    def column(table, name, partitioning="NO", cluster=None):
+        return {"table_name": table, "column_name": name, "is_partitioning_column": partitioning, "clustering_ordinal_position": cluster}
+
+    columns = [
+        column("mention", "published_date", "YES"),
+        column("mention", "domain", cluster=1),
+        column("mention_analysis", "published_date"),
+        column("mention_analysis", "domain", cluster=1),
+        column("mention_analysis", "bank_name", cluster=2),
+    ]
+
+    problems = run_migrations.layout_problems(columns)
+
+    assert len(problems) == 2
+    assert all(problem.startswith("iedi.mention_analysis:") for problem in problems)
+    assert run_migrations.layout_problems(columns[:2]) == ["iedi.mention_analysis: tabela inexistente"]
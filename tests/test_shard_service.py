@@ -0,0 +1,68 @@
+from datetime import datetime
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+import pandas as pd
+
+from app.enums.bank_name import BankName
+from app.infra.csv_storage import CSVStorage
+from app.models.bank_analysis import BankAnalysis
+from app.services.bank_analysis_service import BankAnalysisService
+from app.services.shard_service import ShardService
+
+BR_TZ = ZoneInfo("America/Sao_Paulo")
+
+def test_plan_covers_period_without_overlap():
+    bank_analysis = BankAnalysis(
+        id="ba-1",
+        bank_name=BankName.ITAU,
+        start_date=datetime(2025, 1, 1, tzinfo=BR_TZ),
+        end_date=datetime(2025, 1, 20, tzinfo=BR_TZ),
+    )
+
+    units = ShardService().plan([bank_analysis], shard_days=7)
+
+    assert [u["unit_key"] for u in units] == ["ITAU_0000", "ITAU_0001", "ITAU_0002"]
+    assert units[0]["end_date"] == units[1]["start_date"]
+    assert units[-1]["end_date"] == bank_analysis.end_date.isoformat()
+    assert [u["is_last"] for u in units] == [False, False, True]
+
+def test_merged_shard_aggregates_match_single_pass():
+    golden = pd.read_csv(CSVStorage.DATA_DIR / "mention_analysis_1575aaec-09de-4709-ac95-d1b83a81c214.csv")
+    bank_df = golden[golden["bank_name"] == BankName.ITAU.value].reset_index(drop=True)
+    service = BankAnalysisService()
+
+    single = service.apply_aggregates(SimpleNamespace(), service.compute_aggregates(bank_df))
+    shards = [service.compute_aggregates(part) for part in (bank_df.iloc[:1000], bank_df.iloc[1000:4321], bank_df.iloc[4321:])]
+    merged = service.apply_aggregates(SimpleNamespace(), service.merge_aggregates(shards))
+
+    assert vars(merged) == vars(single)
+    assert merged.total_mentions == len(bank_df)
+
+def test_merge_shards_is_deterministic(tmp_path, monkeypatch):
+    monkeypatch.setattr(CSVStorage, "DATA_DIR", tmp_path)
+    aggregates = {"bank_name": "ITAU", "total_mentions": 1, "negative_mentions": 0,
+                  "iedi_normalized_sum": 5.0, "iedi_normalized_count": 1}
+    for unit_key, url in (("ITAU_0001", "https://b.com/2"), ("ITAU_0000", "https://a.com/1")):
+        CSVStorage.save_shard("a1", "p1", unit_key, [{"url": url}], [{"mention_url": url, "bank_name": "Itaú"}], aggregates)
+
+    completed = CSVStorage.load_shard_aggregates("a1", "p1")
+    counts = CSVStorage.merge_shards("a1", "p1", sorted(completed))
+
+    assert counts == {"mentions": 2, "mention_analysis": 2}
+    merged = pd.read_csv(tmp_path / "mention_analysis_a1.csv")
+    assert list(merged["mention_url"]) == ["https://a.com/1", "https://b.com/2"]
+    assert list(merged.columns) == CSVStorage.MENTION_ANALYSIS_FILE_COLUMNS
+
+def test_merge_shards_keeps_shared_mention_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(CSVStorage, "DATA_DIR", tmp_path)
+    aggregates = {"bank_name": "ITAU", "total_mentions": 1, "negative_mentions": 0,
+                  "iedi_normalized_sum": 5.0, "iedi_normalized_count": 1}
+    shared = "https://a.com/1"
+    CSVStorage.save_shard("a1", "p1", "BRADESCO_0000", [{"url": shared}], [{"mention_url": shared, "bank_name": "Bradesco"}], aggregates)
+    CSVStorage.save_shard("a1", "p1", "ITAU_0000", [{"url": shared}, {"url": "https://b.com/2"}],
+                          [{"mention_url": shared, "bank_name": "Itaú"}, {"mention_url": "https://b.com/2", "bank_name": "Itaú"}], aggregates)
+
+    counts = CSVStorage.merge_shards("a1", "p1", ["BRADESCO_0000", "ITAU_0000"])
+
+    assert counts == {"mentions": 2, "mention_analysis": 3}
+    assert list(pd.read_csv(tmp_path / "mentions_a1.csv")["url"]) == [shared, "https://b.com/2"]
@@ -1,6 +1,13 @@
+import os
+
 from app import create_app
 
 app = create_app()
 
 if __name__ == "__main__":
+    # Sob o reloader do modo debug só o processo filho atende; sob o gunicorn o pool sobe no post_fork
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        from app.services.job_service import JobService
+
+        JobService().ensure_workers()
     app.run(debug=True)